@@ -4,11 +4,11 @@ logger = initialise_logger(__name__, os.getenv("LOG_LEVEL"), os.getenv("LOG_PATH
 from fastapi import FastAPI
 import uvicorn
 
-from run.setup import setup_cors
+from run.setup import setup_cors, lifespan
 from run.routers import register_routes
 
 # FastAPI App Setup
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 setup_cors(app)
 register_routes(app)
 
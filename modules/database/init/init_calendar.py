@@ -15,30 +15,428 @@ logging = logger.get_logger(
 import modules.database.schemas.calendar_neo as calendar_neo
 import modules.database.schemas.entity_neo as entity_neo
 import modules.database.schemas.relationships.calendar_rels as cal_rels
+import modules.database.schemas.relationships.entity_calendar_rels as entity_cal_rels
 import modules.database.tools.neontology_tools as neon
 from modules.database.tools.db_operations import DatabaseNotFoundError, stop_database, drop_database, create_database
 from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem
+from modules.database.tools.dry_run_tools import WritePlan
+from modules.database.tools.neontology.graphconnection import GraphConnection
+from collections import OrderedDict
 from datetime import timedelta, datetime
+import threading
+import pandas as pd
 
-def create_calendar(db_name, start_date, end_date, attach_to_calendar_node=False, entity_node=None, time_chunk_node=None):
-    logging.info(f"Creating calendar for {start_date} to {end_date}")
+# 'python' builds the calendar client side and bulk merges it, 'cypher' has Neo4j generate it
+CALENDAR_ENGINES = ('python', 'cypher')
+CALENDAR_ENGINE = os.getenv("CALENDAR_ENGINE", "python")
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def build_calendar_frames(start_date, end_date, time_chunk_interval=None):
+    """Compute every calendar row for a date range in one vectorised pass.
+
+    The frames don't depend on the entity the calendar belongs to: each row has a
+    key, which is the unique_id suffix, and a rel_path relative to the calendar path.
+    Rows are in date order, so consecutive rows in a frame follow each other.
+
+    Returns a dict of DataFrames for 'years', 'months', 'weeks', 'days' and, when
+    time_chunk_interval (minutes) is given, 'time_chunks'.
+    """
+    if end_date < start_date:
+        raise ValueError(f"Calendar end date {end_date} is before start date {start_date}")
+
+    dates = pd.date_range(start_date, end_date, freq='D')
+    iso = dates.isocalendar()
+
+    days = pd.DataFrame({
+        'date': dates.date,
+        'year': dates.year,
+        'month': dates.month,
+        'day': dates.day,
+        'iso_year': iso['year'].to_numpy(dtype=int),
+        'iso_week': iso['week'].to_numpy(dtype=int),
+        'weekday': dates.weekday,
+    })
+    year_str = days['year'].astype(str)
+    month_str = days['month'].astype(str)
+    day_str = days['day'].astype(str)
+    month_pad = month_str.str.zfill(2)
+    day_pad = day_str.str.zfill(2)
+
+    days['year_key'] = year_str
+    days['month_key'] = year_str + '_' + month_str
+    days['week_key'] = days['iso_year'].astype(str) + '_' + days['iso_week'].astype(str)
+    days['key'] = days['month_key'] + '_' + day_str
+    days['day_of_week'] = days['weekday'].map(DAY_NAMES.__getitem__)
+    days['iso_day'] = year_str + '-' + month_pad + '-' + day_pad
+    days['rel_path'] = 'years/' + year_str + '/months/' + month_pad + '/' + day_pad
+
+    years = days.drop_duplicates('year_key')[['year_key', 'year']].rename(columns={'year_key': 'key'})
+    years['year'] = years['key']
+    years['rel_path'] = 'years/' + years['key']
+
+    months = days.drop_duplicates('month_key')[['month_key', 'year_key', 'year', 'month']].rename(
+        columns={'month_key': 'key'})
+    months['month_name'] = (months['month'] - 1).map(MONTH_NAMES.__getitem__)
+    months['rel_path'] = 'years/' + months['year'].astype(str) + '/months/' + months['month'].astype(str).str.zfill(2)
+    months['year'] = months['year'].astype(str)
+    months['month'] = months['month'].astype(str)
+
+    # A week belongs to the calendar year of the first day of it in the range
+    weeks = days.drop_duplicates('week_key')[['week_key', 'year_key', 'date', 'weekday', 'iso_year', 'iso_week']].rename(
+        columns={'week_key': 'key'})
+    weeks['start_date'] = (pd.to_datetime(weeks['date']) - pd.to_timedelta(weeks['weekday'], unit='D')).dt.date
+    weeks['week_number'] = weeks['iso_week'].astype(str)
+    weeks['iso_week'] = weeks['iso_year'].astype(str) + '-W' + weeks['week_number'].str.zfill(2)
+    weeks['rel_path'] = 'years/' + weeks['year_key'] + '/weeks/' + weeks['week_number']
+    weeks = weeks.drop(columns=['date', 'weekday', 'iso_year'])
+
+    frames = {
+        'years': years.reset_index(drop=True),
+        'months': months.reset_index(drop=True),
+        'weeks': weeks.reset_index(drop=True),
+        'days': days.reset_index(drop=True),
+    }
+
+    if time_chunk_interval:
+        if (24 * 60) % time_chunk_interval != 0:
+            raise ValueError(f"Time chunk interval {time_chunk_interval} does not divide a day evenly")
+        chunk_starts = pd.timedelta_range(start=0, periods=(24 * 60) // time_chunk_interval, freq=f'{time_chunk_interval}min')
+        chunks = pd.DataFrame({
+            'index': range(len(chunk_starts)),
+            'start_time': (pd.Timestamp(0) + chunk_starts).time,
+            'end_time': (pd.Timestamp(0) + chunk_starts + pd.Timedelta(minutes=time_chunk_interval)).time,
+        })
+        time_chunks = days[['key', 'rel_path']].rename(columns={'key': 'day_key'}).merge(chunks, how='cross')
+        time_chunks['key'] = time_chunks['day_key'] + '_' + time_chunks['index'].astype(str)
+        frames['time_chunks'] = time_chunks
+
+    return frames
+
+
+# (template group, node class, unique_id prefix) for the nodes below the calendar node
+CALENDAR_NODE_GROUPS = (
+    ('years', calendar_neo.CalendarYearNode, 'CalendarYear'),
+    ('months', calendar_neo.CalendarMonthNode, 'CalendarMonth'),
+    ('weeks', calendar_neo.CalendarWeekNode, 'CalendarWeek'),
+    ('days', calendar_neo.CalendarDayNode, 'CalendarDay'),
+    ('time_chunks', calendar_neo.CalendarTimeChunkNode, 'CalendarTimeChunk_CalendarDay'),
+)
+CALENDAR_NODE_COLUMNS = {
+    'years': ['year'],
+    'months': ['year', 'month', 'month_name'],
+    'weeks': ['start_date', 'week_number', 'iso_week'],
+    'days': ['date', 'day_of_week', 'iso_day'],
+    'time_chunks': ['start_time', 'end_time'],
+}
+
+CALENDAR_TEMPLATE_CACHE_SIZE = int(os.getenv("CALENDAR_TEMPLATE_CACHE_SIZE", 16))
+_calendar_template_cache = OrderedDict()
+_calendar_template_lock = threading.Lock()
+_calendar_template_stats = {'hits': 0, 'misses': 0}
+
+
+def _pairs(keys):
+    """Consecutive (previous, next) pairs of keys."""
+    return tuple(zip(keys, keys[1:]))
+
+
+def build_calendar_template(start_date, end_date, time_chunk_interval=None):
+    """Turn the calendar frames into an entity independent template.
+
+    The template holds, for each node group, (key, rel_path, properties) rows and,
+    for each relationship class, the (source key, target key) pairs to link.
+    The calendar node itself is keyed on None.
+    """
+    frames = build_calendar_frames(start_date, end_date, time_chunk_interval)
+
+    template_nodes = {}
+    for group, columns in CALENDAR_NODE_COLUMNS.items():
+        if group not in frames:
+            continue
+        frame = frames[group]
+        template_nodes[group] = tuple(
+            (row['key'], row['rel_path'], {column: row[column] for column in columns})
+            for row in frame[['key', 'rel_path'] + columns].to_dict(orient='records')
+        )
+
+    def key_pairs(frame, source_column, target_column='key'):
+        return tuple(zip(frame[source_column], frame[target_column]))
+
+    years, months, weeks, days = (frames[x] for x in ('years', 'months', 'weeks', 'days'))
+    # The frames are contiguous, so each row follows the one before it
+    edges = [
+        (cal_rels.CalendarIncludesYear, 'calendar', 'years', tuple((None, x) for x in years['key'])),
+        (cal_rels.YearIncludesMonth, 'years', 'months', key_pairs(months, 'year_key')),
+        (cal_rels.YearIncludesWeek, 'years', 'weeks', key_pairs(weeks, 'year_key')),
+        (cal_rels.MonthIncludesDay, 'months', 'days', key_pairs(days, 'month_key')),
+        (cal_rels.WeekIncludesDay, 'weeks', 'days', key_pairs(days, 'week_key')),
+        (cal_rels.YearFollowsYear, 'years', 'years', _pairs(list(years['key']))),
+        (cal_rels.MonthFollowsMonth, 'months', 'months', _pairs(list(months['key']))),
+        (cal_rels.WeekFollowsWeek, 'weeks', 'weeks', _pairs(list(weeks['key']))),
+        (cal_rels.DayFollowsDay, 'days', 'days', _pairs(list(days['key']))),
+    ]
+
+    if 'time_chunks' in frames:
+        time_chunks = frames['time_chunks']
+        # Chunks follow each other within a day
+        follows = time_chunks['index'].to_numpy()[1:] > 0
+        edges += [
+            (cal_rels.DayIncludesTimeChunk, 'days', 'time_chunks', key_pairs(time_chunks, 'day_key')),
+            (cal_rels.TimeChunkFollowsTimeChunk, 'time_chunks', 'time_chunks',
+             tuple(x for x, keep in zip(_pairs(list(time_chunks['key'])), follows) if keep)),
+        ]
+
+    return {'nodes': template_nodes, 'edges': tuple(edges)}
+
+
+def get_calendar_template(start_date, end_date, time_chunk_interval=None):
+    """Return the calendar template for a range, building it on a cache miss.
+
+    Templates are kept in a least recently used cache of CALENDAR_TEMPLATE_CACHE_SIZE
+    entries. They are shared between callers and must not be modified.
+    """
+    cache_key = (start_date, end_date, time_chunk_interval)
+    with _calendar_template_lock:
+        template = _calendar_template_cache.get(cache_key)
+        if template is not None:
+            _calendar_template_cache.move_to_end(cache_key)
+            _calendar_template_stats['hits'] += 1
+            logging.debug(f"Calendar template cache hit for {cache_key}")
+            return template
+        _calendar_template_stats['misses'] += 1
+
+    logging.debug(f"Calendar template cache miss for {cache_key}")
+    template = build_calendar_template(start_date, end_date, time_chunk_interval)
+
+    with _calendar_template_lock:
+        _calendar_template_cache[cache_key] = template
+        _calendar_template_cache.move_to_end(cache_key)
+        while len(_calendar_template_cache) > CALENDAR_TEMPLATE_CACHE_SIZE:
+            _calendar_template_cache.popitem(last=False)
+
+    return template
+
+
+def calendar_template_cache_info():
+    """Hit and miss counters for the calendar template cache."""
+    with _calendar_template_lock:
+        return {
+            **_calendar_template_stats,
+            'size': len(_calendar_template_cache),
+            'max_size': CALENDAR_TEMPLATE_CACHE_SIZE,
+        }
+
+
+def clear_calendar_template_cache():
+    with _calendar_template_lock:
+        _calendar_template_cache.clear()
+        _calendar_template_stats.update(hits=0, misses=0)
+
+
+def _merge_rel_cypher(variable, source, rel_class, target):
+    return f"""
+    MERGE ({source})-[{variable}:{rel_class.__relationshiptype__}]->({target})
+    ON CREATE SET {variable}.created = $now
+    SET {variable}.merged = $now"""
+
+
+def _merge_rel_when_cypher(condition, variable, source, rel_class, target):
+    # FOREACH over an empty list is how Cypher merges conditionally
+    return f"""
+    FOREACH (_ IN CASE WHEN {condition} THEN [1] ELSE [] END |
+        MERGE ({source})-[{variable}:{rel_class.__relationshiptype__}]->({target})
+        ON CREATE SET {variable}.created = $now
+        SET {variable}.merged = $now
+    )"""
+
+
+def _follows_cypher(variable, previous, rel_class, target):
+    return _merge_rel_when_cypher(f"{previous} IS NOT NULL", variable, previous, rel_class, target)
+
+
+def calendar_cypher(database, entity_node, time_chunks=False):
+    """A single Cypher program which generates a whole calendar inside Neo4j.
+
+    One row is unwound per day of the range and each row merges its year, month, ISO week
+    and day, the INCLUDES relationships and the FOLLOWS relationship to the previous day,
+    week, month or year where it starts one. Unique ids, properties and paths match the
+    ones create_calendar builds in Python.
+    """
+    day_id = "$prefix.day + toString({0}.year) + '_' + toString({0}.month) + '_' + toString({0}.day)"
+    month_id = "$prefix.month + toString({0}.year) + '_' + toString({0}.month)"
+    week_id = "$prefix.week + toString({0}.weekYear) + '_' + toString({0}.week)"
+    year_id = "$prefix.year + toString({0}.year)"
+
+    cypher = f"""
+    USE {database}
+    MATCH (entity:{entity_node.__primarylabel__} {{ {entity_node.__primaryproperty__}: $entity_pp }})
+    MERGE (calendar:{calendar_neo.CalendarNode.__primarylabel__} {{ unique_id: $calendar.pp }})
+    ON MATCH SET calendar += $calendar.set_on_match
+    ON CREATE SET calendar += $calendar.set_on_create
+    SET calendar += $calendar.always_set
+    {_merge_rel_cypher('has_calendar', 'entity', entity_cal_rels.EntityHasCalendar, 'calendar')}
+    WITH calendar
+    UNWIND range(0, duration.inDays($start_date, $end_date).days) AS offset
+    WITH calendar, offset, $start_date + duration({{days: offset}}) AS d
+    WITH calendar, offset, d,
+        d - duration({{days: 1}}) AS p,
+        d - duration({{days: d.dayOfWeek - 1}}) AS monday,
+        $calendar_path + '/years/' + toString(d.year) AS year_path,
+        right('0' + toString(d.month), 2) AS mm
+    // a week's directory sits under the year of its first day in the range
+    WITH calendar, offset, d, p, monday, year_path, mm,
+        CASE WHEN monday < $start_date THEN $start_date ELSE monday END AS week_first
+    MERGE (year:{calendar_neo.CalendarYearNode.__primarylabel__} {{ unique_id: {year_id.format('d')} }})
+    ON CREATE SET year.created = $now
+    SET year.merged = $now, year.year = toString(d.year), year.path = year_path
+    MERGE (month:{calendar_neo.CalendarMonthNode.__primarylabel__} {{ unique_id: {month_id.format('d')} }})
+    ON CREATE SET month.created = $now
+    SET month.merged = $now, month.year = toString(d.year), month.month = toString(d.month),
+        month.month_name = $month_names[d.month - 1], month.path = year_path + '/months/' + mm
+    MERGE (week:{calendar_neo.CalendarWeekNode.__primarylabel__} {{ unique_id: {week_id.format('d')} }})
+    ON CREATE SET week.created = $now
+    SET week.merged = $now, week.start_date = monday, week.week_number = toString(d.week),
+        week.iso_week = toString(d.weekYear) + '-W' + right('0' + toString(d.week), 2),
+        week.path = $calendar_path + '/years/' + toString(week_first.year) + '/weeks/' + toString(d.week)
+    MERGE (day:{calendar_neo.CalendarDayNode.__primarylabel__} {{ unique_id: {day_id.format('d')} }})
+    ON CREATE SET day.created = $now
+    SET day.merged = $now, day.date = d, day.day_of_week = $day_names[d.dayOfWeek - 1],
+        day.iso_day = toString(d), day.path = year_path + '/months/' + mm + '/' + right('0' + toString(d.day), 2)
+    {_merge_rel_cypher('includes_year', 'calendar', cal_rels.CalendarIncludesYear, 'year')}
+    {_merge_rel_cypher('includes_month', 'year', cal_rels.YearIncludesMonth, 'month')}
+    // like its directory, a week belongs to the year of its first day in the range only
+    {_merge_rel_when_cypher('d = week_first', 'includes_week', 'year', cal_rels.YearIncludesWeek, 'week')}
+    {_merge_rel_cypher('month_includes_day', 'month', cal_rels.MonthIncludesDay, 'day')}
+    {_merge_rel_cypher('week_includes_day', 'week', cal_rels.WeekIncludesDay, 'day')}
+    WITH offset, d, p, year, month, week, day
+    OPTIONAL MATCH (previous_day:{calendar_neo.CalendarDayNode.__primarylabel__} {{ unique_id: {day_id.format('p')} }})
+    WHERE offset > 0
+    OPTIONAL MATCH (previous_week:{calendar_neo.CalendarWeekNode.__primarylabel__} {{ unique_id: {week_id.format('p')} }})
+    WHERE offset > 0 AND d.dayOfWeek = 1
+    OPTIONAL MATCH (previous_month:{calendar_neo.CalendarMonthNode.__primarylabel__} {{ unique_id: {month_id.format('p')} }})
+    WHERE offset > 0 AND d.day = 1
+    OPTIONAL MATCH (previous_year:{calendar_neo.CalendarYearNode.__primarylabel__} {{ unique_id: {year_id.format('p')} }})
+    WHERE offset > 0 AND d.ordinalDay = 1
+    {_follows_cypher('day_follows', 'previous_day', cal_rels.DayFollowsDay, 'day')}
+    {_follows_cypher('week_follows', 'previous_week', cal_rels.WeekFollowsWeek, 'week')}
+    {_follows_cypher('month_follows', 'previous_month', cal_rels.MonthFollowsMonth, 'month')}
+    {_follows_cypher('year_follows', 'previous_year', cal_rels.YearFollowsYear, 'year')}
+    """
+
+    if time_chunks:
+        cypher += f"""
+    WITH year, month, week, day
+    CALL {{
+        WITH day
+        UNWIND range(0, $chunks_per_day - 1) AS chunk_index
+        MERGE (chunk:{calendar_neo.CalendarTimeChunkNode.__primarylabel__} {{ unique_id: 'CalendarTimeChunk_' + day.unique_id + '_' + toString(chunk_index) }})
+        ON CREATE SET chunk.created = $now
+        SET chunk.merged = $now, chunk.path = day.path,
+            chunk.start_time = localtime('00:00') + duration({{minutes: chunk_index * $time_chunk_interval}}),
+            chunk.end_time = localtime('00:00') + duration({{minutes: (chunk_index + 1) * $time_chunk_interval}})
+        {_merge_rel_cypher('includes_chunk', 'day', cal_rels.DayIncludesTimeChunk, 'chunk')}
+        WITH chunk, chunk_index ORDER BY chunk_index
+        WITH collect(chunk) AS chunks
+        FOREACH (i IN range(1, size(chunks) - 1) |
+            FOREACH (previous_chunk IN [chunks[i - 1]] |
+                FOREACH (next_chunk IN [chunks[i]] |
+                    MERGE (previous_chunk)-[chunk_follows:{cal_rels.TimeChunkFollowsTimeChunk.__relationshiptype__}]->(next_chunk)
+                    ON CREATE SET chunk_follows.created = $now
+                    SET chunk_follows.merged = $now
+                )
+            )
+        )
+        RETURN size(chunks) AS chunk_count
+    }}
+    WITH year, month, week, day, chunk_count"""
+    else:
+        cypher += """
+    WITH year, month, week, day, 0 AS chunk_count"""
+
+    cypher += """
+    RETURN count(DISTINCT year) AS years, count(DISTINCT month) AS months,
+        count(DISTINCT week) AS weeks, count(day) AS days, sum(chunk_count) AS time_chunks
+    """
+
+    return cypher
+
+
+def run_calendar_cypher(db_name, entity_node, calendar_node, start_date, end_date, time_chunk_interval=None):
+    """Generate the calendar for an entity in a single round trip to Neo4j.
+
+    Returns the number of years, months, weeks, days and time chunks which were merged.
+    """
+    entity_unique_id = entity_node.unique_id
+    params = {
+        "entity_pp": entity_node.get_primary_property_value(),
+        "calendar": calendar_node._get_merge_parameters(),
+        "calendar_path": calendar_node.path,
+        "start_date": start_date,
+        "end_date": end_date,
+        "now": datetime.now(),
+        "prefix": {
+            "year": f"CalendarYear_{entity_unique_id}_",
+            "month": f"CalendarMonth_{entity_unique_id}_",
+            "week": f"CalendarWeek_{entity_unique_id}_",
+            "day": f"CalendarDay_{entity_unique_id}_",
+        },
+        "month_names": MONTH_NAMES,
+        "day_names": DAY_NAMES,
+    }
+    if time_chunk_interval:
+        params["chunks_per_day"] = (24 * 60) // time_chunk_interval
+        params["time_chunk_interval"] = time_chunk_interval
+
+    cypher = calendar_cypher(db_name, entity_node, time_chunks=bool(time_chunk_interval))
+    result = GraphConnection().cypher_write_single(cypher, params)
+    if result is None:
+        raise ValueError(f"Entity node {entity_unique_id} was not found in {db_name}")
+    return dict(result)
+
+
+def create_calendar(db_name, start_date, end_date, attach_to_calendar_node=False, entity_node=None, time_chunk_node=None, engine=None, write=True, dry_run=False, plan=None):
+    """Create the calendar nodes, directories and tldraw files for an entity.
+
+    With dry_run, or when a WritePlan is passed as plan, nothing is written: the graph
+    writes, directories and tldraw files are recorded in the plan. A dry run without a
+    plan returns the plan's report under 'dry_run'.
+    """
+    engine = engine or CALENDAR_ENGINE
+    if engine not in CALENDAR_ENGINES:
+        raise ValueError(f"Unknown calendar engine {engine}, expected one of {CALENDAR_ENGINES}")
+    logging.info(f"Creating calendar for {start_date} to {end_date} with the {engine} engine")
     
-    logging.info(f"Initializing Neontology connection")
-    neon.init_neontology_connection()
+    report_plan = dry_run and plan is None
+    if report_plan:
+        plan = WritePlan()
+    if plan is None:
+        logging.info(f"Initializing Neontology connection")
+        neon.init_neontology_connection()
+        graph_buffer = neon.GraphWriteBuffer(database=db_name)
+        filesystem_class = ClassroomCopilotFilesystem
+    else:
+        graph_buffer = plan.write_buffer(database=db_name)
+        filesystem_class = plan.filesystem
         
     # Initialize the filesystem manager
     # If entity_node is provided, we are creating a calendar for a school or user entity.
     # If entity_node is not provided, we are creating a local calendar for a database.
     if entity_node:
         if isinstance(entity_node, entity_neo.SchoolNode):
-            filesystem = ClassroomCopilotFilesystem(db_name, init_run_type="school")
+            filesystem = filesystem_class(db_name, init_run_type="school")
         elif isinstance(entity_node, entity_neo.UserNode):
-            filesystem = ClassroomCopilotFilesystem(db_name, init_run_type="user")
+            filesystem = filesystem_class(db_name, init_run_type="user")
         else:
             logging.warning(f"We need to handle this better...")
-            filesystem = ClassroomCopilotFilesystem(db_name, init_run_type="user")
+            filesystem = filesystem_class(db_name, init_run_type="user")
     else:
-        filesystem = ClassroomCopilotFilesystem(db_name)
+        filesystem = filesystem_class(db_name)
+    # Directories and tldraw files are collected and created together once the calendar is built
+    filesystem.begin_directory_plan()
     
     def create_tldraw_file_for_node(node, node_path):
         node_data = {
@@ -49,16 +447,6 @@ def create_calendar(db_name, start_date, end_date, attach_to_calendar_node=False
         logging.debug(f"Creating tldraw file for node: {node_data}")
         filesystem.create_default_tldraw_file(node_path, node_data)
 
-    created_years = {}
-    created_months = {}
-    created_weeks = {}
-    created_days = {}
-
-    last_year_node = None
-    last_month_node = None
-    last_week_node = None
-    last_day_node = None
-
     calendar_nodes = {
         'calendar_node': None,
         'calendar_year_nodes': [],
@@ -67,9 +455,7 @@ def create_calendar(db_name, start_date, end_date, attach_to_calendar_node=False
         'calendar_day_nodes': []
     }
 
-    calendar_type = None
     if attach_to_calendar_node and entity_node:
-        calendar_type = "entity_calendar"
         logging.info(f"Attaching calendar to entity node: {entity_node.unique_id}")
         entity_unique_id = entity_node.unique_id
         calendar_unique_id = f"Calendar_{entity_unique_id}"
@@ -82,238 +468,81 @@ def create_calendar(db_name, start_date, end_date, attach_to_calendar_node=False
             end_date=end_date,
             path=calendar_path
         )
-        neon.create_or_merge_neontology_node(calendar_node, database=db_name, operation='merge')
         calendar_nodes['calendar_node'] = calendar_node
-        logging.info(f"Calendar node created: {calendar_node.unique_id}")
         
         # Create a node tldraw file for the calendar node
         create_tldraw_file_for_node(calendar_node, calendar_path)
-        
-        import modules.database.schemas.relationships.entity_calendar_rels as entity_cal_rels
-
-        neon.create_or_merge_neontology_relationship(
-            entity_cal_rels.EntityHasCalendar(source=entity_node, target=calendar_node),
-            database=db_name,
-            operation='merge'
-        )
-        logging.info(f"Relationship created from {entity_node.unique_id} to {calendar_node.unique_id}")
     else:
         logging.error("Invalid combination of parameters for calendar creation.")
         raise ValueError("Invalid combination of parameters for calendar creation.")
-        
-    current_date = start_date
-    while current_date <= end_date:
-        year = current_date.year
-        month = current_date.month
-        day = current_date.day
-        iso_year, iso_week, iso_weekday = current_date.isocalendar()
-
-        # Create directories for year, month, week, and day
-        _, year_path = filesystem.create_year_directory(year, calendar_path)
-        _, month_path = filesystem.create_month_directory(year, month, calendar_path)
-        _, week_path = filesystem.create_week_directory(year, iso_week, calendar_path)
-        _, day_path = filesystem.create_day_directory(year, month, day, calendar_path)
-
-        if calendar_type == "local_db_calendar":
-            calendar_year_unique_id = f"CalendarYear_{db_name}_{year}"
-        elif calendar_type == "entity_calendar":
-            calendar_year_unique_id = f"CalendarYear_{entity_node.unique_id}_{year}"
-        else:
-            calendar_year_unique_id = f"CalendarYear_{year}"
 
-        if year not in created_years:
-            year_node = calendar_neo.CalendarYearNode(
-                unique_id=calendar_year_unique_id,
-                year=str(year),
-                path=year_path
-            )
-            neon.create_or_merge_neontology_node(year_node, database=db_name, operation='merge')
-            calendar_nodes['calendar_year_nodes'].append(year_node)
-            created_years[year] = year_node
-            create_tldraw_file_for_node(year_node, year_path)
-            logging.info(f"Year node created: {year_node.unique_id}")
-            
-            if attach_to_calendar_node:
-                neon.create_or_merge_neontology_relationship(
-                    cal_rels.CalendarIncludesYear(source=calendar_node, target=year_node),
-                    database=db_name,
-                    operation='merge'
-                )
-                logging.info(f"Relationship created from {calendar_node.unique_id} to {year_node.unique_id}")
-            if last_year_node:
-                neon.create_or_merge_neontology_relationship(
-                    cal_rels.YearFollowsYear(source=last_year_node, target=year_node),
-                    database=db_name,
-                    operation='merge'
-                )
-                logging.info(f"Relationship created from {last_year_node.unique_id} to {year_node.unique_id}")
-            last_year_node = year_node
+    template = get_calendar_template(start_date, end_date, time_chunk_node)
 
-        if calendar_type == "entity_calendar":
-            calendar_month_unique_id = f"CalendarMonth_{entity_node.unique_id}_{year}_{month}"
-        elif calendar_type == "local_db_calendar":
-            calendar_month_unique_id = f"CalendarMonth_{db_name}_{year}_{month}"
-        else:
-            calendar_month_unique_id = f"CalendarMonth_{year}_{month}"
-        
-        month_key = f"{year}-{month}"
-        if month_key not in created_months:
-            month_node = calendar_neo.CalendarMonthNode(
-                unique_id=calendar_month_unique_id,
-                year=str(year),
-                month=str(month),
-                month_name=datetime(year, month, 1).strftime('%B'),
-                path=month_path
+    # Re-key the template rows with this entity's id
+    nodes = {'calendar': {None: calendar_node}}
+    for group, node_class, prefix in CALENDAR_NODE_GROUPS:
+        nodes[group] = {
+            key: node_class(
+                unique_id=f"{prefix}_{entity_unique_id}_{key}",
+                path=os.path.join(calendar_path, rel_path),
+                **props
             )
-            neon.create_or_merge_neontology_node(month_node, database=db_name, operation='merge')
-            calendar_nodes['calendar_month_nodes'].append(month_node)
-            created_months[month_key] = month_node
-            create_tldraw_file_for_node(month_node, month_path)
-            logging.info(f"Month node created: {month_node.unique_id}")
-
-            # Check for the end of year transition for months
-            if last_month_node:
-                if int(month) == 1 and int(last_month_node.month) == 12 and int(last_month_node.year) == year - 1:
-                    neon.create_or_merge_neontology_relationship(
-                        cal_rels.MonthFollowsMonth(source=last_month_node, target=month_node),
-                        database=db_name,
-                        operation='merge'
-                    )
-                    logging.info(f"Relationship created from {last_month_node.unique_id} to {month_node.unique_id}")
-                elif int(month) == int(last_month_node.month) + 1:
-                    neon.create_or_merge_neontology_relationship(
-                        cal_rels.MonthFollowsMonth(source=last_month_node, target=month_node),
-                        database=db_name,
-                        operation='merge'
-                    )
-                    logging.info(f"Relationship created from {last_month_node.unique_id} to {month_node.unique_id}")
-            last_month_node = month_node
-
-            neon.create_or_merge_neontology_relationship(
-                cal_rels.YearIncludesMonth(source=year_node, target=month_node),
-                database=db_name,
-                operation='merge'
-            )
-            logging.info(f"Relationship created from {year_node.unique_id} to {month_node.unique_id}")
-        # Week node management
-        if calendar_type == "entity_calendar":
-            calendar_week_unique_id = f"CalendarWeek_{entity_node.unique_id}_{iso_year}_{iso_week}"
-        elif calendar_type == "local_db_calendar":
-            calendar_week_unique_id = f"CalendarWeek_{db_name}_{iso_year}_{iso_week}"
-        else:
-            calendar_week_unique_id = f"CalendarWeek_{iso_year}_{iso_week}"
-        week_key = f"{iso_year}-W{iso_week}"
-        if week_key not in created_weeks:
-            # Get the date of the first monday of the week
-            week_start_date = current_date - timedelta(days=current_date.weekday())
-            week_node = calendar_neo.CalendarWeekNode(
-                unique_id=calendar_week_unique_id,
-                start_date=week_start_date,
-                week_number=str(iso_week),
-                iso_week=f"{iso_year}-W{iso_week:02}",
-                path=week_path
-            )
-            neon.create_or_merge_neontology_node(week_node, database=db_name, operation='merge')
-            calendar_nodes['calendar_week_nodes'].append(week_node)
-            created_weeks[week_key] = week_node
-            create_tldraw_file_for_node(week_node, week_path)
-            logging.info(f"Week node created: {week_node.unique_id}")
-
-            if last_week_node and ((last_week_node.iso_week.split('-')[0] == str(iso_year) and int(last_week_node.week_number) == int(iso_week) - 1) or
-                                (last_week_node.iso_week.split('-')[0] != str(iso_year) and int(last_week_node.week_number) == 52 and int(iso_week) == 1)):
-                neon.create_or_merge_neontology_relationship(
-                    cal_rels.WeekFollowsWeek(source=last_week_node, target=week_node),
-                    database=db_name,
-                    operation='merge'
-                )
-                logging.info(f"Relationship created from {last_week_node.unique_id} to {week_node.unique_id}")
-            last_week_node = week_node
+            for key, rel_path, props in template['nodes'].get(group, ())
+        }
 
-            neon.create_or_merge_neontology_relationship(
-                cal_rels.YearIncludesWeek(source=year_node, target=week_node),
-                database=db_name,
-                operation='merge'
-            )
-            logging.info(f"Relationship created from {year_node.unique_id} to {week_node.unique_id}")
-        
-        # Day node management
-        if calendar_type == "entity_calendar":
-            calendar_day_unique_id = f"CalendarDay_{entity_node.unique_id}_{year}_{month}_{day}"
-        elif calendar_type == "local_db_calendar":
-            calendar_day_unique_id = f"CalendarDay_{db_name}_{year}_{month}_{day}"
-        else:
-            calendar_day_unique_id = f"CalendarDay_{year}_{month}_{day}"
-        day_key = f"{year}-{month}-{day}"
-        day_node = calendar_neo.CalendarDayNode(
-            unique_id=calendar_day_unique_id,
-            date=current_date,
-            day_of_week=current_date.strftime('%A'),
-            iso_day=f"{year}-{month:02}-{day:02}",
-            path=day_path
-        )
-        neon.create_or_merge_neontology_node(day_node, database=db_name, operation='merge')
-        calendar_nodes['calendar_day_nodes'].append(day_node)
-        created_days[day_key] = day_node
-        create_tldraw_file_for_node(day_node, day_path)
-        logging.info(f"Day node created: {day_node.unique_id}")
-
-        if last_day_node:
-            neon.create_or_merge_neontology_relationship(
-                cal_rels.DayFollowsDay(source=last_day_node, target=day_node),
-                database=db_name,
-                operation='merge'
-            )
-            logging.info(f"Relationship created from {last_day_node.unique_id} to {day_node.unique_id}")
-        last_day_node = day_node
+    for group in ('years', 'months', 'weeks', 'days'):
+        for node in nodes[group].values():
+            filesystem.create_directory(node.path)
+            create_tldraw_file_for_node(node, node.path)
+    # Paths nest (days sit inside months), so only the leaf directories are created
+    filesystem.create_planned_directories()
 
-        neon.create_or_merge_neontology_relationship(
-            cal_rels.MonthIncludesDay(source=month_node, target=day_node),
-            database=db_name,
-            operation='merge'
-        )
-        logging.info(f"Relationship created from {month_node.unique_id} to {day_node.unique_id}")
-        neon.create_or_merge_neontology_relationship(
-            cal_rels.WeekIncludesDay(source=week_node, target=day_node),
-            database=db_name,
-            operation='merge'
-        )
-        logging.info(f"Relationship created from {week_node.unique_id} to {day_node.unique_id}")
-        current_date += timedelta(days=1)
-    
+    calendar_nodes['calendar_year_nodes'] = list(nodes['years'].values())
+    calendar_nodes['calendar_month_nodes'] = list(nodes['months'].values())
+    calendar_nodes['calendar_week_nodes'] = list(nodes['weeks'].values())
+    calendar_nodes['calendar_day_nodes'] = list(nodes['days'].values())
     if time_chunk_node:
-        time_chunk_interval = time_chunk_node
-        # Get every calendar day node and create time chunks of length time_chunk_node minutes for the whole day
-        for day_node in calendar_nodes['calendar_day_nodes']:
-            day_path = day_node.path
-            total_time_chunks_in_day = (24 * 60) / time_chunk_interval
-            for i in range(total_time_chunks_in_day):
-                time_chunk_unique_id = f"CalendarTimeChunk_{day_node.unique_id}_{i}"
-                time_chunk_start_time = day_node.date.time() + timedelta(minutes=i * time_chunk_interval)
-                time_chunk_end_time = time_chunk_start_time + timedelta(minutes=time_chunk_interval)
-                time_chunk_node = calendar_neo.CalendarTimeChunkNode(
-                    unique_id=time_chunk_unique_id,
-                    start_time=time_chunk_start_time,
-                    end_time=time_chunk_end_time,
-                    path=day_path
-                )
-                neon.create_or_merge_neontology_node(time_chunk_node, database=db_name, operation='merge')
-                calendar_nodes['calendar_time_chunk_nodes'].append(time_chunk_node)
-                logging.info(f"Time chunk node created: {time_chunk_node.unique_id}")
-                # Create a relationship between the time chunk node and the day node
-                neon.create_or_merge_neontology_relationship(
-                    cal_rels.DayIncludesTimeChunk(source=day_node, target=time_chunk_node),
-                    database=db_name,
-                    operation='merge'
-                )
-                logging.info(f"Relationship created from {day_node.unique_id} to {time_chunk_node.unique_id}")
-                # Create sequential relationship between the time chunk nodes
-                if i > 0:
-                    neon.create_or_merge_neontology_relationship(
-                        cal_rels.TimeChunkFollowsTimeChunk(source=calendar_nodes['calendar_time_chunk_nodes'][i-1], target=time_chunk_node),
-                        database=db_name,
-                        operation='merge'
-                    )
-                    logging.info(f"Relationship created from {calendar_nodes['calendar_time_chunk_nodes'][i-1].unique_id} to {time_chunk_node.unique_id}")
-        
-    logging.info(f'Created calendar: {calendar_nodes["calendar_node"].unique_id}')
-    return calendar_nodes
\ No newline at end of file
+        calendar_nodes['calendar_time_chunk_nodes'] = list(nodes['time_chunks'].values())
+
+    logging.info(
+        f"Calendar rows built: {len(nodes['years'])} years, {len(nodes['months'])} months, "
+        f"{len(nodes['weeks'])} weeks, {len(nodes['days'])} days"
+    )
+
+    if not write:
+        # Already in the graph, e.g. when a timetable job resumes after its calendar stage
+        logging.info(f'Built calendar: {calendar_node.unique_id} without writing it to the graph')
+        if report_plan:
+            calendar_nodes['dry_run'] = plan.report()
+        return calendar_nodes
+
+    # A plan records through the buffer, which queues the same nodes the cypher engine creates
+    if engine == 'cypher' and plan is None:
+        counts = run_calendar_cypher(db_name, entity_node, calendar_node, start_date, end_date, time_chunk_node)
+        logging.info(f'Created calendar: {calendar_node.unique_id} in one statement ({counts})')
+        return calendar_nodes
+
+    graph_buffer.merge_node(calendar_node)
+    graph_buffer.merge_relationship(
+        entity_cal_rels.EntityHasCalendar(source=entity_node, target=calendar_node)
+    )
+    for group, _, _ in CALENDAR_NODE_GROUPS:
+        graph_buffer.merge_nodes(list(nodes[group].values()))
+
+    for rel_class, source_group, target_group, pairs in template['edges']:
+        for source_key, target_key in pairs:
+            graph_buffer.merge_relationship(
+                rel_class(source=nodes[source_group][source_key], target=nodes[target_group][target_key])
+            )
+
+    graph_buffer.flush()
+    if report_plan:
+        calendar_nodes['dry_run'] = plan.report()
+        logging.info(f'Planned calendar: {calendar_node.unique_id} ({calendar_nodes["dry_run"]})')
+        return calendar_nodes
+    logging.info(
+        f'Created calendar: {calendar_nodes["calendar_node"].unique_id} '
+        f'({graph_buffer.nodes_written} nodes, {graph_buffer.relationships_written} relationships '
+        f'in {graph_buffer.statements_run} statements)'
+    )
+    return calendar_nodes
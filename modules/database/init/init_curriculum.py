@@ -18,8 +18,24 @@ import modules.database.schemas.relationships.curricular_relationships as curric
 import modules.database.schemas.relationships.entity_relationships as ent_rels
 import modules.database.schemas.relationships.entity_curriculum_rels as ent_cur_rels
 from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem
+from modules.database.tools.import_index_tools import ImportIndex, IncrementalWriteBuffer, IncrementalFilesystem, hash_rows
+from modules.database.tools.dry_run_tools import WritePlan
 import modules.database.tools.neontology_tools as neon
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# Subjects are imported concurrently below the shared skeleton, bounded to keep load on Neo4j down
+CURRICULUM_IMPORT_MAX_WORKERS = int(os.getenv("CURRICULUM_IMPORT_MAX_WORKERS", 4))
+
+# Spreadsheet sheets whose rows are hashed for incremental re-imports, with each sheet's id column
+CURRICULUM_SHEET_IDS = {
+    'keystagesyllabuses': 'ID',
+    'yeargroupsyllabuses': 'ID',
+    'topics': 'TopicID',
+    'lessons': 'LessonID',
+    'statements': 'StatementID'
+}
 
 # Default values for nodes
 default_topic_values = {
@@ -49,12 +65,314 @@ def sort_year_groups(df):
     df['YearGroupNumeric'] = pd.to_numeric(df['YearGroup'], errors='coerce')
     return df.sort_values(by='YearGroupNumeric')
 
-def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
+def group_records(df, keys):
+    """Group a sheet's rows once so each level of the hierarchy is a dictionary lookup.
+
+    Returns a dict of group key -> list of row dicts, with rows kept in sheet order.
+    Rows with a missing key are left out, as they never matched the old equality filters.
+    """
+    records = df.to_dict('records')
+    return {
+        key: [records[i] for i in indices]
+        for key, indices in df.groupby(keys, sort=False).indices.items()
+    }
+
+def build_curriculum_index(dataframes):
+    """Pre-group the curriculum sheets by the columns create_curriculum looks them up on."""
+    yeargroupsyllabus_df = dataframes['yeargroupsyllabuses']
+    topic_df = dataframes['topics']
+    lesson_df = dataframes['lessons'].copy()
+    statement_df = dataframes['statements']
+
+    # Lessons are sorted by their lesson number (as a string) once, rather than per topic
+    lesson_df['Lesson'] = lesson_df['Lesson'].astype(str)
+    lesson_df = lesson_df.sort_values('Lesson', kind='stable')
+
+    return {
+        'year_group_syllabuses_by_key_stage': {
+            key_stage: sort_year_groups(group).to_dict('records')
+            for key_stage, group in yeargroupsyllabus_df.groupby('KeyStage', sort=False)
+        },
+        'topics': topic_df.to_dict('records'),
+        'topics_by_year_group_syllabus': group_records(topic_df, 'SyllabusYearID'),
+        'lessons_by_topic': group_records(lesson_df, ['TopicID', 'SyllabusSubject']),
+        'statements_by_lesson': group_records(statement_df, ['LessonID', 'SyllabusSubject']),
+    }
+
+def create_topic_subtree(topic_row, key_stage_syllabus_node, year_group_syllabus_node, curriculum_index,
+                         processed, node_library, graph_buffer, fs_handler, curriculum_db_name):
+    """Create a topic with its lessons and learning statements in the curriculum database."""
+    topic_subject = topic_row['SyllabusSubject']
+
+    _, topic_path = fs_handler.create_curriculum_topic_directory(key_stage_syllabus_node.path, topic_row['TopicID'])
+    logging.info(f"Created topic directory for {topic_path}")
+
+    topic_node_unique_id = f"Topic_{key_stage_syllabus_node.unique_id}_{topic_row['TopicID']}"
+    topic_node = neo_curriculum.TopicNode(
+        unique_id=topic_node_unique_id,
+        topic_id=topic_row['TopicID'],
+        topic_title=topic_row.get('TopicTitle', default_topic_values['topic_title']),
+        total_number_of_lessons_for_topic=str(topic_row.get('TotalNumberOfLessonsForTopic', default_topic_values['total_number_of_lessons_for_topic'])),
+        topic_type=topic_row.get('TopicType', default_topic_values['topic_type']),
+        topic_assessment_type=topic_row.get('TopicAssessmentType', default_topic_values['topic_assessment_type']),
+        path=topic_path
+    )
+    # Create topic node in curriculum database only
+    graph_buffer.merge_node(topic_node, database=curriculum_db_name)
+    fs_handler.create_default_tldraw_file(topic_node.path, topic_node.to_dict())
+    node_library['topic_nodes'][topic_row['TopicID']] = topic_node
+
+    # Link topic to key stage syllabus, and to the year group syllabus it was found under
+    graph_buffer.merge_relationship(
+        curricular_relationships.KeyStageSyllabusIncludesTopic(source=key_stage_syllabus_node, target=topic_node),
+        database=curriculum_db_name
+    )
+    if year_group_syllabus_node:
+        graph_buffer.merge_relationship(
+            curricular_relationships.YearGroupSyllabusIncludesTopic(source=year_group_syllabus_node, target=topic_node),
+            database=curriculum_db_name
+        )
+    logging.info(f"Created relationships for topic {topic_node_unique_id} with key stage syllabus {key_stage_syllabus_node.unique_id}")
+
+    # Process lessons for this topic only if not already processed
+    previous_lesson_node = None
+    for lesson_row in curriculum_index['lessons_by_topic'].get((topic_row['TopicID'], topic_subject), []):
+        if lesson_row['LessonID'] in processed['lessons']:
+            continue
+        processed['lessons'].add(lesson_row['LessonID'])
+
+        _, lesson_path = fs_handler.create_curriculum_lesson_directory(topic_path, lesson_row['LessonID'])
+        logging.info(f"Created lesson directory for {lesson_path}")
+
+        lesson_data = {
+            'unique_id': f"TopicLesson_{topic_node_unique_id}_{lesson_row['LessonID']}",
+            'topic_lesson_id': lesson_row['LessonID'],
+            'topic_lesson_title': lesson_row.get('LessonTitle', default_topic_lesson_values['topic_lesson_title']),
+            'topic_lesson_type': lesson_row.get('LessonType', default_topic_lesson_values['topic_lesson_type']),
+            'topic_lesson_length': str(lesson_row.get('SuggestedNumberOfPeriodsForLesson', default_topic_lesson_values['topic_lesson_length'])),
+            'topic_lesson_suggested_activities': lesson_row.get('SuggestedActivities', default_topic_lesson_values['topic_lesson_suggested_activities']),
+            'topic_lesson_skills_learned': lesson_row.get('SkillsLearned', default_topic_lesson_values['topic_lesson_skills_learned']),
+            'topic_lesson_weblinks': lesson_row.get('WebLinks', default_topic_lesson_values['topic_lesson_weblinks']),
+            'path': lesson_path
+        }
+        for key, value in lesson_data.items():
+            if pd.isna(value):
+                lesson_data[key] = default_topic_lesson_values.get(key, 'Null')
+
+        lesson_node = neo_curriculum.TopicLessonNode(**lesson_data)
+        # Create lesson node in curriculum database only
+        graph_buffer.merge_node(lesson_node, database=curriculum_db_name)
+        fs_handler.create_default_tldraw_file(lesson_node.path, lesson_node.to_dict())
+        node_library['topic_lesson_nodes'][lesson_row['LessonID']] = lesson_node
+
+        # Link lesson to topic
+        graph_buffer.merge_relationship(
+            curricular_relationships.TopicIncludesTopicLesson(source=topic_node, target=lesson_node),
+            database=curriculum_db_name
+        )
+        logging.info(f"Created lesson node {lesson_node.unique_id} and relationship with topic {topic_node.unique_id}")
+
+        # Create sequential relationships between lessons
+        if lesson_row['Lesson'].isdigit() and previous_lesson_node:
+            graph_buffer.merge_relationship(
+                curricular_relationships.TopicLessonFollowsTopicLesson(source=previous_lesson_node, target=lesson_node),
+                database=curriculum_db_name
+            )
+            logging.info(f"Created sequential relationship between lessons {previous_lesson_node.unique_id} and {lesson_node.unique_id}")
+        previous_lesson_node = lesson_node
+
+        # Process learning statements for this lesson only if not already processed
+        for statement_row in curriculum_index['statements_by_lesson'].get((lesson_row['LessonID'], topic_subject), []):
+            if statement_row['StatementID'] in processed['statements']:
+                continue
+            processed['statements'].add(statement_row['StatementID'])
+
+            _, statement_path = fs_handler.create_curriculum_learning_statement_directory(lesson_path, statement_row['StatementID'])
+
+            statement_data = {
+                'unique_id': f"LearningStatement_{lesson_node.unique_id}_{statement_row['StatementID']}",
+                'lesson_learning_statement_id': statement_row['StatementID'],
+                'lesson_learning_statement': statement_row.get('LearningStatement', default_learning_statement_values['lesson_learning_statement']),
+                'lesson_learning_statement_type': statement_row.get('StatementType', default_learning_statement_values['lesson_learning_statement_type']),
+                'path': statement_path
+            }
+            for key in statement_data:
+                if pd.isna(statement_data[key]):
+                    statement_data[key] = default_learning_statement_values.get(key, 'Null')
+
+            statement_node = neo_curriculum.LearningStatementNode(**statement_data)
+            # Create statement node in curriculum database only
+            graph_buffer.merge_node(statement_node, database=curriculum_db_name)
+            fs_handler.create_default_tldraw_file(statement_node.path, statement_node.to_dict())
+            node_library['statement_nodes'][statement_row['StatementID']] = statement_node
+
+            # Link learning statement to lesson
+            graph_buffer.merge_relationship(
+                curricular_relationships.LessonIncludesLearningStatement(source=lesson_node, target=statement_node),
+                database=curriculum_db_name
+            )
+            logging.info(f"Created learning statement node {statement_node.unique_id} and relationship with lesson {lesson_node.unique_id}")
+
+    return topic_node
+
+
+def build_subject_curriculum(subject, year_group_syllabus_rows, skeleton, curriculum_index,
+                             fs_handler, db_name, curriculum_db_name):
+    """Build one subject's year group syllabuses, topics, lessons and statements.
+
+    Subjects are independent below the shared skeleton (curriculum structure, departments,
+    subjects, key stages, key stage syllabuses and year groups), which must already be in
+    the graph, so each subject writes through its own buffer and can run in its own worker.
+
+    Returns:
+        tuple: (node library entries, processed topic/lesson/statement ids, database_stats)
+    """
+    logging.info(f"Building curriculum for subject {subject}")
+    graph_buffer = skeleton['new_write_buffer'](database=db_name)
+    replica_databases = (db_name, curriculum_db_name)
+    school_node = skeleton['school_node']
+    curriculum_node = skeleton['curriculum_node']
+    key_stage_syllabuses_by_subject = skeleton['key_stage_syllabuses_by_subject']
+
+    subject_library = {
+        'year_group_syllabus_nodes': {},
+        'topic_nodes': {},
+        'topic_lesson_nodes': {},
+        'statement_nodes': {}
+    }
+    processed = {'topics': set(), 'lessons': set(), 'statements': set()}
+    last_year_group_syllabus_node = None
+
+    for ks_value, yg_row in year_group_syllabus_rows:
+        key_stage = str(ks_value)
+        year_group = yg_row['YearGroup']
+        numeric_year_group = pd.to_numeric(year_group, errors='coerce')
+        year_group_node = skeleton['year_group_nodes'].get(int(numeric_year_group)) if pd.notna(numeric_year_group) else None
+        if not year_group_node:
+            logging.warning(f"No year group node found for year group {year_group}, skipping syllabus creation")
+            continue
+
+        # Create syllabus directory under curriculum structure
+        _, year_group_syllabus_path = fs_handler.create_curriculum_year_group_syllabus_directory(
+            curriculum_node.path,
+            yg_row['Subject'],
+            year_group,
+            yg_row['ID']
+        )
+        logging.info(f"Created year group syllabus directory for {year_group_syllabus_path}")
+
+        year_group_syllabus_node_unique_id = f"YearGroupSyllabus_{school_node.unique_id}_{yg_row['ID']}"
+        year_group_syllabus_node = neo_curriculum.YearGroupSyllabusNode(
+            unique_id=year_group_syllabus_node_unique_id,
+            yr_syllabus_id=yg_row['ID'],
+            yr_syllabus_name=yg_row['Title'],
+            yr_syllabus_year_group=str(yg_row['YearGroup']),
+            yr_syllabus_subject=yg_row['Subject'],
+            yr_syllabus_subject_code=yg_row['Subject'],
+            path=year_group_syllabus_path
+        )
+
+        # Create year group syllabus node in both databases but use same directory
+        graph_buffer.merge_node(year_group_syllabus_node, database=replica_databases)
+        fs_handler.create_default_tldraw_file(year_group_syllabus_node.path, year_group_syllabus_node.to_dict())
+        subject_library['year_group_syllabus_nodes'][yg_row['ID']] = year_group_syllabus_node
+
+        # Create sequential relationship between year group syllabuses in both databases
+        # Only create sequential relationship if this year group is higher than the last one
+        if last_year_group_syllabus_node:
+            last_year = pd.to_numeric(last_year_group_syllabus_node.yr_syllabus_year_group, errors='coerce')
+            current_year = pd.to_numeric(year_group_syllabus_node.yr_syllabus_year_group, errors='coerce')
+            if pd.notna(last_year) and pd.notna(current_year) and current_year > last_year:
+                graph_buffer.merge_relationship(
+                    curricular_relationships.YearGroupSyllabusFollowsYearGroupSyllabus(source=last_year_group_syllabus_node, target=year_group_syllabus_node),
+                    database=replica_databases
+                )
+                logging.info(f"Created sequential relationship between year group syllabuses {last_year_group_syllabus_node.unique_id} and {year_group_syllabus_node.unique_id}")
+        last_year_group_syllabus_node = year_group_syllabus_node
+
+        subject_node = skeleton['subject_nodes'].get(yg_row['Subject'])
+        if subject_node:
+            # Link to subject
+            graph_buffer.merge_relationship(
+                curricular_relationships.SubjectHasYearGroupSyllabus(source=subject_node, target=year_group_syllabus_node),
+                database=replica_databases
+            )
+            logging.info(f"Created relationship between subject {subject_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
+
+        # Link to year group
+        graph_buffer.merge_relationship(
+            curricular_relationships.YearGroupHasYearGroupSyllabus(source=year_group_node, target=year_group_syllabus_node),
+            database=replica_databases
+        )
+        logging.info(f"Created relationship between year group {year_group_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
+
+        # Link to the key stage syllabus for the same subject and key stage if it exists
+        key_stage_syllabus_node = key_stage_syllabuses_by_subject.get((yg_row['Subject'], key_stage))
+        if key_stage_syllabus_node:
+            graph_buffer.merge_relationship(
+                curricular_relationships.KeyStageSyllabusIncludesYearGroupSyllabus(source=key_stage_syllabus_node, target=year_group_syllabus_node),
+                database=replica_databases
+            )
+            logging.info(f"Created relationship between key stage syllabus {key_stage_syllabus_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
+
+        # Process topics for this year group syllabus only if not already processed
+        for topic_row in curriculum_index['topics_by_year_group_syllabus'].get(yg_row['ID'], []):
+            if topic_row['TopicID'] in processed['topics']:
+                continue
+            processed['topics'].add(topic_row['TopicID'])
+
+            matching_syllabus_node = key_stage_syllabuses_by_subject.get(
+                (topic_row['SyllabusSubject'], str(topic_row['SyllabusKeyStage']))
+            )
+            if not matching_syllabus_node:
+                logging.warning(f"No key stage syllabus node found for subject {topic_row['SyllabusSubject']} and key stage {topic_row['SyllabusKeyStage']}, skipping topic creation")
+                continue
+
+            create_topic_subtree(
+                topic_row, matching_syllabus_node, year_group_syllabus_node, curriculum_index,
+                processed, subject_library, graph_buffer, fs_handler, curriculum_db_name
+            )
+
+    graph_buffer.flush()
+    logging.info(f"Built curriculum for subject {subject}")
+    return subject_library, processed, graph_buffer.database_stats
+
+
+def create_curriculum(dataframes, db_name, curriculum_db_name, school_node, max_workers=None,
+                      incremental=False, prune=False, dry_run=False):
+    """Import a school's curriculum workbook.
+
+    The shared skeleton is written first, then each subject's subtree is built by
+    build_subject_curriculum on up to max_workers threads (CURRICULUM_IMPORT_MAX_WORKERS
+    by default, 1 imports the subjects one after another).
+
+    Every import records row hashes, node fingerprints and relationships in an ImportIndex
+    under the curriculum directory. With incremental, only rows which are new or changed
+    since the last import are written; with prune, nodes and relationships the workbook
+    no longer produces are deleted. The change summary is returned as 'import_summary'.
+
+    With dry_run nothing is written, pruned or saved: the import is planned against a
+    WritePlan and its report is returned under 'dry_run'. With incremental, the report
+    only counts what the import would rewrite.
+    """
     
-    fs_handler = ClassroomCopilotFilesystem(db_name, init_run_type="school")
+    plan = WritePlan() if dry_run else None
+    fs_handler = (plan.filesystem if plan else ClassroomCopilotFilesystem)(db_name, init_run_type="school")
+    _, curriculum_path = fs_handler.create_school_curriculum_directory(school_node.path)
+    import_index = ImportIndex(curriculum_path, skip_unchanged=incremental)
+    for sheet, id_column in CURRICULUM_SHEET_IDS.items():
+        import_index.record_rows(sheet, hash_rows(dataframes[sheet], id_column))
+    fs_handler = IncrementalFilesystem(fs_handler, import_index)
+    # Directories and tldraw files are collected, from every subject worker, and created together at the end
+    fs_handler.begin_directory_plan()
     
-    logging.info(f"Initialising neo4j connection...")
-    neon.init_neontology_connection()
+    if plan is None:
+        logging.info(f"Initialising neo4j connection...")
+        neon.init_neontology_connection()
+    new_write_buffer = partial(plan.incremental_write_buffer if plan else IncrementalWriteBuffer, import_index)
+    graph_buffer = new_write_buffer(database=db_name)
+    # Shared curriculum nodes and relationships are built once and replicated to both databases
+    replica_databases = (db_name, curriculum_db_name)
     
     keystagesyllabus_df = dataframes['keystagesyllabuses']
     yeargroupsyllabus_df = dataframes['yeargroupsyllabuses']
@@ -81,7 +399,6 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
     last_key_stage_node = None
     
     # Create Curriculum and Pastoral nodes and relationships with School in both databases
-    _, curriculum_path = fs_handler.create_school_curriculum_directory(school_node.path)
     _, pastoral_path = fs_handler.create_school_pastoral_directory(school_node.path)
     
     # Create Department Structure node
@@ -91,14 +408,13 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
         path=os.path.join(school_node.path, "departments")
     )
     # Create in school database only
-    neon.create_or_merge_neontology_node(department_structure_node, database=db_name, operation='merge')
+    graph_buffer.merge_node(department_structure_node)
     fs_handler.create_default_tldraw_file(department_structure_node.path, department_structure_node.to_dict())
     node_library['department_structure_node'] = department_structure_node
     
     # Link Department Structure to School
-    neon.create_or_merge_neontology_relationship(
-        ent_rels.SchoolHasDepartmentStructure(source=school_node, target=department_structure_node),
-        database=db_name, operation='merge'
+    graph_buffer.merge_relationship(
+        ent_rels.SchoolHasDepartmentStructure(source=school_node, target=department_structure_node)
     )
     logging.info(f"Created department structure node and linked to school")
     
@@ -108,14 +424,13 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
         path=curriculum_path
     )
     # Create in school database only
-    neon.create_or_merge_neontology_node(curriculum_node, database=db_name, operation='merge')
+    graph_buffer.merge_node(curriculum_node)
     fs_handler.create_default_tldraw_file(curriculum_node.path, curriculum_node.to_dict())
     node_library['curriculum_node'] = curriculum_node
     
     # Create relationship in school database only
-    neon.create_or_merge_neontology_relationship(
-        ent_cur_rels.SchoolHasCurriculumStructure(source=school_node, target=curriculum_node),
-        database=db_name, operation='merge'
+    graph_buffer.merge_relationship(
+        ent_cur_rels.SchoolHasCurriculumStructure(source=school_node, target=curriculum_node)
     )
     logging.info(f"Created curriculum node and relationship with school")
     
@@ -124,12 +439,11 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
         unique_id=pastoral_structure_node_unique_id,
         path=pastoral_path
     )
-    neon.create_or_merge_neontology_node(pastoral_node, database=db_name, operation='merge')
+    graph_buffer.merge_node(pastoral_node)
     fs_handler.create_default_tldraw_file(pastoral_node.path, pastoral_node.to_dict())
     node_library['pastoral_node'] = pastoral_node
-    neon.create_or_merge_neontology_relationship(
-        ent_cur_rels.SchoolHasPastoralStructure(source=school_node, target=pastoral_node),
-        database=db_name, operation='merge'
+    graph_buffer.merge_relationship(
+        ent_cur_rels.SchoolHasPastoralStructure(source=school_node, target=pastoral_node)
     )
     logging.info(f"Created pastoral node and relationship with school")
     
@@ -147,14 +461,13 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
             path=department_path
         )
         # Create department in school database only
-        neon.create_or_merge_neontology_node(department_node, database=db_name, operation='merge')
+        graph_buffer.merge_node(department_node)
         fs_handler.create_default_tldraw_file(department_node.path, department_node.to_dict())
         node_library['department_nodes'][department_name] = department_node
         
         # Link department to department structure in school database
-        neon.create_or_merge_neontology_relationship(
-            ent_rels.DepartmentStructureHasDepartment(source=department_structure_node, target=department_node),
-            database=db_name, operation='merge'
+        graph_buffer.merge_relationship(
+            ent_rels.DepartmentStructureHasDepartment(source=department_structure_node, target=department_node)
         )
         logging.info(f"Created department node for {department_name} and linked to department structure")
     
@@ -187,15 +500,13 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
             path=subject_path
         )
         # Create subject in both databases
-        neon.create_or_merge_neontology_node(subject_node, database=db_name, operation='merge')
-        neon.create_or_merge_neontology_node(subject_node, database=curriculum_db_name, operation='merge')
+        graph_buffer.merge_node(subject_node, database=replica_databases)
         fs_handler.create_default_tldraw_file(subject_node.path, subject_node.to_dict())
         node_library['subject_nodes'][subject_row['Subject']] = subject_node
         
         # Link subject to department in school database only
-        neon.create_or_merge_neontology_relationship(
-            ent_rels.DepartmentManagesSubject(source=department_node, target=subject_node),
-            database=db_name, operation='merge'
+        graph_buffer.merge_relationship(
+            ent_rels.DepartmentManagesSubject(source=department_node, target=subject_node)
         )
         logging.info(f"Created subject node for {subject_row['Subject']} and linked to department {subject_row['Department']}")
     
@@ -211,14 +522,13 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
                 department_name=unassigned_dept_name,
                 path=dept_path
             )
-            neon.create_or_merge_neontology_node(department_node, database=db_name, operation='merge')
+            graph_buffer.merge_node(department_node)
             fs_handler.create_default_tldraw_file(department_node.path, department_node.to_dict())
             node_library['department_nodes'][unassigned_dept_name] = department_node
             
             # Link unassigned department to department structure
-            neon.create_or_merge_neontology_relationship(
-                ent_rels.DepartmentStructureHasDepartment(source=department_structure_node, target=department_node),
-                database=db_name, operation='merge'
+            graph_buffer.merge_relationship(
+                ent_rels.DepartmentStructureHasDepartment(source=department_structure_node, target=department_node)
             )
             logging.info(f"Created unassigned department node and linked to department structure")
         
@@ -234,18 +544,16 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
             path=subject_path
         )
         # Create subject in both databases
-        neon.create_or_merge_neontology_node(subject_node, database=db_name, operation='merge')
-        neon.create_or_merge_neontology_node(subject_node, database=curriculum_db_name, operation='merge')
+        graph_buffer.merge_node(subject_node, database=replica_databases)
         fs_handler.create_default_tldraw_file(subject_node.path, subject_node.to_dict())
         node_library['subject_nodes'][subject_row['Subject']] = subject_node
         
         # Link subject to unassigned department in school database only
-        neon.create_or_merge_neontology_relationship(
+        graph_buffer.merge_relationship(
             ent_rels.DepartmentManagesSubject(
                 source=node_library['department_nodes'][unassigned_dept_name], 
                 target=subject_node
-            ),
-            database=db_name, operation='merge'
+            )
         )
         logging.warning(f"Created subject node for {subject_row['Subject']} in unassigned department")
     
@@ -254,21 +562,23 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
     last_key_stage_node = None
     # Track last syllabus nodes per subject
     last_key_stage_syllabus_nodes = {}  # Dictionary to track last key stage syllabus node per subject
-    last_year_group_syllabus_nodes = {}  # Dictionary to track last year group syllabus node per subject
-    topics_processed = set()  # Track which topics have been processed
-    lessons_processed = set()  # Track which lessons have been processed
-    statements_processed = set()  # Track which statements have been processed
-    
+    processed = {
+        'topics': set(),  # Track which topics have been processed
+        'lessons': set(),  # Track which lessons have been processed
+        'statements': set()  # Track which statements have been processed
+    }
+    curriculum_index = build_curriculum_index(dataframes)
+
     # First create all key stage nodes and key stage syllabus nodes
-    for index, ks_row in keystagesyllabus_df.sort_values('KeyStage').iterrows():
+    for ks_row in keystagesyllabus_df.sort_values('KeyStage').to_dict('records'):
         key_stage = str(ks_row['KeyStage'])
         logging.debug(f"Processing key stage syllabus row - Subject: {ks_row['Subject']}, Key Stage: {key_stage}")
-        
+
         subject_node = node_library['subject_nodes'].get(ks_row['Subject'])
         if not subject_node:
             logging.warning(f"No subject node found for subject {ks_row['Subject']}")
             continue
-            
+
         if key_stage not in key_stage_nodes_created:
             key_stage_node_unique_id = f"KeyStage_{curriculum_node.unique_id}_KStg{key_stage}"
             key_stage_node = neo_curriculum.KeyStageNode(
@@ -278,28 +588,22 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
                 path=os.path.join(curriculum_node.path, "key_stages", f"KS{key_stage}")
             )
             # Create key stage node in both databases
-            neon.create_or_merge_neontology_node(key_stage_node, database=db_name, operation='merge')
-            neon.create_or_merge_neontology_node(key_stage_node, database=curriculum_db_name, operation='merge')
+            graph_buffer.merge_node(key_stage_node, database=replica_databases)
             fs_handler.create_default_tldraw_file(key_stage_node.path, key_stage_node.to_dict())
             key_stage_nodes_created[key_stage] = key_stage_node
             node_library['key_stage_nodes'][key_stage] = key_stage_node
-            
+
             # Create relationship with curriculum structure in school database only
-            neon.create_or_merge_neontology_relationship(
-                curricular_relationships.CurriculumStructureIncludesKeyStage(source=curriculum_node, target=key_stage_node),
-                database=db_name, operation='merge'
+            graph_buffer.merge_relationship(
+                curricular_relationships.CurriculumStructureIncludesKeyStage(source=curriculum_node, target=key_stage_node)
             )
             logging.info(f"Created key stage node {key_stage_node_unique_id} and relationship with curriculum structure")
 
             # Create sequential relationship between key stages in both databases
             if last_key_stage_node:
-                neon.create_or_merge_neontology_relationship(
+                graph_buffer.merge_relationship(
                     curricular_relationships.KeyStageFollowsKeyStage(source=last_key_stage_node, target=key_stage_node),
-                    database=db_name, operation='merge'
-                )
-                neon.create_or_merge_neontology_relationship(
-                    curricular_relationships.KeyStageFollowsKeyStage(source=last_key_stage_node, target=key_stage_node),
-                    database=curriculum_db_name, operation='merge'
+                    database=replica_databases
                 )
                 logging.info(f"Created sequential relationship between key stages {last_key_stage_node.unique_id} and {key_stage_node.unique_id}")
             last_key_stage_node = key_stage_node
@@ -312,7 +616,7 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
             ks_row['ID']
         )
         logging.debug(f"Creating key stage syllabus node for {ks_row['Subject']} KS{key_stage} with ID {ks_row['ID']}")
-        
+
         key_stage_syllabus_node_unique_id = f"KeyStageSyllabus_{curriculum_node.unique_id}_{ks_row['Title'].replace(' ', '')}"
         key_stage_syllabus_node = neo_curriculum.KeyStageSyllabusNode(
             unique_id=key_stage_syllabus_node_unique_id,
@@ -324,60 +628,52 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
             path=key_stage_syllabus_path
         )
         # Create key stage syllabus node in both databases
-        neon.create_or_merge_neontology_node(key_stage_syllabus_node, database=db_name, operation='merge')
-        neon.create_or_merge_neontology_node(key_stage_syllabus_node, database=curriculum_db_name, operation='merge')
+        graph_buffer.merge_node(key_stage_syllabus_node, database=replica_databases)
         fs_handler.create_default_tldraw_file(key_stage_syllabus_node.path, key_stage_syllabus_node.to_dict())
         node_library['key_stage_syllabus_nodes'][ks_row['ID']] = key_stage_syllabus_node
         logging.debug(f"Created key stage syllabus node {key_stage_syllabus_node_unique_id} for {ks_row['Subject']} KS{key_stage}")
-        
+
         # Link key stage syllabus to its subject in both databases
-        if subject_node:
-            neon.create_or_merge_neontology_relationship(
-                curricular_relationships.SubjectHasKeyStageSyllabus(source=subject_node, target=key_stage_syllabus_node),
-                database=db_name, operation='merge'
-            )
-            neon.create_or_merge_neontology_relationship(
-                curricular_relationships.SubjectHasKeyStageSyllabus(source=subject_node, target=key_stage_syllabus_node),
-                database=curriculum_db_name, operation='merge'
-            )
-            logging.info(f"Created relationship between subject {subject_node.unique_id} and key stage syllabus {key_stage_syllabus_node.unique_id}")
-        
+        graph_buffer.merge_relationship(
+            curricular_relationships.SubjectHasKeyStageSyllabus(source=subject_node, target=key_stage_syllabus_node),
+            database=replica_databases
+        )
+        logging.info(f"Created relationship between subject {subject_node.unique_id} and key stage syllabus {key_stage_syllabus_node.unique_id}")
+
         # Link key stage syllabus to its key stage in both databases
         key_stage_node = key_stage_nodes_created.get(key_stage)
         if key_stage_node:
-            neon.create_or_merge_neontology_relationship(
-                curricular_relationships.KeyStageIncludesKeyStageSyllabus(source=key_stage_node, target=key_stage_syllabus_node),
-                database=db_name, operation='merge'
-            )
-            neon.create_or_merge_neontology_relationship(
+            graph_buffer.merge_relationship(
                 curricular_relationships.KeyStageIncludesKeyStageSyllabus(source=key_stage_node, target=key_stage_syllabus_node),
-                database=curriculum_db_name, operation='merge'
+                database=replica_databases
             )
             logging.info(f"Created relationship between key stage {key_stage_node.unique_id} and key stage syllabus {key_stage_syllabus_node.unique_id}")
-        
+
         # Create sequential relationship between key stage syllabuses in both databases
         last_key_stage_syllabus_node = last_key_stage_syllabus_nodes.get(ks_row['Subject'])
         if last_key_stage_syllabus_node:
-            neon.create_or_merge_neontology_relationship(
-                curricular_relationships.KeyStageSyllabusFollowsKeyStageSyllabus(source=last_key_stage_syllabus_node, target=key_stage_syllabus_node),
-                database=db_name, operation='merge'
-            )
-            neon.create_or_merge_neontology_relationship(
+            graph_buffer.merge_relationship(
                 curricular_relationships.KeyStageSyllabusFollowsKeyStageSyllabus(source=last_key_stage_syllabus_node, target=key_stage_syllabus_node),
-                database=curriculum_db_name, operation='merge'
+                database=replica_databases
             )
             logging.info(f"Created sequential relationship between key stage syllabuses {last_key_stage_syllabus_node.unique_id} and {key_stage_syllabus_node.unique_id}")
         last_key_stage_syllabus_nodes[ks_row['Subject']] = key_stage_syllabus_node
-    
-    # Now process year groups and their syllabuses
-    for index, ks_row in keystagesyllabus_df.sort_values('KeyStage').iterrows():
-        key_stage = str(ks_row['KeyStage'])
-        related_yeargroups = sort_year_groups(yeargroupsyllabus_df[yeargroupsyllabus_df['KeyStage'] == ks_row['KeyStage']])
-        
-        logging.info(f"Processing year groups for key stage {key_stage}")
-        for yg_index, yg_row in related_yeargroups.iterrows():
+
+    # Index the key stage syllabuses by (subject, key stage), keeping the first one created for each
+    key_stage_syllabuses_by_subject = {}
+    for syllabus_node in node_library['key_stage_syllabus_nodes'].values():
+        key_stage_syllabuses_by_subject.setdefault(
+            (syllabus_node.ks_syllabus_subject, syllabus_node.ks_syllabus_key_stage), syllabus_node
+        )
+
+    # Now create the year groups, walking the key stages in order
+    key_stage_values = keystagesyllabus_df.sort_values('KeyStage')['KeyStage'].unique()
+    year_group_syllabus_rows = {}  # Subject -> [(key stage, year group syllabus row), ...] in processing order
+    for ks_value in key_stage_values:
+        logging.info(f"Processing year groups for key stage {ks_value}")
+        for yg_row in curriculum_index['year_group_syllabuses_by_key_stage'].get(ks_value, []):
+            year_group_syllabus_rows.setdefault(yg_row['Subject'], []).append((ks_value, yg_row))
             year_group = yg_row['YearGroup']
-            subject_code = yg_row['SubjectCode']
             numeric_year_group = pd.to_numeric(year_group, errors='coerce')
 
             if pd.notna(numeric_year_group):
@@ -386,7 +682,7 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
                     # Create year group directory under pastoral structure
                     _, year_group_path = fs_handler.create_pastoral_year_group_directory(pastoral_node.path, year_group)
                     logging.info(f"Created year group directory for {year_group_path}")
-                    
+
                     year_group_node_unique_id = f"YearGroup_{school_node.unique_id}_YGrp{numeric_year_group}"
                     year_group_node = neo_curriculum.YearGroupNode(
                         unique_id=year_group_node_unique_id,
@@ -395,408 +691,109 @@ def create_curriculum(dataframes, db_name, curriculum_db_name, school_node):
                         path=year_group_path
                     )
                     # Create year group node in both databases but use same directory
-                    neon.create_or_merge_neontology_node(year_group_node, database=db_name, operation='merge')
-                    neon.create_or_merge_neontology_node(year_group_node, database=curriculum_db_name, operation='merge')
+                    graph_buffer.merge_node(year_group_node, database=replica_databases)
                     fs_handler.create_default_tldraw_file(year_group_node.path, year_group_node.to_dict())
-                    
+
                     # Create sequential relationship between year groups in both databases
                     if last_year_group_node:
-                        neon.create_or_merge_neontology_relationship(
-                            curricular_relationships.YearGroupFollowsYearGroup(source=last_year_group_node, target=year_group_node),
-                            database=db_name, operation='merge'
-                        )
-                        neon.create_or_merge_neontology_relationship(
+                        graph_buffer.merge_relationship(
                             curricular_relationships.YearGroupFollowsYearGroup(source=last_year_group_node, target=year_group_node),
-                            database=curriculum_db_name, operation='merge'
+                            database=replica_databases
                         )
                         logging.info(f"Created sequential relationship between year groups {last_year_group_node.unique_id} and {year_group_node.unique_id} across key stages")
                     last_year_group_node = year_group_node
-                    
+
                     # Create relationship with Pastoral Structure in school database only
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.PastoralStructureIncludesYearGroup(source=pastoral_node, target=year_group_node),
-                        database=db_name, operation='merge'
+                    graph_buffer.merge_relationship(
+                        curricular_relationships.PastoralStructureIncludesYearGroup(source=pastoral_node, target=year_group_node)
                     )
                     logging.info(f"Created year group node {year_group_node_unique_id} and relationship with pastoral structure")
-                    
+
                     year_group_nodes_created[numeric_year_group] = year_group_node
                     node_library['year_group_nodes'][str(numeric_year_group)] = year_group_node
 
-            # Create year group syllabus nodes in both databases
-            year_group_node = year_group_nodes_created.get(numeric_year_group)
-            if year_group_node:
-                # Create syllabus directory under curriculum structure
-                _, year_group_syllabus_path = fs_handler.create_curriculum_year_group_syllabus_directory(
-                    curriculum_node.path,
-                    yg_row['Subject'],
-                    year_group,
-                    yg_row['ID']
-                )
-                logging.info(f"Created year group syllabus directory for {year_group_syllabus_path}")
-                
-                year_group_syllabus_node_unique_id = f"YearGroupSyllabus_{school_node.unique_id}_{yg_row['ID']}"
-                year_group_syllabus_node = neo_curriculum.YearGroupSyllabusNode(
-                    unique_id=year_group_syllabus_node_unique_id,
-                    yr_syllabus_id=yg_row['ID'],
-                    yr_syllabus_name=yg_row['Title'],
-                    yr_syllabus_year_group=str(yg_row['YearGroup']),
-                    yr_syllabus_subject=yg_row['Subject'],
-                    yr_syllabus_subject_code=yg_row['Subject'],
-                    path=year_group_syllabus_path
-                )
-                
-                # Create year group syllabus node in both databases but use same directory
-                neon.create_or_merge_neontology_node(year_group_syllabus_node, database=db_name, operation='merge')
-                neon.create_or_merge_neontology_node(year_group_syllabus_node, database=curriculum_db_name, operation='merge')
-                fs_handler.create_default_tldraw_file(year_group_syllabus_node.path, year_group_syllabus_node.to_dict())
-                node_library['year_group_syllabus_nodes'][yg_row['ID']] = year_group_syllabus_node
-                
-                # Create sequential relationship between year group syllabuses in both databases
-                last_year_group_syllabus_node = last_year_group_syllabus_nodes.get(yg_row['Subject'])
-                # Only create sequential relationship if this year group is higher than the last one
-                if last_year_group_syllabus_node:
-                    last_year = pd.to_numeric(last_year_group_syllabus_node.yr_syllabus_year_group, errors='coerce')
-                    current_year = pd.to_numeric(year_group_syllabus_node.yr_syllabus_year_group, errors='coerce')
-                    if pd.notna(last_year) and pd.notna(current_year) and current_year > last_year:
-                        neon.create_or_merge_neontology_relationship(
-                            curricular_relationships.YearGroupSyllabusFollowsYearGroupSyllabus(source=last_year_group_syllabus_node, target=year_group_syllabus_node),
-                            database=db_name, operation='merge'
-                        )
-                        neon.create_or_merge_neontology_relationship(
-                            curricular_relationships.YearGroupSyllabusFollowsYearGroupSyllabus(source=last_year_group_syllabus_node, target=year_group_syllabus_node),
-                            database=curriculum_db_name, operation='merge'
-                        )
-                        logging.info(f"Created sequential relationship between year group syllabuses {last_year_group_syllabus_node.unique_id} and {year_group_syllabus_node.unique_id}")
-                last_year_group_syllabus_nodes[yg_row['Subject']] = year_group_syllabus_node
-                
-                # Create relationships in both databases using MATCH to avoid cartesian products
-                subject_node = node_library['subject_nodes'].get(yg_row['Subject'])
-                if subject_node:
-                    # Link to subject
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.SubjectHasYearGroupSyllabus(source=subject_node, target=year_group_syllabus_node),
-                        database=db_name, operation='merge'
-                    )
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.SubjectHasYearGroupSyllabus(source=subject_node, target=year_group_syllabus_node),
-                        database=curriculum_db_name, operation='merge'
-                    )
-                    logging.info(f"Created relationship between subject {subject_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
-                
-                # Link to year group
-                neon.create_or_merge_neontology_relationship(
-                    curricular_relationships.YearGroupHasYearGroupSyllabus(source=year_group_node, target=year_group_syllabus_node),
-                    database=db_name, operation='merge'
-                )
-                neon.create_or_merge_neontology_relationship(
-                    curricular_relationships.YearGroupHasYearGroupSyllabus(source=year_group_node, target=year_group_syllabus_node),
-                    database=curriculum_db_name, operation='merge'
-                )
-                logging.info(f"Created relationship between year group {year_group_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
-                
-                # Link to key stage syllabus if it exists for the same subject
-                key_stage_syllabus_node = node_library['key_stage_syllabus_nodes'].get(ks_row['ID'])
-                if key_stage_syllabus_node and yg_row['Subject'] == ks_row['Subject']:
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.KeyStageSyllabusIncludesYearGroupSyllabus(source=key_stage_syllabus_node, target=year_group_syllabus_node),
-                        database=db_name, operation='merge'
-                    )
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.KeyStageSyllabusIncludesYearGroupSyllabus(source=key_stage_syllabus_node, target=year_group_syllabus_node),
-                        database=curriculum_db_name, operation='merge'
-                    )
-                    logging.info(f"Created relationship between key stage syllabus {key_stage_syllabus_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
-
-                # Process topics for this year group syllabus only if not already processed
-                topics_for_syllabus = topic_df[topic_df['SyllabusYearID'] == yg_row['ID']]
-                for _, topic_row in topics_for_syllabus.iterrows():
-                    if topic_row['TopicID'] in topics_processed:
-                        continue
-                    topics_processed.add(topic_row['TopicID'])
-                    
-                    # Get the correct subject from the topic row
-                    topic_subject = topic_row['SyllabusSubject']
-                    topic_key_stage = topic_row['SyllabusKeyStage']
-                    
-                    logging.debug(f"Processing topic {topic_row['TopicID']} for subject {topic_subject} and key stage {topic_key_stage}")
-                    logging.debug(f"Available key stage syllabus nodes: {[node.ks_syllabus_subject + '_KS' + node.ks_syllabus_key_stage for node in node_library['key_stage_syllabus_nodes'].values()]}")
-                    
-                    # Find the key stage syllabus node by iterating through all nodes
-                    matching_syllabus_node = None
-                    for syllabus_node in node_library['key_stage_syllabus_nodes'].values():
-                        logging.debug(f"Checking syllabus node - Subject: {syllabus_node.ks_syllabus_subject}, Key Stage: {syllabus_node.ks_syllabus_key_stage}")
-                        logging.debug(f"Comparing with - Subject: {topic_subject}, Key Stage: {str(topic_key_stage)}")
-                        logging.debug(f"Types - Node Subject: {type(syllabus_node.ks_syllabus_subject)}, Topic Subject: {type(topic_subject)}")
-                        logging.debug(f"Types - Node Key Stage: {type(syllabus_node.ks_syllabus_key_stage)}, Topic Key Stage: {type(str(topic_key_stage))}")
-                        
-                        if (syllabus_node.ks_syllabus_subject == topic_subject and 
-                            syllabus_node.ks_syllabus_key_stage == str(topic_key_stage)):
-                            matching_syllabus_node = syllabus_node
-                            logging.debug(f"Found matching syllabus node: {syllabus_node.unique_id}")
-                            break
-                    
-                    if not matching_syllabus_node:
-                        logging.warning(f"No key stage syllabus node found for subject {topic_subject} and key stage {topic_key_stage}, skipping topic creation")
-                        continue
-                    
-                    _, topic_path = fs_handler.create_curriculum_topic_directory(matching_syllabus_node.path, topic_row['TopicID'])
-                    logging.info(f"Created topic directory for {topic_path}")
-                    
-                    topic_node_unique_id = f"Topic_{matching_syllabus_node.unique_id}_{topic_row['TopicID']}"
-                    topic_node = neo_curriculum.TopicNode(
-                        unique_id=topic_node_unique_id,
-                        topic_id=topic_row['TopicID'],
-                        topic_title=topic_row.get('TopicTitle', default_topic_values['topic_title']),
-                        total_number_of_lessons_for_topic=str(topic_row.get('TotalNumberOfLessonsForTopic', default_topic_values['total_number_of_lessons_for_topic'])),
-                        topic_type=topic_row.get('TopicType', default_topic_values['topic_type']),
-                        topic_assessment_type=topic_row.get('TopicAssessmentType', default_topic_values['topic_assessment_type']),
-                        path=topic_path
-                    )
-                    # Create topic node in curriculum database only
-                    neon.create_or_merge_neontology_node(topic_node, database=curriculum_db_name, operation='merge')
-                    fs_handler.create_default_tldraw_file(topic_node.path, topic_node.to_dict())
-                    node_library['topic_nodes'][topic_row['TopicID']] = topic_node
-                    
-                    # Link topic to key stage syllabus as well as year group syllabus
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.KeyStageSyllabusIncludesTopic(source=matching_syllabus_node, target=topic_node),
-                        database=curriculum_db_name, operation='merge'
-                    )
-                    neon.create_or_merge_neontology_relationship(
-                        curricular_relationships.YearGroupSyllabusIncludesTopic(source=year_group_syllabus_node, target=topic_node),
-                        database=curriculum_db_name, operation='merge'
-                    )
-                    logging.info(f"Created relationships between topic {topic_node_unique_id} and key stage syllabus {matching_syllabus_node.unique_id} and year group syllabus {year_group_syllabus_node_unique_id}")
-
-                    # Process lessons for this topic only if not already processed
-                    lessons_for_topic = lesson_df[
-                        (lesson_df['TopicID'] == topic_row['TopicID']) & 
-                        (lesson_df['SyllabusSubject'] == topic_subject)
-                    ].copy()
-                    lessons_for_topic.loc[:, 'Lesson'] = lessons_for_topic['Lesson'].astype(str)
-                    lessons_for_topic = lessons_for_topic.sort_values('Lesson')
-
-                    previous_lesson_node = None
-                    for _, lesson_row in lessons_for_topic.iterrows():
-                        if lesson_row['LessonID'] in lessons_processed:
-                            continue
-                        lessons_processed.add(lesson_row['LessonID'])
-                        
-                        _, lesson_path = fs_handler.create_curriculum_lesson_directory(topic_path, lesson_row['LessonID'])
-                        logging.info(f"Created lesson directory for {lesson_path}")
-                        
-                        lesson_data = {
-                            'unique_id': f"TopicLesson_{topic_node_unique_id}_{lesson_row['LessonID']}",
-                            'topic_lesson_id': lesson_row['LessonID'],
-                            'topic_lesson_title': lesson_row.get('LessonTitle', default_topic_lesson_values['topic_lesson_title']),
-                            'topic_lesson_type': lesson_row.get('LessonType', default_topic_lesson_values['topic_lesson_type']),
-                            'topic_lesson_length': str(lesson_row.get('SuggestedNumberOfPeriodsForLesson', default_topic_lesson_values['topic_lesson_length'])),
-                            'topic_lesson_suggested_activities': lesson_row.get('SuggestedActivities', default_topic_lesson_values['topic_lesson_suggested_activities']),
-                            'topic_lesson_skills_learned': lesson_row.get('SkillsLearned', default_topic_lesson_values['topic_lesson_skills_learned']),
-                            'topic_lesson_weblinks': lesson_row.get('WebLinks', default_topic_lesson_values['topic_lesson_weblinks']),
-                            'path': lesson_path
-                        }
-                        for key, value in lesson_data.items():
-                            if pd.isna(value):
-                                lesson_data[key] = default_topic_lesson_values.get(key, 'Null')
-
-                        lesson_node = neo_curriculum.TopicLessonNode(**lesson_data)
-                        # Create lesson node in curriculum database only
-                        neon.create_or_merge_neontology_node(lesson_node, database=curriculum_db_name, operation='merge')
-                        fs_handler.create_default_tldraw_file(lesson_node.path, lesson_node.to_dict())
-                        node_library['topic_lesson_nodes'][lesson_row['LessonID']] = lesson_node
-                        
-                        # Link lesson to topic
-                        neon.create_or_merge_neontology_relationship(
-                            curricular_relationships.TopicIncludesTopicLesson(source=topic_node, target=lesson_node),
-                            database=curriculum_db_name, operation='merge'
-                        )
-                        logging.info(f"Created lesson node {lesson_node.unique_id} and relationship with topic {topic_node.unique_id}")
-
-                        # Create sequential relationships between lessons
-                        if lesson_row['Lesson'].isdigit() and previous_lesson_node:
-                            neon.create_or_merge_neontology_relationship(
-                                curricular_relationships.TopicLessonFollowsTopicLesson(source=previous_lesson_node, target=lesson_node),
-                                database=curriculum_db_name, operation='merge'
-                            )
-                            logging.info(f"Created sequential relationship between lessons {previous_lesson_node.unique_id} and {lesson_node.unique_id}")
-                        previous_lesson_node = lesson_node
-
-                        # Process learning statements for this lesson only if not already processed
-                        statements_for_lesson = statement_df[
-                            (statement_df['LessonID'] == lesson_row['LessonID']) & 
-                            (statement_df['SyllabusSubject'] == topic_subject)
-                        ]
-                        for _, statement_row in statements_for_lesson.iterrows():
-                            if statement_row['StatementID'] in statements_processed:
-                                continue
-                            statements_processed.add(statement_row['StatementID'])
-                            
-                            _, statement_path = fs_handler.create_curriculum_learning_statement_directory(lesson_path, statement_row['StatementID'])
-                            
-                            statement_data = {
-                                'unique_id': f"LearningStatement_{lesson_node.unique_id}_{statement_row['StatementID']}",
-                                'lesson_learning_statement_id': statement_row['StatementID'],
-                                'lesson_learning_statement': statement_row.get('LearningStatement', default_learning_statement_values['lesson_learning_statement']),
-                                'lesson_learning_statement_type': statement_row.get('StatementType', default_learning_statement_values['lesson_learning_statement_type']),
-                                'path': statement_path
-                            }
-                            for key in statement_data:
-                                if pd.isna(statement_data[key]):
-                                    statement_data[key] = default_learning_statement_values.get(key, 'Null')
-
-                            statement_node = neo_curriculum.LearningStatementNode(**statement_data)
-                            # Create statement node in curriculum database only
-                            neon.create_or_merge_neontology_node(statement_node, database=curriculum_db_name, operation='merge')
-                            fs_handler.create_default_tldraw_file(statement_node.path, statement_node.to_dict())
-                            node_library['statement_nodes'][statement_row['StatementID']] = statement_node
-                            
-                            # Link learning statement to lesson
-                            neon.create_or_merge_neontology_relationship(
-                                curricular_relationships.LessonIncludesLearningStatement(source=lesson_node, target=statement_node),
-                                database=curriculum_db_name, operation='merge'
-                            )
-                            logging.info(f"Created learning statement node {statement_node.unique_id} and relationship with lesson {lesson_node.unique_id}")
-            else:
-                logging.warning(f"No year group node found for year group {year_group}, skipping syllabus creation")
-    
+    # The skeleton has to be in the graph before the subject subtrees are matched onto it
+    graph_buffer.flush()
+
+    skeleton = {
+        'school_node': school_node,
+        'curriculum_node': curriculum_node,
+        'subject_nodes': node_library['subject_nodes'],
+        'year_group_nodes': year_group_nodes_created,
+        'key_stage_syllabuses_by_subject': key_stage_syllabuses_by_subject,
+        'import_index': import_index,
+        'new_write_buffer': new_write_buffer,
+    }
+    max_workers = max_workers or CURRICULUM_IMPORT_MAX_WORKERS
+    logging.info(f"Building {len(year_group_syllabus_rows)} subject curriculums with {max_workers} workers")
+
+    def build_subject(subject):
+        return build_subject_curriculum(
+            subject, year_group_syllabus_rows[subject], skeleton, curriculum_index,
+            fs_handler, db_name, curriculum_db_name
+        )
+
+    if max_workers > 1 and len(year_group_syllabus_rows) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='curriculum') as executor:
+            futures = [executor.submit(build_subject, subject) for subject in year_group_syllabus_rows]
+            subject_results = [future.result() for future in futures]
+    else:
+        subject_results = [build_subject(subject) for subject in year_group_syllabus_rows]
+
+    # Merge the subject subtrees back into the node library, in subject order
+    database_stats = [graph_buffer.database_stats]
+    for subject_library, subject_processed, subject_database_stats in subject_results:
+        for library_key, nodes in subject_library.items():
+            node_library[library_key].update(nodes)
+        for processed_key, ids in subject_processed.items():
+            processed[processed_key] |= ids
+        database_stats.append(subject_database_stats)
+
     # After processing all year groups and their syllabuses, process any remaining topics
     logging.info("Processing topics without year groups")
-    for _, topic_row in topic_df.iterrows():
-        if topic_row['TopicID'] in topics_processed:
+    for topic_row in curriculum_index['topics']:
+        if topic_row['TopicID'] in processed['topics']:
             continue
-            
-        topic_subject = topic_row['SyllabusSubject']
-        topic_key_stage = topic_row['SyllabusKeyStage']
-        
-        logging.debug(f"Processing topic {topic_row['TopicID']} for subject {topic_subject} and key stage {topic_key_stage} without year group")
-        
-        # Find the key stage syllabus node
-        matching_syllabus_node = None
-        for syllabus_node in node_library['key_stage_syllabus_nodes'].values():
-            if (syllabus_node.ks_syllabus_subject == topic_subject and 
-                syllabus_node.ks_syllabus_key_stage == str(topic_key_stage)):
-                matching_syllabus_node = syllabus_node
-                break
-        
+
+        matching_syllabus_node = key_stage_syllabuses_by_subject.get(
+            (topic_row['SyllabusSubject'], str(topic_row['SyllabusKeyStage']))
+        )
         if not matching_syllabus_node:
-            logging.warning(f"No key stage syllabus node found for subject {topic_subject} and key stage {topic_key_stage}, skipping topic creation")
+            logging.warning(f"No key stage syllabus node found for subject {topic_row['SyllabusSubject']} and key stage {topic_row['SyllabusKeyStage']}, skipping topic creation")
             continue
-        
-        _, topic_path = fs_handler.create_curriculum_topic_directory(matching_syllabus_node.path, topic_row['TopicID'])
-        logging.info(f"Created topic directory for {topic_path}")
-        
-        topic_node_unique_id = f"Topic_{matching_syllabus_node.unique_id}_{topic_row['TopicID']}"
-        topic_node = neo_curriculum.TopicNode(
-            unique_id=topic_node_unique_id,
-            topic_id=topic_row['TopicID'],
-            topic_title=topic_row.get('TopicTitle', default_topic_values['topic_title']),
-            total_number_of_lessons_for_topic=str(topic_row.get('TotalNumberOfLessonsForTopic', default_topic_values['total_number_of_lessons_for_topic'])),
-            topic_type=topic_row.get('TopicType', default_topic_values['topic_type']),
-            topic_assessment_type=topic_row.get('TopicAssessmentType', default_topic_values['topic_assessment_type']),
-            path=topic_path
+        processed['topics'].add(topic_row['TopicID'])
+
+        create_topic_subtree(
+            topic_row, matching_syllabus_node, None, curriculum_index,
+            processed, node_library, graph_buffer, fs_handler, curriculum_db_name
         )
-        # Create topic node in curriculum database only
-        neon.create_or_merge_neontology_node(topic_node, database=curriculum_db_name, operation='merge')
-        fs_handler.create_default_tldraw_file(topic_node.path, topic_node.to_dict())
-        node_library['topic_nodes'][topic_row['TopicID']] = topic_node
-        topics_processed.add(topic_row['TopicID'])
-        
-        # Link topic to key stage syllabus
-        neon.create_or_merge_neontology_relationship(
-            curricular_relationships.KeyStageSyllabusIncludesTopic(source=matching_syllabus_node, target=topic_node),
-            database=curriculum_db_name, operation='merge'
+
+    graph_buffer.flush()
+    totals = {}
+    for stats_by_database in database_stats:
+        for database, stats in stats_by_database.items():
+            database_totals = totals.setdefault(database, dict.fromkeys(stats, 0))
+            for key, value in stats.items():
+                database_totals[key] += value
+    for database, stats in totals.items():
+        logging.info(
+            f"Wrote {stats['nodes']} nodes and {stats['relationships']} relationships to {database} "
+            f"in {stats['statements']} statements ({stats['seconds']:.2f}s, {stats['errors']} errors)"
         )
-        logging.info(f"Created relationship between topic {topic_node_unique_id} and key stage syllabus {matching_syllabus_node.unique_id}")
-        
-        # Process lessons for this topic
-        lessons_for_topic = lesson_df[
-            (lesson_df['TopicID'] == topic_row['TopicID']) & 
-            (lesson_df['SyllabusSubject'] == topic_subject)
-        ].copy()
-        lessons_for_topic.loc[:, 'Lesson'] = lessons_for_topic['Lesson'].astype(str)
-        lessons_for_topic = lessons_for_topic.sort_values('Lesson')
-        
-        previous_lesson_node = None
-        for _, lesson_row in lessons_for_topic.iterrows():
-            if lesson_row['LessonID'] in lessons_processed:
-                continue
-            lessons_processed.add(lesson_row['LessonID'])
-            
-            _, lesson_path = fs_handler.create_curriculum_lesson_directory(topic_path, lesson_row['LessonID'])
-            logging.info(f"Created lesson directory for {lesson_path}")
-            
-            lesson_data = {
-                'unique_id': f"TopicLesson_{topic_node_unique_id}_{lesson_row['LessonID']}",
-                'topic_lesson_id': lesson_row['LessonID'],
-                'topic_lesson_title': lesson_row.get('LessonTitle', default_topic_lesson_values['topic_lesson_title']),
-                'topic_lesson_type': lesson_row.get('LessonType', default_topic_lesson_values['topic_lesson_type']),
-                'topic_lesson_length': str(lesson_row.get('SuggestedNumberOfPeriodsForLesson', default_topic_lesson_values['topic_lesson_length'])),
-                'topic_lesson_suggested_activities': lesson_row.get('SuggestedActivities', default_topic_lesson_values['topic_lesson_suggested_activities']),
-                'topic_lesson_skills_learned': lesson_row.get('SkillsLearned', default_topic_lesson_values['topic_lesson_skills_learned']),
-                'topic_lesson_weblinks': lesson_row.get('WebLinks', default_topic_lesson_values['topic_lesson_weblinks']),
-                'path': lesson_path
+
+    fs_handler.create_planned_directories()
+    if plan:
+        node_library['dry_run'] = plan.report()
+        if prune:
+            node_library['dry_run']['deletes'] = {
+                'nodes': len(import_index.removed_nodes()),
+                'relationships': len(import_index.removed_relationships()),
             }
-            for key, value in lesson_data.items():
-                if pd.isna(value):
-                    lesson_data[key] = default_topic_lesson_values.get(key, 'Null')
-            
-            lesson_node = neo_curriculum.TopicLessonNode(**lesson_data)
-            # Create lesson node in curriculum database only
-            neon.create_or_merge_neontology_node(lesson_node, database=curriculum_db_name, operation='merge')
-            fs_handler.create_default_tldraw_file(lesson_node.path, lesson_node.to_dict())
-            node_library['topic_lesson_nodes'][lesson_row['LessonID']] = lesson_node
-            
-            # Link lesson to topic
-            neon.create_or_merge_neontology_relationship(
-                curricular_relationships.TopicIncludesTopicLesson(source=topic_node, target=lesson_node),
-                database=curriculum_db_name, operation='merge'
-            )
-            logging.info(f"Created lesson node {lesson_node.unique_id} and relationship with topic {topic_node.unique_id}")
-            
-            # Create sequential relationships between lessons
-            if lesson_row['Lesson'].isdigit() and previous_lesson_node:
-                neon.create_or_merge_neontology_relationship(
-                    curricular_relationships.TopicLessonFollowsTopicLesson(source=previous_lesson_node, target=lesson_node),
-                    database=curriculum_db_name, operation='merge'
-                )
-                logging.info(f"Created sequential relationship between lessons {previous_lesson_node.unique_id} and {lesson_node.unique_id}")
-            previous_lesson_node = lesson_node
-            
-            # Process learning statements for this lesson
-            statements_for_lesson = statement_df[
-                (statement_df['LessonID'] == lesson_row['LessonID']) & 
-                (statement_df['SyllabusSubject'] == topic_subject)
-            ]
-            for _, statement_row in statements_for_lesson.iterrows():
-                if statement_row['StatementID'] in statements_processed:
-                    continue
-                statements_processed.add(statement_row['StatementID'])
-                
-                _, statement_path = fs_handler.create_curriculum_learning_statement_directory(lesson_path, statement_row['StatementID'])
-                
-                statement_data = {
-                    'unique_id': f"LearningStatement_{lesson_node.unique_id}_{statement_row['StatementID']}",
-                    'lesson_learning_statement_id': statement_row['StatementID'],
-                    'lesson_learning_statement': statement_row.get('LearningStatement', default_learning_statement_values['lesson_learning_statement']),
-                    'lesson_learning_statement_type': statement_row.get('StatementType', default_learning_statement_values['lesson_learning_statement_type']),
-                    'path': statement_path
-                }
-                for key in statement_data:
-                    if pd.isna(statement_data[key]):
-                        statement_data[key] = default_learning_statement_values.get(key, 'Null')
-                
-                statement_node = neo_curriculum.LearningStatementNode(**statement_data)
-                # Create statement node in curriculum database only
-                neon.create_or_merge_neontology_node(statement_node, database=curriculum_db_name, operation='merge')
-                fs_handler.create_default_tldraw_file(statement_node.path, statement_node.to_dict())
-                node_library['statement_nodes'][statement_row['StatementID']] = statement_node
-                
-                # Link learning statement to lesson
-                neon.create_or_merge_neontology_relationship(
-                    curricular_relationships.LessonIncludesLearningStatement(source=lesson_node, target=statement_node),
-                    database=curriculum_db_name, operation='merge'
-                )
-                logging.info(f"Created learning statement node {statement_node.unique_id} and relationship with lesson {lesson_node.unique_id}")
-    
-    return node_library
\ No newline at end of file
+        logging.info(f"Planned curriculum import for {db_name}: {node_library['dry_run']}")
+    else:
+        if prune:
+            import_index.prune()
+        import_index.save()
+    node_library['import_summary'] = import_index.summary()
+    logging.info(f"Curriculum import summary: {node_library['import_summary']}")
+    return node_library
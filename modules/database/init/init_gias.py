@@ -0,0 +1,233 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_init_gias'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import time
+import pandas as pd
+import modules.database.tools.neontology_tools as neon
+from modules.database.tools.import_index_tools import hash_rows
+from modules.database.tools.neontology.graphconnection import GraphConnection
+
+GIAS_DB_NAME = os.getenv("GIAS_DB_NAME", "globalschools")
+GIAS_IMPORT_CHUNK_SIZE = int(os.getenv("GIAS_IMPORT_CHUNK_SIZE", 5000))
+
+# Register columns read from the GIAS establishment CSV, with the names used in the import
+GIAS_COLUMNS = {
+    'URN': 'urn',
+    'LA (name)': 'la',
+    'ParliamentaryConstituency (name)': 'constituency',
+    'AdministrativeWard (name)': 'ward',
+    'EstablishmentName': 'name',
+    'TypeOfEstablishment (name)': 'type',
+    'EstablishmentStatus (name)': 'status',
+}
+HIERARCHY_COLUMNS = ['la', 'constituency', 'ward']
+NOT_RECORDED = 'Not recorded'
+
+# Merge keys, each backed by a uniqueness constraint so MERGE is an index lookup
+GIAS_CONSTRAINTS = (
+    ('LocalAuthority', 'unique_id'),
+    ('ParliamentaryConstituency', 'unique_id'),
+    ('AdministrativeWard', 'unique_id'),
+    ('School', 'urn'),
+)
+
+
+def local_authority_cypher(database):
+    return f"""
+    USE {database}
+    UNWIND $rows AS row
+    MERGE (la:LocalAuthority {{unique_id: row.unique_id}})
+    SET la.Name = row.name
+    """
+
+def constituency_cypher(database):
+    return f"""
+    USE {database}
+    UNWIND $rows AS row
+    MATCH (la:LocalAuthority {{unique_id: row.la_id}})
+    MERGE (c:ParliamentaryConstituency {{unique_id: row.unique_id}})
+    SET c.Name = row.name
+    MERGE (la)-[:HAS_PARLIAMENTARY_CONSTITUENCY]->(c)
+    """
+
+def ward_cypher(database):
+    return f"""
+    USE {database}
+    UNWIND $rows AS row
+    MATCH (c:ParliamentaryConstituency {{unique_id: row.constituency_id}})
+    MERGE (w:AdministrativeWard {{unique_id: row.unique_id}})
+    SET w.Name = row.name
+    MERGE (c)-[:HAS_ADMINISTRATIVE_WARD]->(w)
+    """
+
+def school_cypher(database):
+    # A school which moved ward loses its link to the old one
+    return f"""
+    USE {database}
+    UNWIND $rows AS row
+    MATCH (w:AdministrativeWard {{unique_id: row.ward_id}})
+    MERGE (s:School {{urn: row.urn}})
+    SET s.Name = row.name, s.Type = row.type, s.Status = row.status, s.row_hash = row.row_hash
+    MERGE (w)-[:HAS_SCHOOL]->(s)
+    WITH s, w
+    OPTIONAL MATCH (old:AdministrativeWard)-[r:HAS_SCHOOL]->(s)
+    WHERE old <> w
+    DELETE r
+    """
+
+def read_gias_register(path):
+    """Read the register columns of a GIAS establishment CSV, with missing areas marked as not recorded.
+
+    GIAS publishes its extracts in Windows-1252, so that is tried when the file is not UTF-8.
+    """
+    read = lambda encoding: pd.read_csv(
+        path, usecols=list(GIAS_COLUMNS), dtype=str, keep_default_na=False, encoding=encoding
+    )
+    try:
+        df = read('utf-8-sig')
+    except UnicodeDecodeError:
+        df = read('cp1252')
+    df = df.rename(columns=GIAS_COLUMNS)[list(GIAS_COLUMNS.values())]
+    df = df.apply(lambda column: column.str.strip())
+    df = df[df['urn'] != ''].drop_duplicates('urn', keep='last')
+    df[HIERARCHY_COLUMNS] = df[HIERARCHY_COLUMNS].replace('', NOT_RECORDED)
+    return df.reset_index(drop=True)
+
+def build_gias_rows(df):
+    """Build the UNWIND rows for each level of the LA -> constituency -> ward -> school hierarchy.
+
+    The areas come from one groupby over the hierarchy columns, and each school is given
+    its ward's id with vectorised string operations, so no level re-filters the register.
+    Wards are keyed within their local authority, since ward names repeat across the country.
+    """
+    areas = df.groupby(HIERARCHY_COLUMNS, sort=False).size().index.to_frame(index=False)
+    areas['la_id'] = 'LocalAuthority_' + areas['la']
+    areas['constituency_id'] = 'ParliamentaryConstituency_' + areas['constituency']
+    areas['ward_id'] = 'AdministrativeWard_' + areas['la'] + '_' + areas['ward']
+
+    local_authorities = areas.drop_duplicates('la_id')
+    constituencies = areas.drop_duplicates(['la_id', 'constituency_id'])
+    wards = areas.drop_duplicates(['constituency_id', 'ward_id'])
+    schools = df.assign(ward_id='AdministrativeWard_' + df['la'] + '_' + df['ward'])
+    return {
+        'local_authorities': [
+            {'unique_id': unique_id, 'name': name}
+            for unique_id, name in zip(local_authorities['la_id'], local_authorities['la'])
+        ],
+        'constituencies': [
+            {'unique_id': unique_id, 'name': name, 'la_id': la_id}
+            for unique_id, name, la_id in zip(constituencies['constituency_id'], constituencies['constituency'], constituencies['la_id'])
+        ],
+        'wards': [
+            {'unique_id': unique_id, 'name': name, 'constituency_id': constituency_id}
+            for unique_id, name, constituency_id in zip(wards['ward_id'], wards['ward'], wards['constituency_id'])
+        ],
+        'schools': schools[['urn', 'name', 'type', 'status', 'row_hash', 'ward_id']].to_dict('records'),
+    }
+
+def write_rows(graph, cypher, rows, chunk_size=GIAS_IMPORT_CHUNK_SIZE):
+    """Write rows with one UNWIND statement per chunk, returning the number of statements."""
+    statements = 0
+    for start in range(0, len(rows), chunk_size):
+        graph.cypher_write(cypher, {'rows': rows[start:start + chunk_size]})
+        statements += 1
+    return statements
+
+def get_school_hashes(graph, database):
+    records = graph.cypher_read_many(f"""
+    USE {database}
+    MATCH (s:School)
+    RETURN s.urn AS urn, s.row_hash AS row_hash
+    """)
+    return {record['urn']: record['row_hash'] for record in records}
+
+def merge_school(school_data, db_name=GIAS_DB_NAME):
+    """Merge a single school, not from the register, on its name."""
+    neon.init_neontology_connection()
+    GraphConnection().cypher_write(f"""
+    USE {db_name}
+    MERGE (s:School {{Name: $name}})
+    SET s += $properties
+    """, {'name': school_data['name'], 'properties': {k: v for k, v in school_data.items() if k != 'name'}})
+
+def import_gias_register(path, db_name=GIAS_DB_NAME, incremental=False, prune=False, chunk_size=GIAS_IMPORT_CHUNK_SIZE):
+    """Load the GIAS establishment register into the global schools database.
+
+    The hierarchy is written top down in chunked UNWIND MERGE statements over Bolt, so
+    each level can match the one above it. With incremental, schools are compared with
+    the graph by URN and the hash of their register row, and only new or changed schools,
+    and the areas they sit in, are written. With prune, schools no longer in the register
+    are deleted.
+    """
+    start = time.perf_counter()
+    df = read_gias_register(path)
+    row_hashes = hash_rows(df, 'urn')
+    df['row_hash'] = df['urn'].map(row_hashes)
+    logging.info(f"Read {len(df)} establishments from {path}")
+
+    neon.init_neontology_connection()
+    graph = GraphConnection()
+    for label, property in GIAS_CONSTRAINTS:
+        graph.cypher_write(f"""
+        USE {db_name}
+        CREATE CONSTRAINT IF NOT EXISTS
+        FOR (n:{label})
+        REQUIRE n.{property} IS UNIQUE
+        """)
+
+    existing = get_school_hashes(graph, db_name)
+    previous_hashes = df['urn'].map(existing)
+    is_new = previous_hashes.isna()
+    is_changed = ~is_new & (previous_hashes != df['row_hash'])
+    changed = df[is_new | is_changed] if incremental else df
+    rows = build_gias_rows(changed)
+
+    statements = 0
+    statements += write_rows(graph, local_authority_cypher(db_name), rows['local_authorities'], chunk_size)
+    statements += write_rows(graph, constituency_cypher(db_name), rows['constituencies'], chunk_size)
+    statements += write_rows(graph, ward_cypher(db_name), rows['wards'], chunk_size)
+    statements += write_rows(graph, school_cypher(db_name), rows['schools'], chunk_size)
+
+    # Schools which have left the register
+    removed = [urn for urn in existing if urn not in row_hashes]
+    if prune and removed:
+        for start_index in range(0, len(removed), chunk_size):
+            graph.cypher_write(f"""
+            USE {db_name}
+            UNWIND $urns AS urn
+            MATCH (s:School {{urn: urn}})
+            DETACH DELETE s
+            """, {'urns': removed[start_index:start_index + chunk_size]})
+            statements += 1
+
+    summary = {
+        'db_name': db_name,
+        'rows': len(df),
+        'incremental': incremental,
+        'local_authorities': len(rows['local_authorities']),
+        'constituencies': len(rows['constituencies']),
+        'wards': len(rows['wards']),
+        'schools': {
+            'written': len(changed),
+            'added': int(is_new.sum()),
+            'changed': int(is_changed.sum()),
+            'unchanged': int((~is_new & ~is_changed).sum()),
+            'removed': len(removed),
+            'pruned': len(removed) if prune else 0,
+        },
+        'statements': statements,
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+    logging.info(f"Imported GIAS register into {db_name}: {summary}")
+    return summary
@@ -0,0 +1,159 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_init_job_handlers'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import pandas as pd
+import modules.database.tools.neo4j_driver_tools as driver
+import modules.database.tools.neontology_tools as neon
+from modules.database.tools.neo4j_session_tools import get_node_by_unique_id
+import modules.database.init.init_school_timetable as init_school_timetable
+import modules.database.init.init_worker_timetable as init_worker_timetable
+import modules.database.init.init_curriculum as init_curriculum
+import modules.database.init.init_gias as init_gias
+import modules.database.init.xl_ingest as xl_ingest
+import modules.database.init.xl_validation as xl_validation
+from modules.database.init.init_jobs import register_job_handler
+from modules.database.schemas.entity_neo import SchoolNode, UserNode, TeacherNode
+
+WORKER_TIMETABLE_STAGES = ('worker_timetable', 'user_timetable')
+CURRICULUM_STAGES = ('curriculum',)
+GIAS_REGISTER_STAGES = ('gias_register',)
+
+
+def summarise_nodes(nodes):
+    """Reduce the node collections an init function returns to something a job result can store."""
+    if isinstance(nodes, dict):
+        return {key: summarise_nodes(value) for key, value in nodes.items()}
+    if isinstance(nodes, (list, tuple, set)):
+        return len(nodes)
+    if hasattr(nodes, '__primaryproperty__'):
+        return getattr(nodes, nodes.__primaryproperty__)
+    if nodes is None or isinstance(nodes, (str, int, float, bool)):
+        return nodes
+    return str(nodes)
+
+
+def read_upload(job, sheets):
+    return xl_ingest.load_dataframes(job.upload_path, sheets)
+
+
+@register_job_handler('school_timetable', init_school_timetable.SCHOOL_TIMETABLE_STAGES)
+def run_school_timetable_job(job):
+    school_node = SchoolNode(**job.params['school_node']) if job.params.get('school_node') else None
+    dataframes = read_upload(job, xl_ingest.SCHOOL_TIMETABLE_SHEETS)
+    xl_validation.raise_for_report(xl_validation.validate_school_timetable(dataframes, require_school_id=school_node is None))
+    result = init_school_timetable.create_school_timetable(
+        dataframes,
+        job.params['db_name'],
+        school_node,
+        completed_stages=job.completed_stages,
+        on_stage_complete=job.complete_stage
+    )
+    return summarise_nodes(result)
+
+
+@register_job_handler('school_curriculum', CURRICULUM_STAGES)
+def run_school_curriculum_job(job):
+    # The curriculum is written in one pass, so a resumed job runs the whole import again;
+    # every write is a merge, so what the interrupted attempt wrote is not duplicated
+    params = job.params
+    dataframes = read_upload(job, xl_ingest.CURRICULUM_SHEETS)
+    xl_validation.raise_for_report(xl_validation.validate_curriculum(dataframes))
+    node_library = init_curriculum.create_curriculum(
+        dataframes=dataframes,
+        db_name=params['db_name'],
+        curriculum_db_name=params['curriculum_db_name'],
+        school_node=SchoolNode(**params['school_node']),
+        incremental=params.get('incremental', False),
+        prune=params.get('prune', False)
+    )
+    job.complete_stage('curriculum')
+    return {
+        'import_summary': node_library.get('import_summary'),
+        'nodes': {key: summarise_nodes(value) for key, value in node_library.items() if key != 'import_summary'}
+    }
+
+
+@register_job_handler('gias_register', GIAS_REGISTER_STAGES)
+def run_gias_register_job(job):
+    # Schools are merged on URN, so a resumed job rewrites what the interrupted attempt wrote
+    params = job.params
+    summary = init_gias.import_gias_register(
+        job.upload_path,
+        db_name=params['db_name'],
+        incremental=params.get('incremental', True),
+        prune=params.get('prune', False)
+    )
+    job.complete_stage('gias_register')
+    return summary
+
+
+@register_job_handler('worker_timetable', WORKER_TIMETABLE_STAGES)
+def run_worker_timetable_job(job):
+    worker_node_data = job.params['worker_node']
+    user_node_data = job.params['user_node']
+    worker_db_name = worker_node_data['worker_db_name']
+
+    neon.init_neontology_connection()
+    timetable_df = pd.read_excel(job.upload_path)
+
+    if 'worker_timetable' not in job.completed_stages:
+        # Get the school version of the worker node
+        logging.info(f"Getting school worker node for {worker_node_data['unique_id']} from {worker_db_name}")
+        # Borrow a connection from the shared driver pool rather than opening a driver per job
+        with driver.get_session(database=worker_db_name) as neo_session:
+            school_worker_node = get_node_by_unique_id(session=neo_session, unique_id=worker_node_data['unique_id'])
+        if school_worker_node is None:
+            raise ValueError(f"School worker node not found for unique_id: {worker_node_data['unique_id']}")
+        logging.debug(f"School worker node found: {school_worker_node}")
+
+        # Create timetable in school database
+        logging.info(f"Initializing worker timetable for school worker: {school_worker_node['teacher_code']}")
+        init_worker_timetable.init_worker_timetable(timetable_df, school_worker_node)
+        logging.info(f"Worker timetable initialized for school worker: {school_worker_node['teacher_code']}")
+        job.complete_stage('worker_timetable')
+
+    # Create timetable in user database
+    if 'user_db_name' not in worker_node_data:
+        logging.warning("No user_db_name provided, skipping user timetable creation")
+    elif 'user_timetable' not in job.completed_stages:
+        from modules.database.init.init_user_timetable import create_user_worker_timetable
+
+        logging.info(f"Creating user timetable structure in {worker_node_data['user_db_name']}")
+        user_worker_node = TeacherNode(
+            unique_id=worker_node_data['unique_id'],
+            teacher_code=worker_node_data['teacher_code'],
+            teacher_name_formal=worker_node_data['teacher_name_formal'],
+            teacher_email=worker_node_data['teacher_email'],
+            path=worker_node_data['path'],
+            worker_db_name=worker_db_name,
+            user_db_name=worker_node_data['user_db_name']
+        )
+        user_node = UserNode(
+            unique_id=user_node_data['unique_id'],
+            user_id=user_node_data['user_id'],
+            user_type=user_node_data['user_type'],
+            user_name=user_node_data['user_name'],
+            user_email=user_node_data['user_email'],
+            path=user_node_data['path'],
+            worker_node_data=user_node_data['worker_node_data']
+        )
+        create_user_worker_timetable(
+            user_node=user_node,
+            user_worker_node=user_worker_node,
+            school_db_name=worker_db_name
+        )
+        logging.info(f"User timetable structure created in {worker_node_data['user_db_name']}")
+    job.complete_stage('user_timetable')
+
+    return {'worker': worker_node_data['unique_id'], 'user_db_name': worker_node_data.get('user_db_name')}
@@ -0,0 +1,356 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_init_jobs'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Kept beside the node filesystem, or the logs when there is none, since both are writable volumes
+INIT_JOBS_PATH = os.getenv("INIT_JOBS_PATH") or os.path.join(
+    os.getenv("NODE_FILESYSTEM_PATH") or os.getenv("LOG_PATH", "/logs"), ".init_jobs"
+)
+INIT_JOBS_MAX_WORKERS = int(os.getenv("INIT_JOBS_MAX_WORKERS", 2))
+# A running job belongs to the process holding its lease, which renews it every third of the lease
+INIT_JOBS_LEASE_SECONDS = float(os.getenv("INIT_JOBS_LEASE_SECONDS", 120))
+
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed')
+# Queued jobs, and running jobs whose owner's lease has expired, are picked up by any runner
+RESUMABLE_STATUSES = ('queued', 'running')
+
+# kind -> (stages, handler)
+JOB_HANDLERS = {}
+
+
+def register_job_handler(kind, stages):
+    """Register the function which runs jobs of a kind.
+
+    The handler is called with a JobContext and returns a JSON serialisable result.
+    It should skip the work of any stage in job.completed_stages and call
+    job.complete_stage(stage) as each stage is written.
+    """
+    def decorator(func):
+        JOB_HANDLERS[kind] = (tuple(stages), func)
+        return func
+    return decorator
+
+
+def next_stage(stages, completed_stages):
+    return next((stage for stage in stages if stage not in completed_stages), None)
+
+
+class JobStore:
+    """Init job state in a local SQLite database, shared by every worker process on the host.
+
+    A runner claims a job with a single conditional UPDATE, so of several processes
+    trying to run the same job only one succeeds. The claim records the runner as the
+    job's owner with a lease, and a running job whose lease has expired, because its
+    process died, can be claimed again.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    upload_path TEXT,
+                    stages TEXT NOT NULL,
+                    completed_stages TEXT NOT NULL DEFAULT '[]',
+                    current_stage TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_expires REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (('owner', 'TEXT'), ('lease_expires', 'REAL')):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def create(self, job_id, kind, params, upload_path, stages):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, upload_path, stages, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), upload_path, json.dumps(list(stages)), now, now)
+            )
+
+    def update(self, job_id, **fields):
+        for key in ('result', 'completed_stages'):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        fields['updated_at'] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def complete_stage(self, job_id, stage):
+        """Checkpoint a stage and move the job on to the next stage it has not completed."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT stages, completed_stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            completed = json.loads(row['completed_stages'])
+            if stage not in completed:
+                completed.append(stage)
+            self._conn.execute(
+                "UPDATE jobs SET completed_stages = ?, current_stage = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(completed), next_stage(json.loads(row['stages']), completed), time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status=None, limit=50):
+        query = "SELECT * FROM jobs"
+        params = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def resumable_ids(self):
+        """Queued jobs, and running jobs whose lease has expired."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)) ORDER BY created_at",
+                (time.time(),)
+            ).fetchall()
+        return [row['id'] for row in rows]
+
+    def claim(self, job_id, owner, lease_seconds):
+        """Mark a queued or abandoned job as running for owner, returning the job if the claim won."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT stages, completed_stages FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "current_stage = ?, updated_at = ? "
+                "WHERE id = ? AND (status = 'queued' "
+                "OR (status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)))",
+                (
+                    owner, now + lease_seconds,
+                    next_stage(json.loads(row['stages']), json.loads(row['completed_stages'])),
+                    now, job_id, now
+                )
+            )
+            if cursor.rowcount != 1:
+                return None
+            claimed = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(claimed)
+
+    def renew_leases(self, owner, lease_seconds):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE owner = ? AND status = 'running'",
+                (time.time() + lease_seconds, owner)
+            )
+
+    @staticmethod
+    def _to_dict(row):
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['stages'] = json.loads(job['stages'])
+        job['completed_stages'] = json.loads(job['completed_stages'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        total = len(job['stages'])
+        job['progress'] = round(len(job['completed_stages']) / total, 3) if total else (1.0 if job['status'] == 'completed' else 0.0)
+        return job
+
+
+class JobContext:
+    """What a job handler sees of its job."""
+
+    def __init__(self, store, job):
+        self._store = store
+        self.id = job['id']
+        self.kind = job['kind']
+        self.params = job['params']
+        self.upload_path = job['upload_path']
+        self.completed_stages = set(job['completed_stages'])
+
+    def complete_stage(self, stage):
+        self.completed_stages.add(stage)
+        self._store.complete_stage(self.id, stage)
+        logging.info(f"Job {self.id} completed stage {stage}")
+
+
+class JobRunner:
+    """Runs init jobs on a bounded thread pool, keeping their state in a JobStore.
+
+    Uploads are copied to INIT_JOBS_PATH so a job can be resumed after a restart from
+    the last stage it checkpointed.
+    """
+
+    def __init__(self, jobs_path=INIT_JOBS_PATH, max_workers=INIT_JOBS_MAX_WORKERS, lease_seconds=INIT_JOBS_LEASE_SECONDS):
+        self.jobs_path = jobs_path
+        self.uploads_path = os.path.join(jobs_path, "uploads")
+        self.max_workers = max_workers
+        self.lease_seconds = lease_seconds
+        self.owner = None
+        self.store = None
+        self._executor = None
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+        self._stopping = None
+        self._heartbeat = None
+
+    def start(self, resume=True):
+        os.makedirs(self.uploads_path, exist_ok=True)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.store = JobStore(os.path.join(self.jobs_path, "jobs.sqlite3"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='init-job')
+        logging.info(f"Started init job runner {self.owner} with {self.max_workers} workers in {self.jobs_path}")
+        self._stopping = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._keep_alive, args=(self._stopping, resume), name='init-job-heartbeat', daemon=True
+        )
+        if resume:
+            self._queue_resumable()
+        self._heartbeat.start()
+
+    def shutdown(self):
+        # Running jobs stay 'running' in the store, and are resumed by whichever runner
+        # finds their lease expired
+        if self._stopping:
+            self._stopping.set()
+            self._stopping = None
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.store:
+            self.store.close()
+            self.store = None
+
+    def _keep_alive(self, stopping, resume):
+        """Renew the leases of this runner's jobs and pick up jobs other runners abandoned."""
+        while not stopping.wait(self.lease_seconds / 3):
+            try:
+                self.store.renew_leases(self.owner, self.lease_seconds)
+                if resume:
+                    self._queue_resumable()
+            except Exception as e:
+                logging.error(f"Init job runner heartbeat failed: {e}")
+
+    def _queue(self, job_id):
+        with self._queued_lock:
+            if job_id in self._queued:
+                return
+            self._queued.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _queue_resumable(self):
+        for job_id in self.store.resumable_ids():
+            with self._queued_lock:
+                if job_id in self._queued:
+                    continue
+            logging.info(f"Resuming init job {job_id}")
+            self._queue(job_id)
+
+    @property
+    def started(self):
+        return self._executor is not None
+
+    def submit(self, kind, params, upload_content=None, upload_suffix=".xlsx"):
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown init job kind {kind}, expected one of {tuple(JOB_HANDLERS)}")
+        if not self.started:
+            raise RuntimeError("Init job runner has not been started")
+
+        job_id = str(uuid.uuid4())
+        upload_path = None
+        if upload_content is not None:
+            upload_path = os.path.join(self.uploads_path, f"{job_id}{upload_suffix}")
+            with open(upload_path, "wb") as f:
+                f.write(upload_content)
+
+        stages, _ = JOB_HANDLERS[kind]
+        self.store.create(job_id, kind, params, upload_path, stages)
+        self._queue(job_id)
+        logging.info(f"Queued init job {job_id} ({kind})")
+        return job_id
+
+    def resume(self, job_id):
+        """Re-queue a failed job, which carries on after its last completed stage."""
+        job = self.store.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job['status'] != 'failed':
+            raise ValueError(f"Only failed jobs can be resumed, job {job_id} is {job['status']}")
+        self.store.update(job_id, status='queued', error=None)
+        self._queue(job_id)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def list(self, status=None, limit=50):
+        return self.store.list(status=status, limit=limit)
+
+    def queue_depth(self):
+        return len(self.store.list(status='queued', limit=1000000))
+
+    def _run(self, job_id):
+        try:
+            self._run_claimed(job_id)
+        finally:
+            with self._queued_lock:
+                self._queued.discard(job_id)
+
+    def _run_claimed(self, job_id):
+        job = self.store.claim(job_id, self.owner, self.lease_seconds)
+        if job is None:
+            # Finished, or running in another process
+            logging.debug(f"Init job {job_id} was not claimed by {self.owner}")
+            return
+        _, handler = JOB_HANDLERS[job['kind']]
+        logging.info(f"Running init job {job_id} ({job['kind']}), completed stages: {job['completed_stages']}")
+        try:
+            result = handler(JobContext(self.store, job))
+        except Exception as e:
+            logging.error(f"Init job {job_id} failed: {e}")
+            self.store.update(job_id, status='failed', error=str(e), lease_expires=None)
+            return
+        self.store.update(job_id, status='completed', result=result, current_stage=None, lease_expires=None)
+        if job['upload_path'] and os.path.exists(job['upload_path']):
+            os.remove(job['upload_path'])
+        logging.info(f"Init job {job_id} completed")
+
+
+job_runner = JobRunner()
@@ -20,19 +20,119 @@ import modules.database.schemas.relationships.calendar_timetable_rels as cal_tt_
 import modules.database.tools.neontology_tools as neon
 from modules.database.tools.db_operations import DatabaseNotFoundError, stop_database, drop_database
 from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem
+from modules.database.tools.dry_run_tools import WritePlan
+from bisect import bisect_right
 from datetime import timedelta, datetime
 import pandas as pd
 
-def create_school_timetable(dataframes, db_name, school_node=None):
+PERIOD_NODE_CLASSES = {
+    'Academic': timetable_neo.AcademicPeriodNode,
+    'Registration': timetable_neo.RegistrationPeriodNode,
+    'Break': timetable_neo.BreakPeriodNode,
+    'OffTimetable': timetable_neo.OffTimetablePeriodNode
+}
+DAY_HAS_PERIOD_RELS = {
+    'Academic': tt_rels.AcademicDayHasAcademicPeriod,
+    'Registration': tt_rels.AcademicDayHasRegistrationPeriod,
+    'Break': tt_rels.AcademicDayHasBreakPeriod,
+    'OffTimetable': tt_rels.AcademicDayHasOffTimetablePeriod
+}
+
+
+class DateIntervalIndex:
+    """Non-overlapping date intervals sorted by start date, for O(log n) date lookups."""
+
+    def __init__(self, intervals):
+        # intervals are (start, end, value) with inclusive ends
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [interval[0] for interval in self._intervals]
+
+    def find(self, value):
+        """Return the value of the interval containing the date, or None."""
+        i = bisect_right(self._starts, value) - 1
+        if i >= 0 and value <= self._intervals[i][1]:
+            return self._intervals[i][2]
+        return None
+
+
+# Stages create_school_timetable writes in order, used to checkpoint and resume init jobs
+SCHOOL_TIMETABLE_STAGES = ('calendar', 'years', 'terms', 'weeks', 'days', 'periods', 'sequences')
+
+def build_period_templates(periods_df):
+    """Resolve each row of the periods sheet once, rather than once per academic day."""
+    period_templates = []
+    academic_or_registration_period_of_day = 1
+    for period_of_day, period_row in enumerate(periods_df.to_dict(orient='records'), start=1):
+        period_type = period_row['PeriodType']
+        template = {
+            'period_of_day': period_of_day,
+            'node_class': PERIOD_NODE_CLASSES[period_type],
+            'relationship_class': DAY_HAS_PERIOD_RELS[period_type],
+            'name': period_row['PeriodName'],
+            'start_time': period_row['StartTime'],
+            'end_time': period_row['EndTime'],
+            'period_dir': None,
+        }
+        if period_type in ['Academic', 'Registration']:
+            template['period_dir'] = f"{academic_or_registration_period_of_day}_{period_row['PeriodName'].replace(' ', '_')}"
+            template['period_code'] = period_row['PeriodCode']
+            academic_or_registration_period_of_day += 1
+        period_templates.append(template)
+    return period_templates
+
+def create_school_timetable(dataframes, db_name, school_node=None, completed_stages=None, on_stage_complete=None, dry_run=False):
+    """Create the school calendar and timetable from the timetable workbook.
+
+    The graph is written stage by stage (SCHOOL_TIMETABLE_STAGES). Nodes for stages in
+    completed_stages are still built, since later stages link to them, but their graph
+    writes are skipped, so a job can resume after the last stage it checkpointed.
+    on_stage_complete is called with each stage name once that stage is in the graph.
+
+    With dry_run nothing is written: the calendar and timetable are planned against a
+    WritePlan and its report of the nodes, relationships, directories and tldraw files
+    the import would create is returned under 'dry_run'.
+    """
     logging.info(f"Creating school timetable for {db_name}")
     if dataframes is None:
         raise ValueError("Data is required to create the calendar and timetable.")
+    completed_stages = set(completed_stages or ())
 
-    logging.info(f"Initialising neo4j connection...")
-    neon.init_neontology_connection()
+    plan = WritePlan() if dry_run else None
+    if plan is None:
+        logging.info(f"Initialising neo4j connection...")
+        neon.init_neontology_connection()
+        new_write_buffer = neon.GraphWriteBuffer
+    else:
+        new_write_buffer = plan.write_buffer
+    graph_buffer = new_write_buffer(database=db_name)
+    # Periods are created in the day loop but written as their own stage. The buffer holds
+    # them until the days are written, since an earlier flush would MATCH no Day nodes and
+    # drop the day to period relationships
+    period_buffer = new_write_buffer(database=db_name)
+    write_flush_size = graph_buffer.flush_size
+    period_buffer.flush_size = None
+
+    def begin_stage(stage, buffer=graph_buffer):
+        # Nothing is written for a completed stage, so the buffer must not auto flush
+        buffer.flush_size = None if stage in completed_stages else write_flush_size
+
+    def finish_stage(stage, next_stage=None, buffer=graph_buffer):
+        if stage in completed_stages:
+            logging.info(f"Stage {stage} already completed, skipping its graph writes")
+            buffer.clear()
+        else:
+            buffer.flush()
+        if on_stage_complete:
+            on_stage_complete(stage)
+        if next_stage:
+            begin_stage(next_stage, buffer)
+
+    begin_stage('years')
 
     # Initialize the filesystem handler
-    fs_handler = ClassroomCopilotFilesystem(db_name, init_run_type="school")
+    fs_handler = (plan.filesystem if plan else ClassroomCopilotFilesystem)(db_name, init_run_type="school")
+    # Directories and tldraw files are collected and created together once the timetable is built
+    fs_handler.begin_directory_plan()
 
     school_df = dataframes['school']
     if school_node is None:
@@ -83,23 +183,36 @@ def create_school_timetable(dataframes, db_name, school_node=None):
         end_date=school_year_end_date,
         path=timetable_path
     )
-    neon.create_or_merge_neontology_node(school_timetable_node, database=db_name, operation='merge')
+    graph_buffer.merge_node(school_timetable_node)
     # Create the tldraw file for the node
     fs_handler.create_default_tldraw_file(school_timetable_node.path, school_timetable_node.to_dict())
     timetable_nodes['timetable_node'] = school_timetable_node
     
     if school_node:
         logging.info(f"Creating calendar for {school_unique_id} from Neo4j SchoolNode: {school_node.unique_id}")
-        calendar_nodes = init_calendar.create_calendar(db_name, school_year_start_date, school_year_end_date, attach_to_calendar_node=True, entity_node=school_node)
+        calendar_nodes = init_calendar.create_calendar(db_name, school_year_start_date, school_year_end_date, attach_to_calendar_node=True, entity_node=school_node, write='calendar' not in completed_stages, plan=plan)
         # Link the school node to the timetable node
-        neon.create_or_merge_neontology_relationship(
-            entity_tt_rels.SchoolHasTimetable(source=school_node, target=school_timetable_node),
-            database=db_name, operation='merge'
+        graph_buffer.merge_relationship(
+            entity_tt_rels.SchoolHasTimetable(source=school_node, target=school_timetable_node)
         )
         timetable_nodes['calendar_nodes'] = calendar_nodes
     else:
         logging.info(f"Creating calendar for {school_unique_id} from dataframe SchoolID: {school_unique_id}")
-        calendar_nodes = init_calendar.create_calendar(db_name, school_year_start_date, school_year_end_date, attach_to_calendar_node=False, entity_node=None)
+        calendar_nodes = init_calendar.create_calendar(db_name, school_year_start_date, school_year_end_date, attach_to_calendar_node=False, entity_node=None, write='calendar' not in completed_stages, plan=plan)
+    if on_stage_complete:
+        on_stage_complete('calendar')
+
+    # Index the calendar so each timetable node is linked with a dictionary lookup
+    calendar_years_by_year = {}
+    calendar_weeks_by_start_date = {}
+    calendar_days_by_date = {}
+    for year_node in calendar_nodes['calendar_year_nodes']:
+        calendar_years_by_year.setdefault(year_node.year, year_node)
+    for week_node in calendar_nodes['calendar_week_nodes']:
+        calendar_weeks_by_start_date.setdefault(week_node.start_date, week_node)
+    for calendar_day_node in calendar_nodes['calendar_day_nodes']:
+        calendar_days_by_date.setdefault(calendar_day_node.date, calendar_day_node)
+    academic_years_by_year = {}
 
     # Create AcademicYear nodes for each year within the range
     for year in range(school_year_start_date.year, school_year_end_date.year + 1):
@@ -111,31 +224,31 @@ def create_school_timetable(dataframes, db_name, school_node=None):
             year=year_str,
             path=timetable_year_path
         )
-        neon.create_or_merge_neontology_node(academic_year_node, database=db_name, operation='merge')
+        graph_buffer.merge_node(academic_year_node)
         # Create the tldraw file for the node
         fs_handler.create_default_tldraw_file(academic_year_node.path, academic_year_node.to_dict())
         timetable_nodes['academic_year_nodes'].append(academic_year_node)
+        academic_years_by_year.setdefault(year, academic_year_node)
         logging.info(f'Created academic year node: {academic_year_node.unique_id}')
-        neon.create_or_merge_neontology_relationship(
-            tt_rels.AcademicTimetableHasAcademicYear(source=school_timetable_node, target=academic_year_node),
-            database=db_name, operation='merge'
+        graph_buffer.merge_relationship(
+            tt_rels.AcademicTimetableHasAcademicYear(source=school_timetable_node, target=academic_year_node)
         )
         logging.info(f"Created school timetable relationship from {school_timetable_node.unique_id} to {academic_year_node.unique_id}")
 
         # Link the academic year with the corresponding calendar year node
-        for year_node in calendar_nodes['calendar_year_nodes']:
-            if year_node.year == year:
-                neon.create_or_merge_neontology_relationship(
-                    cal_tt_rels.AcademicYearIsCalendarYear(source=academic_year_node, target=year_node),
-                    database=db_name, operation='merge'
-                )
-                logging.info(f"Created school timetable relationship from {academic_year_node.unique_id} to {year_node.unique_id}")
-                break
+        year_node = calendar_years_by_year.get(year_str)
+        if year_node is not None:
+            graph_buffer.merge_relationship(
+                cal_tt_rels.AcademicYearIsCalendarYear(source=academic_year_node, target=year_node)
+            )
+            logging.info(f"Created school timetable relationship from {academic_year_node.unique_id} to {year_node.unique_id}")
+
+    finish_stage('years', 'terms')
 
     # Create Term and TermBreak nodes linked to AcademicYear
     term_number = 1
     academic_term_number = 1
-    for _, term_row in terms_df.iterrows():
+    for term_row in terms_df.to_dict(orient='records'):
         term_node_class = timetable_neo.AcademicTermNode if term_row['TermType'] == 'Term' else timetable_neo.AcademicTermBreakNode
         term_name = term_row['TermName']
         term_name_no_spaces = term_name.replace(' ', '')
@@ -172,7 +285,7 @@ def create_school_timetable(dataframes, db_name, school_node=None):
                 start_date=datetime.strptime(term_start_date, '%Y-%m-%d'),
                 end_date=datetime.strptime(term_end_date, '%Y-%m-%d')
             )
-        neon.create_or_merge_neontology_node(term_node, database=db_name, operation='merge')
+        graph_buffer.merge_node(term_node)
         if isinstance(term_node, timetable_neo.AcademicTermNode):
             # Create the tldraw file for the node
             fs_handler.create_default_tldraw_file(term_node.path, term_node.to_dict())
@@ -184,18 +297,27 @@ def create_school_timetable(dataframes, db_name, school_node=None):
         term_years = set()
         term_years.update([term_node.start_date.year, term_node.end_date.year])
 
-        for academic_year_node in timetable_nodes['academic_year_nodes']:
-            if int(academic_year_node.year) in term_years:
+        for term_year in sorted(term_years):
+            academic_year_node = academic_years_by_year.get(term_year)
+            if academic_year_node is not None:
                 relationship_class = tt_rels.AcademicYearHasAcademicTerm if term_row['TermType'] == 'Term' else tt_rels.AcademicYearHasAcademicTermBreak
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=academic_year_node, target=term_node),
-                    database=db_name, operation='merge'
+                graph_buffer.merge_relationship(
+                    relationship_class(source=academic_year_node, target=term_node)
                 )
                 logging.info(f"Created school timetable relationship from {academic_year_node.unique_id} to {term_node.unique_id}")
 
+    # Terms and term breaks don't overlap, so a date is in at most one of them
+    terms_index = DateIntervalIndex(
+        (term_node.start_date, term_node.end_date, term_node) for term_node in timetable_nodes['academic_term_nodes']
+    )
+    # Each date maps to the first week which covers it
+    academic_weeks_by_date = {}
+
+    finish_stage('terms', 'weeks')
+
     # Create Week nodes
     academic_week_number = 1
-    for _, week_row in weeks_df.iterrows():
+    for week_row in weeks_df.to_dict(orient='records'):
         week_node_class = timetable_neo.HolidayWeekNode if week_row['WeekType'] == 'Holiday' else timetable_neo.AcademicWeekNode
         week_start_date = week_row['WeekStart']
         if isinstance(week_start_date, pd.Timestamp):
@@ -223,54 +345,52 @@ def create_school_timetable(dataframes, db_name, school_node=None):
                 path=timetable_week_path
             )
             academic_week_number += 1
-        neon.create_or_merge_neontology_node(week_node, database=db_name, operation='merge')
+        graph_buffer.merge_node(week_node)
         timetable_nodes['academic_week_nodes'].append(week_node)
+        for day_offset in range(7):
+            academic_weeks_by_date.setdefault(week_node.start_date + timedelta(days=day_offset), week_node)
         logging.info(f"Created week node: {week_node.unique_id}")
         if isinstance(week_node, timetable_neo.AcademicWeekNode):
             # Create the tldraw file for the node
             fs_handler.create_default_tldraw_file(week_node.path, week_node.to_dict())
-        for calendar_node in calendar_nodes['calendar_week_nodes']:
-            if calendar_node.start_date == week_node.start_date:
-                if isinstance(week_node, timetable_neo.AcademicWeekNode):
-                    neon.create_or_merge_neontology_relationship(
-                        cal_tt_rels.AcademicWeekIsCalendarWeek(source=week_node, target=calendar_node),
-                        database=db_name, operation='merge'
-                    )
-                    logging.info(f"Created school timetable relationship from {calendar_node.unique_id} to {week_node.unique_id}")
-                elif isinstance(week_node, timetable_neo.HolidayWeekNode):
-                    neon.create_or_merge_neontology_relationship(
-                        cal_tt_rels.HolidayWeekIsCalendarWeek(source=week_node, target=calendar_node),
-                        database=db_name, operation='merge'
-                    )
-                    logging.info(f"Created school timetable relationship from {calendar_node.unique_id} to {week_node.unique_id}")
-                break
+        calendar_node = calendar_weeks_by_start_date.get(week_node.start_date)
+        if calendar_node is not None:
+            if isinstance(week_node, timetable_neo.AcademicWeekNode):
+                graph_buffer.merge_relationship(
+                    cal_tt_rels.AcademicWeekIsCalendarWeek(source=week_node, target=calendar_node)
+                )
+                logging.info(f"Created school timetable relationship from {calendar_node.unique_id} to {week_node.unique_id}")
+            elif isinstance(week_node, timetable_neo.HolidayWeekNode):
+                graph_buffer.merge_relationship(
+                    cal_tt_rels.HolidayWeekIsCalendarWeek(source=week_node, target=calendar_node)
+                )
+                logging.info(f"Created school timetable relationship from {calendar_node.unique_id} to {week_node.unique_id}")
 
         # Link week node to the correct academic term
-        for term_node in timetable_nodes['academic_term_nodes']:
-            if term_node.start_date <= week_node.start_date <= term_node.end_date:
-                relationship_class = tt_rels.AcademicTermHasAcademicWeek if week_row['WeekType'] != 'Holiday' else tt_rels.AcademicTermBreakHasHolidayWeek
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=term_node, target=week_node),
-                    database=db_name, operation='merge'
-                )
-                logging.info(f"Created school timetable relationship from {term_node.unique_id} to {week_node.unique_id}")
-                break
+        term_node = terms_index.find(week_node.start_date)
+        if term_node is not None:
+            relationship_class = tt_rels.AcademicTermHasAcademicWeek if week_row['WeekType'] != 'Holiday' else tt_rels.AcademicTermBreakHasHolidayWeek
+            graph_buffer.merge_relationship(
+                relationship_class(source=term_node, target=week_node)
+            )
+            logging.info(f"Created school timetable relationship from {term_node.unique_id} to {week_node.unique_id}")
 
         # Link week node to the correct academic year
-        for academic_year_node in timetable_nodes['academic_year_nodes']:
-            if int(academic_year_node.year) == week_node.start_date.year:
-                relationship_class = tt_rels.AcademicYearHasAcademicWeek if week_row['WeekType'] != 'Holiday' else tt_rels.AcademicYearHasHolidayWeek
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=academic_year_node, target=week_node),
-                    database=db_name, operation='merge'
-                )
-                logging.info(f"Created school timetable relationship from {academic_year_node.unique_id} to {week_node.unique_id}")
-                break
+        academic_year_node = academic_years_by_year.get(week_node.start_date.year)
+        if academic_year_node is not None:
+            relationship_class = tt_rels.AcademicYearHasAcademicWeek if week_row['WeekType'] != 'Holiday' else tt_rels.AcademicYearHasHolidayWeek
+            graph_buffer.merge_relationship(
+                relationship_class(source=academic_year_node, target=week_node)
+            )
+            logging.info(f"Created school timetable relationship from {academic_year_node.unique_id} to {week_node.unique_id}")
+
+    finish_stage('weeks', 'days')
 
     # Create Day nodes
+    period_templates = build_period_templates(periods_df)
     day_number = 1
     academic_day_number = 1
-    for _, day_row in days_df.iterrows():        
+    for day_row in days_df.to_dict(orient='records'):
         date_str = day_row['Date']
         if isinstance(date_str, pd.Timestamp):
             date_str = date_str.strftime('%Y-%m-%d')
@@ -300,138 +420,119 @@ def create_school_timetable(dataframes, db_name, school_node=None):
         
         day_node = day_node_class(**day_node_data)
         
-        for calendar_node in calendar_nodes['calendar_day_nodes']:
-            if calendar_node.date == day_node.date:
-                neon.create_or_merge_neontology_node(day_node, database=db_name, operation='merge')
-                timetable_nodes['academic_day_nodes'].append(day_node)
-                logging.info(f"Created day node: {day_node.unique_id}")
-                
-                if isinstance(day_node, timetable_neo.AcademicDayNode):
-                    fs_handler.create_default_tldraw_file(day_node.path, day_node.to_dict())
-                    relationship_class = cal_tt_rels.AcademicDayIsCalendarDay
-                elif isinstance(day_node, timetable_neo.HolidayDayNode):
-                    relationship_class = cal_tt_rels.HolidayDayIsCalendarDay
-                elif isinstance(day_node, timetable_neo.OffTimetableDayNode):
-                    relationship_class = cal_tt_rels.OffTimetableDayIsCalendarDay
-                elif isinstance(day_node, timetable_neo.StaffDayNode):
-                    relationship_class = cal_tt_rels.StaffDayIsCalendarDay
-                
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=day_node, target=calendar_node),
-                    database=db_name, operation='merge'
-                )
-                logging.info(f'Created relationship from {calendar_node.unique_id} to {day_node.unique_id}')
-                break
+        calendar_node = calendar_days_by_date.get(day_node.date)
+        if calendar_node is not None:
+            graph_buffer.merge_node(day_node)
+            timetable_nodes['academic_day_nodes'].append(day_node)
+            logging.info(f"Created day node: {day_node.unique_id}")
+            
+            if isinstance(day_node, timetable_neo.AcademicDayNode):
+                fs_handler.create_default_tldraw_file(day_node.path, day_node.to_dict())
+                relationship_class = cal_tt_rels.AcademicDayIsCalendarDay
+            elif isinstance(day_node, timetable_neo.HolidayDayNode):
+                relationship_class = cal_tt_rels.HolidayDayIsCalendarDay
+            elif isinstance(day_node, timetable_neo.OffTimetableDayNode):
+                relationship_class = cal_tt_rels.OffTimetableDayIsCalendarDay
+            elif isinstance(day_node, timetable_neo.StaffDayNode):
+                relationship_class = cal_tt_rels.StaffDayIsCalendarDay
+            
+            graph_buffer.merge_relationship(
+                relationship_class(source=day_node, target=calendar_node)
+            )
+            logging.info(f'Created relationship from {calendar_node.unique_id} to {day_node.unique_id}')
         
         # Link day node to the correct academic week
-        for academic_week_node in timetable_nodes['academic_week_nodes']:
-            if academic_week_node.start_date <= day_node.date <= (academic_week_node.start_date + timedelta(days=6)):
-                if day_row['DayType'] == 'Academic':
-                    relationship_class = tt_rels.AcademicWeekHasAcademicDay
-                elif day_row['DayType'] == 'Holiday':
-                    if hasattr(academic_week_node, 'week_type') and academic_week_node.week_type in ['A', 'B']:
-                        relationship_class = tt_rels.AcademicWeekHasHolidayDay
-                    else:
-                        relationship_class = tt_rels.HolidayWeekHasHolidayDay
-                elif day_row['DayType'] == 'OffTimetable':
-                    relationship_class = tt_rels.AcademicWeekHasOffTimetableDay
-                elif day_row['DayType'] == 'Staff':
-                    relationship_class = tt_rels.AcademicWeekHasStaffDay
+        academic_week_node = academic_weeks_by_date.get(day_node.date)
+        relationship_class = None
+        if academic_week_node is not None:
+            if day_row['DayType'] == 'Academic':
+                relationship_class = tt_rels.AcademicWeekHasAcademicDay
+            elif day_row['DayType'] == 'Holiday':
+                if hasattr(academic_week_node, 'week_type') and academic_week_node.week_type in ['A', 'B']:
+                    relationship_class = tt_rels.AcademicWeekHasHolidayDay
                 else:
-                    continue  # Skip linking for other day types
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=academic_week_node, target=day_node),
-                    database=db_name, operation='merge'
-                )
-                logging.info(f"Created relationship from {academic_week_node.unique_id} to {day_node.unique_id}")
-                break
+                    relationship_class = tt_rels.HolidayWeekHasHolidayDay
+            elif day_row['DayType'] == 'OffTimetable':
+                relationship_class = tt_rels.AcademicWeekHasOffTimetableDay
+            elif day_row['DayType'] == 'Staff':
+                relationship_class = tt_rels.AcademicWeekHasStaffDay
+            # Other day types aren't linked
+        if relationship_class is not None:
+            graph_buffer.merge_relationship(
+                relationship_class(source=academic_week_node, target=day_node)
+            )
+            logging.info(f"Created relationship from {academic_week_node.unique_id} to {day_node.unique_id}")
 
         # Link day node to the correct academic term
-        for term_node in timetable_nodes['academic_term_nodes']:
-            if term_node.start_date <= day_node.date <= term_node.end_date:
-                if day_row['DayType'] == 'Academic':
-                    relationship_class = tt_rels.AcademicTermHasAcademicDay
-                elif day_row['DayType'] == 'Holiday':
-                    if isinstance(term_node, timetable_neo.AcademicTermNode):
-                        relationship_class = tt_rels.AcademicTermHasHolidayDay
-                    else:
-                        relationship_class = tt_rels.AcademicTermBreakHasHolidayDay
-                elif day_row['DayType'] == 'OffTimetable':
-                    relationship_class = tt_rels.AcademicTermHasOffTimetableDay
-                elif day_row['DayType'] == 'Staff':
-                    relationship_class = tt_rels.AcademicTermHasStaffDay
+        term_node = terms_index.find(day_node.date)
+        relationship_class = None
+        if term_node is not None:
+            if day_row['DayType'] == 'Academic':
+                relationship_class = tt_rels.AcademicTermHasAcademicDay
+            elif day_row['DayType'] == 'Holiday':
+                if isinstance(term_node, timetable_neo.AcademicTermNode):
+                    relationship_class = tt_rels.AcademicTermHasHolidayDay
                 else:
-                    continue  # Skip linking for other day types
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=term_node, target=day_node),
-                    database=db_name, operation='merge'
-                )
-                logging.info(f"Created relationship from {term_node.unique_id} to {day_node.unique_id}")
-                break
+                    relationship_class = tt_rels.AcademicTermBreakHasHolidayDay
+            elif day_row['DayType'] == 'OffTimetable':
+                relationship_class = tt_rels.AcademicTermHasOffTimetableDay
+            elif day_row['DayType'] == 'Staff':
+                relationship_class = tt_rels.AcademicTermHasStaffDay
+            # Other day types aren't linked
+        if relationship_class is not None:
+            graph_buffer.merge_relationship(
+                relationship_class(source=term_node, target=day_node)
+            )
+            logging.info(f"Created relationship from {term_node.unique_id} to {day_node.unique_id}")
         
         # Create Period nodes for each academic day
         if day_row['DayType'] == 'Academic':
             logging.info(f"Creating periods for {day_node.unique_id}")
-            period_of_day = 1
-            academic_or_registration_period_of_day = 1
-            for _, period_row in periods_df.iterrows():
-                period_node_class = {
-                    'Academic': timetable_neo.AcademicPeriodNode,
-                    'Registration': timetable_neo.RegistrationPeriodNode,
-                    'Break': timetable_neo.BreakPeriodNode,
-                    'OffTimetable': timetable_neo.OffTimetablePeriodNode
-                }[period_row['PeriodType']]
+            week_type = day_row['WeekType']
+            day_name_short = day_node.day_of_week[:3]
+            for period in period_templates:
+                period_node_class = period['node_class']
+                period_of_day = period['period_of_day']
                 
                 logging.info(f"Creating period node for {period_node_class.__name__} Period: {period_of_day}")
                 period_node_unique_id = f"{period_node_class.__name__}_{school_timetable_unique_id}_Day_{academic_day_number}_Period_{period_of_day}"
                 logging.debug(f"Period node unique id: {period_node_unique_id}")
                 period_node_data = {
                     'unique_id': period_node_unique_id,
-                    'name': period_row['PeriodName'],
+                    'name': period['name'],
                     'date': day_node.date,
-                    'start_time': datetime.combine(day_node.date, period_row['StartTime']),
-                    'end_time': datetime.combine(day_node.date, period_row['EndTime'])
+                    'start_time': datetime.combine(day_node.date, period['start_time']),
+                    'end_time': datetime.combine(day_node.date, period['end_time'])
                 }
                 logging.debug(f"Period node data: {period_node_data}")
-                if period_row['PeriodType'] in ['Academic', 'Registration']:
+                if period['period_dir'] is not None:
                     _, timetable_period_path = fs_handler.create_school_timetable_period_directory(
                         timetable_path=timetable_path,
                         academic_day=academic_day_number,
-                        period_dir=f"{academic_or_registration_period_of_day}_{period_row['PeriodName'].replace(' ', '_')}"
+                        period_dir=period['period_dir']
                     )
-                    week_type = day_row['WeekType']
-                    day_name_short = day_node.day_of_week[:3]
-                    period_code = period_row['PeriodCode']
-                    period_code_formatted = f"{week_type}{day_name_short}{period_code}"
-                    period_node_data['period_code'] = period_code_formatted
+                    period_node_data['period_code'] = f"{week_type}{day_name_short}{period['period_code']}"
                     period_node_data['path'] = timetable_period_path
-                    
-                    academic_or_registration_period_of_day += 1
                 
                 period_node = period_node_class(**period_node_data)
-                neon.create_or_merge_neontology_node(period_node, database=db_name, operation='merge')
-                if isinstance(period_node, timetable_neo.AcademicPeriodNode) or isinstance(period_node, timetable_neo.RegistrationPeriodNode):
+                period_buffer.merge_node(period_node)
+                if period['period_dir'] is not None:
                     # Create the tldraw file for the node
                     fs_handler.create_default_tldraw_file(period_node.path, period_node.to_dict())
                 timetable_nodes['academic_period_nodes'].append(period_node)
                 logging.info(f'Created period node: {period_node.unique_id}')
                 
-                relationship_class = {
-                    'Academic': tt_rels.AcademicDayHasAcademicPeriod,
-                    'Registration': tt_rels.AcademicDayHasRegistrationPeriod,
-                    'Break': tt_rels.AcademicDayHasBreakPeriod,
-                    'OffTimetable': tt_rels.AcademicDayHasOffTimetablePeriod
-                }[period_row['PeriodType']]
-                
-                neon.create_or_merge_neontology_relationship(
-                    relationship_class(source=day_node, target=period_node),
-                    database=db_name, operation='merge'
+                period_buffer.merge_relationship(
+                    period['relationship_class'](source=day_node, target=period_node)
                 )
                 logging.info(f"Created relationship from {day_node.unique_id} to {period_node.unique_id}")
-                period_of_day += 1 # We don't use this but we could
             academic_day_number += 1 # This is a bit of a hack but it works to keep the directories aligned (reorganise)
         day_number += 1 # We don't use this but we could
 
+    finish_stage('days', 'sequences')
+    begin_stage('periods', period_buffer)
+    finish_stage('periods', buffer=period_buffer)
+
     def create_school_timetable_node_sequence_rels(timetable_nodes):
         def sort_and_create_relationships(nodes, relationship_map, sort_key):
             sorted_nodes = sorted(nodes, key=sort_key)
@@ -443,12 +544,11 @@ def create_school_timetable(dataframes, db_name, school_node=None):
                 if relationship_class:
                     # Avoid self-referential relationships
                     if source_node.unique_id != target_node.unique_id:
-                        neon.create_or_merge_neontology_relationship(
+                        graph_buffer.merge_relationship(
                             relationship_class(
                                 source=source_node,
                                 target=target_node
-                            ),
-                            database=db_name, operation='merge'
+                            )
                         )
                         logging.info(f"Created relationship from {source_node.unique_id} to {target_node.unique_id}")
                     else:
@@ -523,6 +623,8 @@ def create_school_timetable(dataframes, db_name, school_node=None):
     
     # Call the function with the created timetable nodes
     create_school_timetable_node_sequence_rels(timetable_nodes)
+    finish_stage('sequences')
+    fs_handler.create_planned_directories()
     
     logging.info(f'Created timetable: {timetable_nodes["timetable_node"].unique_id}')
 
@@ -530,8 +632,12 @@ def create_school_timetable(dataframes, db_name, school_node=None):
     # root_timetable_directory = fs_handler.root_path  # Access the root directory of the filesystem handler
     # fs_handler.log_directory_structure(root_timetable_directory)
     
-    return {
+    result = {
         'school_node': school_node,
         'school_calendar_nodes': calendar_nodes,
         'school_timetable_nodes': timetable_nodes
-    }
\ No newline at end of file
+    }
+    if plan:
+        result['dry_run'] = plan.report()
+        logging.info(f"Planned timetable for {db_name}: {result['dry_run']}")
+    return result
\ No newline at end of file
@@ -41,7 +41,7 @@ def get_school_worker_classes(school_db_name: str, user_unique_id: str, worker_u
     -[:TIMETABLE_HAS_CLASS]->(c:SubjectClass)
     RETURN c
     """
-    with driver.get_driver(db_name=school_db_name).session(database=school_db_name) as session:
+    with driver.get_session(database=school_db_name) as session:
         result = session.run(query, worker_id=worker_unique_id)
         classes = [record['c'] for record in result]
         if not classes:
@@ -56,13 +56,36 @@ def get_school_class_periods(school_db_name: str, class_unique_id: str) -> list:
     MATCH (c:SubjectClass {unique_id: $class_id})-[:CLASS_HAS_LESSON]->(l:TimetableLesson)
     RETURN l
     """
-    with driver.get_driver(db_name=school_db_name).session(database=school_db_name) as session:
+    with driver.get_session(database=school_db_name) as session:
         result = session.run(query, class_id=class_unique_id)
         periods = [record['l'] for record in result]
         if not periods:
             logging.warning(f"No periods found for class {class_unique_id} in school database")
         return periods
 
+def get_school_worker_class_periods(school_db_name: str, worker_unique_id: str) -> list:
+    """
+    Retrieve all classes for a worker with the periods of each class, in one query.
+
+    Returns a list of (class, periods) tuples.
+    """
+    query = """
+    MATCH (w:Teacher {unique_id: $worker_id})-[:TEACHER_HAS_TIMETABLE]->(tt:TeacherTimetable)
+    -[:TIMETABLE_HAS_CLASS]->(c:SubjectClass)
+    OPTIONAL MATCH (c)-[:CLASS_HAS_LESSON]->(l:TimetableLesson)
+    RETURN c, collect(l) AS periods
+    """
+    with driver.get_session(database=school_db_name) as session:
+        result = session.run(query, worker_id=worker_unique_id)
+        class_periods = [(record['c'], record['periods']) for record in result]
+        if not class_periods:
+            logging.warning(f"No classes found for teacher {worker_unique_id} in school database")
+        return class_periods
+
+def _native_date(value):
+    """Neo4j dates don't hash like python dates, so convert them before using them as keys."""
+    return value.to_native() if hasattr(value, 'to_native') else value
+
 def get_user_calendar_nodes(user_db_name: str, user_node: UserNode) -> list:
     """
     Retrieve all calendar day nodes for a user.
@@ -83,7 +106,7 @@ def get_user_calendar_nodes(user_db_name: str, user_node: UserNode) -> list:
     LIMIT 1
     """
 
-    with driver.get_driver(db_name=user_db_name).session(database=user_db_name) as session:
+    with driver.get_session(database=user_db_name) as session:
         # First check the calendar structure
         result = session.run(verify_query, user_id=user_node.unique_id)
         if stats := result.single():
@@ -162,6 +185,7 @@ def create_user_worker_timetable(
 
     # Initialize neontology connection
     neon.init_neontology_connection()
+    graph_buffer = neon.GraphWriteBuffer(database=user_db_name)
 
     # Get user's calendar nodes
     calendar_nodes = get_user_calendar_nodes(user_db_name, user_node)
@@ -171,6 +195,9 @@ def create_user_worker_timetable(
             "status": "error",
             "message": "No calendar nodes found for user"
         }
+    calendar_days_by_date = {}
+    for day in calendar_nodes:
+        calendar_days_by_date.setdefault(_native_date(day.date), day)
 
     try:
         # Create UserTeacherTimetableNode
@@ -183,19 +210,18 @@ def create_user_worker_timetable(
         )
 
         # Create the timetable node and its tldraw file
-        neon.create_or_merge_neontology_node(worker_timetable, database=user_db_name, operation='merge')
+        graph_buffer.merge_node(worker_timetable)
         fs_handler.create_default_tldraw_file(worker_timetable.path, worker_timetable.to_dict())
 
         # Link timetable to teacher using the correct relationship structure
-        neon.create_or_merge_neontology_relationship(
-            TeacherHasTimetable(source=user_worker_node, target=worker_timetable),
-            database=user_db_name,
-            operation='merge'
+        graph_buffer.merge_relationship(
+            TeacherHasTimetable(source=user_worker_node, target=worker_timetable)
         )
         
-        # Get classes from school database
-        school_classes = get_school_worker_classes(school_db_name, user_node.unique_id, user_worker_node.unique_id)
+        # Get classes and their periods from school database
+        school_classes = get_school_worker_class_periods(school_db_name, user_worker_node.unique_id)
         if not school_classes:
+            graph_buffer.flush()
             logging.warning(f"No classes found for teacher {user_worker_node.unique_id} in school database")
             return {
                 "status": "warning",
@@ -205,7 +231,7 @@ def create_user_worker_timetable(
         # Dictionary to store lessons by class
         class_lessons = {}
 
-        for class_data in school_classes:
+        for class_data, periods in school_classes:
             class_name_safe = class_data['subject_class_code'].replace(' ', '_')
             _, class_path = fs_handler.create_teacher_class_directory(worker_timetable_path, class_name_safe)
 
@@ -218,21 +244,17 @@ def create_user_worker_timetable(
                 subject_code=class_data['subject_code'],
                 path=class_path
             )
-            neon.create_or_merge_neontology_node(subject_class_node, database=user_db_name, operation='merge')
+            graph_buffer.merge_node(subject_class_node)
             fs_handler.create_default_tldraw_file(subject_class_node.path, subject_class_node.to_dict())
 
             # Link class to timetable
-            neon.create_or_merge_neontology_relationship(
-                TimetableHasClass(source=worker_timetable, target=subject_class_node),
-                database=user_db_name,
-                operation='merge'
+            graph_buffer.merge_relationship(
+                TimetableHasClass(source=worker_timetable, target=subject_class_node)
             )
 
             # Initialize empty list for this class's lessons
             class_lessons[class_data['unique_id']] = []
 
-            # Get periods from school database
-            periods = get_school_class_periods(school_db_name, class_data['unique_id'])
             if not periods:
                 logging.warning(f"No periods found for class {class_data['unique_id']} in school database")
                 continue
@@ -252,14 +274,7 @@ def create_user_worker_timetable(
                     path="Not set"  # Will be set after creating directories
                 )
 
-                if calendar_day := next(
-                    (
-                        day
-                        for day in calendar_nodes
-                        if day.date == period_data['date']
-                    ),
-                    None,
-                ):
+                if calendar_day := calendar_days_by_date.get(_native_date(period_data['date'])):
                     # Create lesson directory using calendar info
                     _, lesson_path = fs_handler.create_teacher_timetable_lesson_directory(
                         class_path,
@@ -268,24 +283,20 @@ def create_user_worker_timetable(
                     timetable_lesson_node.path = lesson_path
 
                     # Create and link nodes
-                    neon.create_or_merge_neontology_node(timetable_lesson_node, database=user_db_name, operation='merge')
+                    graph_buffer.merge_node(timetable_lesson_node)
                     fs_handler.create_default_tldraw_file(timetable_lesson_node.path, timetable_lesson_node.to_dict())
 
                     # Link lesson to class
-                    neon.create_or_merge_neontology_relationship(
-                        ClassHasLesson(source=subject_class_node, target=timetable_lesson_node),
-                        database=user_db_name,
-                        operation='merge'
+                    graph_buffer.merge_relationship(
+                        ClassHasLesson(source=subject_class_node, target=timetable_lesson_node)
                     )
 
                     # Link lesson to calendar day (keeping only one direction)
-                    neon.create_or_merge_neontology_relationship(
+                    graph_buffer.merge_relationship(
                         CalendarDayHasTimetableLesson(
                             source=calendar_day,
                             target=timetable_lesson_node
-                        ),
-                        database=user_db_name,
-                        operation='merge'
+                        )
                     )
 
                     # Store the lesson node
@@ -309,17 +320,16 @@ def create_user_worker_timetable(
                 
                 # Skip if current and next lesson are the same node
                 if current_lesson.unique_id != next_lesson.unique_id:
-                    neon.create_or_merge_neontology_relationship(
+                    graph_buffer.merge_relationship(
                         TimetableLessonFollowsTimetableLesson(
                             source=current_lesson,
                             target=next_lesson
-                        ),
-                        database=user_db_name,
-                        operation='merge'
+                        )
                     )
             
             logging.info(f"Created sequential relationships for class {class_id}")
 
+        graph_buffer.flush()
         logging.info(f"Successfully created user timetable structure for {user_worker_node.teacher_code}")
         return {
             "status": "success",
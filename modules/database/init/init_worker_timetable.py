@@ -16,7 +16,6 @@ import pandas as pd
 import re
 import modules.database.tools.neo4j_driver_tools as driver
 import modules.database.tools.neontology_tools as neon
-import modules.database.tools.neo4j_session_tools as session
 from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem
 from modules.database.schemas.entity_neo import SubjectClassNode, TeacherNode
 from modules.database.schemas.timetable_neo import AcademicPeriodNode, RegistrationPeriodNode, BreakPeriodNode, OffTimetablePeriodNode
@@ -24,6 +23,37 @@ from modules.database.schemas.teacher_timetable_neo import TeacherTimetableNode,
 from modules.database.schemas.curriculum_neo import YearGroupSyllabusNode
 from modules.database.schemas.relationships.planning_relationships import TimetableLessonBelongsToPeriod, TimetableLessonHasPlannedLesson, TeacherHasTimetable, TimetableHasClass, ClassHasLesson, TimetableLessonFollowsTimetableLesson, PlannedLessonFollowsPlannedLesson, SubjectClassBelongsToYearGroupSyllabus
 
+def prefetch_period_nodes(neo_session, period_codes):
+    """Fetch every academic and registration period with one of the period codes in one query.
+
+    Returns a dict keyed on (label, period_code) with the matching period nodes.
+    """
+    query = """
+    MATCH (n:AcademicPeriod) WHERE n.period_code IN $period_codes
+    RETURN 'AcademicPeriod' AS label, n
+    UNION ALL
+    MATCH (n:RegistrationPeriod) WHERE n.period_code IN $period_codes
+    RETURN 'RegistrationPeriod' AS label, n
+    """
+    periods_by_code = {}
+    for record in neo_session.run(query, period_codes=list(period_codes)):
+        periods_by_code.setdefault((record['label'], record['n']['period_code']), []).append(record['n'])
+    logging.info(f"Prefetched {sum(len(x) for x in periods_by_code.values())} periods for {len(periods_by_code)} period codes")
+    return periods_by_code
+
+def prefetch_year_group_syllabuses(neo_session, year_group_subject_codes):
+    """Fetch the YearGroupSyllabus nodes for (year group, subject code) pairs in one query."""
+    query = """
+    UNWIND $keys AS key
+    MATCH (n:YearGroupSyllabus)
+    WHERE n.yr_syllabus_year_group = key[0] AND n.yr_syllabus_subject_code = key[1]
+    RETURN key, n
+    """
+    syllabuses = {}
+    for record in neo_session.run(query, keys=[list(x) for x in year_group_subject_codes]):
+        syllabuses.setdefault(tuple(record['key']), record['n'])
+    return syllabuses
+
 def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: TeacherNode):
     logging.info(f"School worker node: {school_worker_node}")
     worker_node = TeacherNode(**school_worker_node)
@@ -36,6 +66,7 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
     
     logging.info(f"Initialising neo4j connection...")
     neon.init_neontology_connection()
+    graph_buffer = neon.GraphWriteBuffer(database=worker_db_name)
     
     try:
         timetable_unique_id = f"TeacherTimetable_{worker_node.teacher_code}"
@@ -43,14 +74,23 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
             unique_id=timetable_unique_id,
             path=worker_timetable_path
         )
-        neon.create_or_merge_neontology_node(worker_timetable, database=worker_db_name, operation='merge')
+        graph_buffer.merge_node(worker_timetable)
         fs_handler.create_default_tldraw_file(worker_timetable.path, worker_timetable.to_dict())
-        neon.create_or_merge_neontology_relationship(
-            TeacherHasTimetable(source=worker_node, target=worker_timetable),
-            database=worker_db_name, operation='merge'
+        graph_buffer.merge_relationship(
+            TeacherHasTimetable(source=worker_node, target=worker_timetable)
         )
         logging.info(f"Teacher timetable node created: {worker_timetable}")
         
+        # Prefetch the periods and syllabuses for every class, so building lessons is an in-memory join
+        class_rows = timetable_df[timetable_df['Class'].notna()]
+        year_group_subject_codes = {
+            (str(int(class_df['YearGroup'].iloc[0])), str(class_df['SubjectCode'].iloc[0]))
+            for _, class_df in class_rows.groupby('Class')
+        }
+        with driver.get_session(database=worker_db_name) as neo_session:
+            periods_by_code = prefetch_period_nodes(neo_session, class_rows['PeriodCode'].dropna().unique().tolist())
+            year_group_syllabuses = prefetch_year_group_syllabuses(neo_session, year_group_subject_codes)
+        
         # Group the timetable by class
         class_groups = timetable_df.groupby('Class')
         for class_name, class_df in class_groups:
@@ -67,29 +107,23 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
                     subject_code=str(class_df['SubjectCode'].iloc[0]),
                     path=class_path
                 )
-                neon.create_or_merge_neontology_node(subject_class_node, database=worker_db_name, operation='merge')
+                graph_buffer.merge_node(subject_class_node)
                 logging.info(f"Class node created: {subject_class_node}")
                 # Create the tldraw file for the node
                 fs_handler.create_default_tldraw_file(subject_class_node.path, subject_class_node.to_dict())
                 
                 # Link ClassNode to TeacherTimetableNode
-                neon.create_or_merge_neontology_relationship(
-                    TimetableHasClass(source=worker_timetable, target=subject_class_node),
-                    database=worker_db_name, operation='merge'
+                graph_buffer.merge_relationship(
+                    TimetableHasClass(source=worker_timetable, target=subject_class_node)
                 )
                 logging.info(f"Relationship created from {worker_timetable.unique_id} to {subject_class_node.unique_id}")
                 
                 # Link class to corresponding YearGoupSyllabus
-                
-                year_group_syllabus_search_driver = driver.get_driver(worker_db_name)
-                year_group_syllabus_search_session = year_group_syllabus_search_driver.session(database=worker_db_name)
-                year_group_syllabus = session.find_nodes_by_label_and_properties(year_group_syllabus_search_session, "YearGroupSyllabus", {"yr_syllabus_year_group": subject_class_node.year_group, "yr_syllabus_subject_code": subject_class_node.subject_code})
+                year_group_syllabus = year_group_syllabuses.get((subject_class_node.year_group, subject_class_node.subject_code))
                 if year_group_syllabus:
-                    year_group_syllabus_node_data = year_group_syllabus[0]
-                    year_group_syllabus_node = YearGroupSyllabusNode(**year_group_syllabus_node_data)
-                    neon.create_or_merge_neontology_relationship(
-                        SubjectClassBelongsToYearGroupSyllabus(source=subject_class_node, target=year_group_syllabus_node),
-                        database=worker_db_name, operation='merge'
+                    year_group_syllabus_node = YearGroupSyllabusNode(**year_group_syllabus)
+                    graph_buffer.merge_relationship(
+                        SubjectClassBelongsToYearGroupSyllabus(source=subject_class_node, target=year_group_syllabus_node)
                     )
                     logging.info(f"Relationship created from {subject_class_node.unique_id} to {year_group_syllabus_node.unique_id}")
                 else:
@@ -99,18 +133,13 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
                 planned_lesson_nodes = []
                 lesson_number = 0
                 for _, row in class_df.iterrows():
-                    properties = {
-                        "period_code": row['PeriodCode']
-                    }
-                    class_lessons_search_driver = driver.get_driver(worker_db_name)
-                    class_lessons_search_session = class_lessons_search_driver.session(database=worker_db_name)
                     # If the period code contains "Rg" then we want to find the corresponding registration period and use its unique id
                     if "Rg" in row['PeriodCode']: # TODO: This is hacky and not very flexible. We are assuming that any period code containing "Rg" is a registration period. We should probably find a more robust way to identify registration periods
                         logging.info(f"Registration period found for class {class_name} with period code {row['PeriodCode']}")
-                        class_lessons = session.find_nodes_by_label_and_properties(class_lessons_search_session, "RegistrationPeriod", properties)
+                        class_lessons = periods_by_code.get(("RegistrationPeriod", row['PeriodCode']), [])
                     else:
                         logging.info(f"Academic period found for class {class_name} with period code {row['PeriodCode']}")
-                        class_lessons = session.find_nodes_by_label_and_properties(class_lessons_search_session, "AcademicPeriod", properties)
+                        class_lessons = periods_by_code.get(("AcademicPeriod", row['PeriodCode']), [])
                     if class_lessons:
                         lesson_of_same_period = 0
                         number_of_lessons = len(class_lessons)
@@ -135,20 +164,18 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
                                 period_code=lesson_period_code,
                                 path="Not set"
                             )
-                            neon.create_or_merge_neontology_node(timetable_lesson_node, database=worker_db_name, operation='merge')
+                            graph_buffer.merge_node(timetable_lesson_node)
                             logging.info(f"TimetableLessonNode created: {timetable_lesson_node}")
                             class_lesson_nodes.append(timetable_lesson_node)
                             
-                            neon.create_or_merge_neontology_relationship(
-                                TimetableLessonBelongsToPeriod(source=timetable_lesson_node, target=period_node),
-                                database=worker_db_name, operation='merge'
+                            graph_buffer.merge_relationship(
+                                TimetableLessonBelongsToPeriod(source=timetable_lesson_node, target=period_node)
                             )
                             logging.info(f"Relationship created from {timetable_lesson_node.unique_id} to {period_node.unique_id}")
                             
                             # Link TimetableLessonNode to ClassNode
-                            neon.create_or_merge_neontology_relationship(
-                                ClassHasLesson(source=subject_class_node, target=timetable_lesson_node),
-                                database=worker_db_name, operation='merge'
+                            graph_buffer.merge_relationship(
+                                ClassHasLesson(source=subject_class_node, target=timetable_lesson_node)
                             )
                             logging.info(f"Relationship created from {subject_class_node.unique_id} to {timetable_lesson_node.unique_id}")
                             
@@ -176,14 +203,13 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
                                 path="Not set"
                             )
                             # Create the PlannedLessonNode
-                            neon.create_or_merge_neontology_node(planned_lesson_node, database=worker_db_name, operation='merge')
+                            graph_buffer.merge_node(planned_lesson_node)
                             logging.info(f"PlannedLessonNode created: {planned_lesson_node}")
                             planned_lesson_nodes.append(planned_lesson_node)
                             
                             # Link PlannedLessonNode to TimetableLessonNode
-                            neon.create_or_merge_neontology_relationship(
-                                TimetableLessonHasPlannedLesson(source=timetable_lesson_node, target=planned_lesson_node),
-                                database=worker_db_name, operation='merge'
+                            graph_buffer.merge_relationship(
+                                TimetableLessonHasPlannedLesson(source=timetable_lesson_node, target=planned_lesson_node)
                             )
                             logging.info(f"Relationship created from {timetable_lesson_node.unique_id} to {planned_lesson_node.unique_id}")
                             lesson_of_same_period += 1
@@ -201,14 +227,13 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
                     i_safe = f"{i:02d}"
                     _, class_lesson_path = fs_handler.create_teacher_timetable_lesson_directory(class_path, f"{i_safe}_{current_node.date}_{current_node.period_code}")
                     current_node.path = class_lesson_path
-                    neon.create_or_merge_neontology_node(current_node, database=worker_db_name, operation='merge')
+                    graph_buffer.merge_node(current_node)
                     logging.info(f"TimetableLessonNode directory created and node merged into database: {current_node}")
                     # Create the tldraw file for the node
                     fs_handler.create_default_tldraw_file(current_node.path, current_node.to_dict())
                     if previous_node:
-                        neon.create_or_merge_neontology_relationship(
-                            TimetableLessonFollowsTimetableLesson(source=previous_node, target=current_node),
-                            database=worker_db_name, operation='merge'
+                        graph_buffer.merge_relationship(
+                            TimetableLessonFollowsTimetableLesson(source=previous_node, target=current_node)
                         )
                         logging.info(f"Sequential relationship created between {previous_node.unique_id} and {current_node.unique_id}")
                 
@@ -219,16 +244,16 @@ def init_worker_timetable(timetable_df: pd.DataFrame, school_worker_node: Teache
                     i_safe = f"{i:02d}"
                     _, planned_lesson_path = fs_handler.create_teacher_planned_lesson_directory(class_path, f"{i_safe}_{current_node.date}_{current_node.period_code}")
                     current_node.path = planned_lesson_path
-                    neon.create_or_merge_neontology_node(current_node, database=worker_db_name, operation='merge')
+                    graph_buffer.merge_node(current_node)
                     logging.info(f"PlannedLessonNode directory created and node merged into database: {current_node}")
                     # Create the tldraw file for the node
                     fs_handler.create_default_tldraw_file(current_node.path, current_node.to_dict())
                     if previous_node:
-                        neon.create_or_merge_neontology_relationship(
-                            PlannedLessonFollowsPlannedLesson(source=previous_node, target=current_node),
-                        database=worker_db_name, operation='merge'
-                    )
+                        graph_buffer.merge_relationship(
+                            PlannedLessonFollowsPlannedLesson(source=previous_node, target=current_node)
+                        )
                     logging.info(f"Sequential relationship created between {previous_node.unique_id} and {current_node.unique_id}")
+        graph_buffer.flush()
         logging.info(f"Successfully initialized worker timetable for worker {worker_node.teacher_code}")
         return {"status": "success", "message": "Worker timetable initialized successfully"}
     
@@ -0,0 +1,202 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_init_xl_ingest'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import hashlib
+import pickle
+import tempfile
+import pandas as pd
+from fastapi import UploadFile
+from modules.executor_tools import run_io, run_cpu
+
+# Kept beside the node filesystem, or the logs when there is none, since both are writable volumes
+XL_CACHE_PATH = os.getenv("XL_CACHE_PATH") or os.path.join(
+    os.getenv("NODE_FILESYSTEM_PATH") or os.getenv("LOG_PATH", "/logs"), ".xl_cache"
+)
+XL_CACHE_MAX_ENTRIES = int(os.getenv("XL_CACHE_MAX_ENTRIES", 64))
+CHUNK_SIZE = 1024 * 1024
+# Bumped when the parsed form of a workbook changes, so older cache entries are ignored
+CACHE_VERSION = 1
+
+# The sheets each import reads; anything else in the workbook is never parsed
+SCHOOL_TIMETABLE_SHEETS = ('school', 'terms', 'weeks', 'days', 'periods')
+CURRICULUM_SHEETS = ('keystagesyllabuses', 'yeargroupsyllabuses', 'topics', 'lessons', 'statements')
+
+
+def copy_and_hash(source, destination):
+    """Copy a file object to another in chunks, returning the SHA-256 of its content."""
+    digest = hashlib.sha256()
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        destination.write(chunk)
+    return digest.hexdigest()
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def spool_upload(upload_file: UploadFile, directory=None, suffix='.xlsx'):
+    """Stream an upload to a temporary file, returning its path and SHA-256."""
+    upload_file.file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, dir=directory, delete=False) as f:
+        sha256 = copy_and_hash(upload_file.file, f)
+    return f.name, sha256
+
+def parse_workbook(path, sheets=None, dtypes=None):
+    """Parse the named sheets of a workbook, matched case-insensitively.
+
+    The workbook is opened once by openpyxl in read_only mode and only the requested
+    sheets are parsed. Returns a dict of lowercase sheet name -> DataFrame. dtypes maps
+    a sheet name to the dtype argument of its read; other columns are inferred.
+    """
+    dtypes = dtypes or {}
+    with pd.ExcelFile(path, engine='openpyxl') as workbook:
+        sheet_names = {name.lower(): name for name in workbook.sheet_names}
+        wanted = tuple(sheet_names) if sheets is None else tuple(sheet.lower() for sheet in sheets)
+        missing = [sheet for sheet in wanted if sheet not in sheet_names]
+        if missing:
+            raise ValueError(f"Workbook is missing sheets {missing}, found {workbook.sheet_names}")
+        return {
+            sheet: workbook.parse(sheet_names[sheet], dtype=dtypes.get(sheet))
+            for sheet in wanted
+        }
+
+
+class WorkbookCache:
+    """Parsed workbooks on local disk, keyed by the SHA-256 of the file and the sheets read.
+
+    Frames are pickled rather than written as Parquet: spreadsheet columns often mix
+    numbers and text, which Arrow cannot store in one column, and pickling keeps the
+    exact frames the parser produced. The least recently used entries beyond
+    max_entries are removed.
+
+    The cache only saves parsing: when its directory cannot be read or written, a
+    lookup is a miss and a store is skipped, with a warning, rather than an error.
+    """
+
+    def __init__(self, cache_dir=XL_CACHE_PATH, max_entries=XL_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, sha256, sheets=None, dtypes=None):
+        spec = repr((CACHE_VERSION, pd.__version__, sorted(sheets) if sheets is not None else None, sorted((dtypes or {}).items(), key=repr)))
+        return f"{sha256}-{hashlib.sha1(spec.encode()).hexdigest()[:12]}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                dataframes = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except OSError as e:
+            logging.warning(f"Workbook cache entry {path} could not be read: {e}")
+            self.misses += 1
+            return None
+        except Exception as e:
+            logging.warning(f"Dropping unreadable workbook cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError as e:
+            logging.warning(f"Could not mark workbook cache entry {path} as used: {e}")
+        self.hits += 1
+        return dataframes
+
+    def put(self, key, dataframes):
+        """Store parsed frames, returning whether they were cached."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(dataframes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            logging.warning(f"Not caching workbook {key} in {self.cache_dir}: {e}")
+            self._remove(tmp_path)
+            return False
+        return True
+
+    def _evict(self):
+        if self.max_entries is None:
+            return
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir) if name.endswith('.pkl')
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f"Could not remove workbook cache entry {path}: {e}")
+
+
+workbook_cache = WorkbookCache()
+
+
+def load_dataframes(path, sheets=None, dtypes=None, sha256=None, cache=workbook_cache):
+    """Read a workbook from disk through the cache, parsing it only on a miss."""
+    key = cache.key(sha256 or hash_file(path), sheets, dtypes)
+    dataframes = cache.get(key)
+    if dataframes is not None:
+        logging.info(f"Using cached workbook {key}")
+        return dataframes
+    dataframes = parse_workbook(path, sheets, dtypes)
+    cached = cache.put(key, dataframes)
+    logging.info(f"Parsed {'and cached ' if cached else ''}workbook {key} with sheets {list(dataframes)}")
+    return dataframes
+
+async def ingest_upload(upload_file: UploadFile, sheets=None, dtypes=None, cache=workbook_cache):
+    """Stream an upload to disk and return its parsed sheets, keyed by lowercase name.
+
+    A workbook seen before is read back from the cache without being parsed. Parsing
+    runs in the CPU pool and the file and cache I/O in the I/O pool.
+    """
+    path, sha256 = await run_io(spool_upload, upload_file)
+    try:
+        key = cache.key(sha256, sheets, dtypes)
+        dataframes = await run_io(cache.get, key)
+        if dataframes is not None:
+            logging.info(f"Using cached workbook {key} for {upload_file.filename}")
+            return dataframes
+        dataframes = await run_cpu(parse_workbook, path, sheets, dtypes)
+        cached = await run_io(cache.put, key, dataframes)
+        logging.info(f"Parsed {'and cached ' if cached else ''}workbook {key} for {upload_file.filename}")
+        return dataframes
+    finally:
+        await run_io(os.remove, path)
@@ -13,7 +13,9 @@ logging = logger.get_logger(
     log_format='default'
 )
 import pandas as pd
+from io import BytesIO
 from fastapi import UploadFile
+from modules.executor_tools import run_cpu
 
 def create_dataframes(excel_file, return_clean=False):
     excel_sheets = pd.read_excel(excel_file, sheet_name=None)
@@ -21,11 +23,15 @@ def create_dataframes(excel_file, return_clean=False):
     logging.info(f"Sheet names: {excel_sheets.keys()}")
     return {sheet.lower(): data for sheet, data in excel_sheets.items()}
 
+def read_excel_sheets(file_content):
+    return pd.read_excel(BytesIO(file_content), sheet_name=None, engine='openpyxl')
+
 def create_dataframes_from_fastapiuploadfile(upload_file: UploadFile):
-    from io import BytesIO
-    file_content = upload_file.file.read()
-    file_content_io = BytesIO(file_content)
-    return pd.read_excel(file_content_io, sheet_name=None, engine='openpyxl')
+    return read_excel_sheets(upload_file.file.read())
+
+async def create_dataframes_from_upload(upload_file: UploadFile):
+    """Parse an uploaded workbook in the CPU pool so the event loop is not blocked."""
+    return await run_cpu(read_excel_sheets, await upload_file.read())
 
 def replace_nan_with_default(data, default_values):
     for key in default_values:
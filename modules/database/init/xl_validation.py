@@ -0,0 +1,262 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_init_xl_validation'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import time
+import datetime
+from datetime import time as datetime_time
+import pandas as pd
+
+# Rows listed per issue; the count always covers all of them
+MAX_REPORTED_ROWS = 20
+
+SCHOOL_TIMETABLE_COLUMNS = {
+    'school': ('Identifier', 'Data'),
+    'terms': ('TermName', 'TermType', 'StartDate', 'EndDate'),
+    'weeks': ('WeekNumber', 'WeekStart', 'WeekType'),
+    'days': ('Date', 'DayType', 'WeekType'),
+    'periods': ('PeriodName', 'PeriodType', 'PeriodCode', 'StartTime', 'EndTime'),
+}
+DAY_TYPES = ('Academic', 'Holiday', 'OffTimetable', 'StaffDay')
+PERIOD_TYPES = ('Academic', 'Registration', 'Break', 'OffTimetable')
+# Periods which get their own directory, named after the period, and a period code
+CODED_PERIOD_TYPES = ('Academic', 'Registration')
+
+CURRICULUM_COLUMNS = {
+    'keystagesyllabuses': ('ID', 'Title', 'Subject', 'SubjectCode', 'Department', 'KeyStage'),
+    'yeargroupsyllabuses': ('ID', 'Title', 'Subject', 'SubjectCode', 'KeyStage', 'YearGroup'),
+    'topics': ('TopicID', 'SyllabusYearID', 'SyllabusSubject', 'SyllabusKeyStage'),
+    'lessons': ('LessonID', 'TopicID', 'SyllabusSubject', 'Lesson'),
+    'statements': ('StatementID', 'LessonID', 'SyllabusSubject'),
+}
+CURRICULUM_ID_COLUMNS = {
+    'keystagesyllabuses': 'ID',
+    'yeargroupsyllabuses': 'ID',
+    'topics': 'TopicID',
+    'lessons': 'LessonID',
+    'statements': 'StatementID',
+}
+
+
+class WorkbookValidationError(ValueError):
+    """Raised when a workbook fails validation; carries the full report."""
+
+    def __init__(self, report):
+        self.report = report
+        summary = "; ".join(f"{error['sheet']}: {error['message']}" for error in report['errors'][:5])
+        super().__init__(f"Workbook failed validation with {len(report['errors'])} errors: {summary}")
+
+
+class ValidationReport:
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self.errors = []
+        self.warnings = []
+        self._started = time.perf_counter()
+
+    def add(self, sheet, message, mask=None, column=None, level='error'):
+        """Record an issue, for the rows of a sheet where mask is True if a mask is given."""
+        issue = {'sheet': sheet, 'column': column, 'message': message}
+        if mask is not None:
+            count = int(mask.sum())
+            if not count:
+                return
+            # Row numbers as shown in Excel: one header row, counting from 1
+            issue['count'] = count
+            issue['rows'] = [int(i) + 2 for i in mask[mask].index[:MAX_REPORTED_ROWS]]
+        (self.errors if level == 'error' else self.warnings).append(issue)
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {
+            'workbook': self.workbook,
+            'valid': self.valid,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'milliseconds': round((time.perf_counter() - self._started) * 1000, 2),
+        }
+
+
+def check_columns(report, dataframes, required_columns):
+    """Check required sheets and columns, returning the sheets which can be checked further."""
+    present = {}
+    for sheet, columns in required_columns.items():
+        df = dataframes.get(sheet)
+        if df is None:
+            report.add(sheet, f"Missing sheet '{sheet}'")
+            continue
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            report.add(sheet, f"Missing columns {missing}")
+            continue
+        present[sheet] = df.reset_index(drop=True)
+    return present
+
+def check_not_null(report, sheet, df, columns, mask=None):
+    for column in columns:
+        nulls = df[column].isna()
+        if mask is not None:
+            nulls &= mask
+        report.add(sheet, f"Empty {column}", nulls, column)
+
+def check_unique(report, sheet, df, column, values=None):
+    values = df[column] if values is None else values
+    duplicated = values.duplicated(keep=False) & values.notna()
+    report.add(sheet, f"Duplicate {column}", duplicated, column)
+
+def parse_dates(series):
+    """Dates as Timestamps; cells which are neither dates nor YYYY-MM-DD strings become NaT.
+
+    A column mixing dates with text is read as objects, and openpyxl gives its date
+    cells as datetime.datetime or datetime.date rather than Timestamps.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    is_date = series.map(lambda value: isinstance(value, datetime.date))
+    parsed = pd.to_datetime(series.where(~is_date).astype('string'), format='%Y-%m-%d', errors='coerce')
+    return parsed.where(~is_date, pd.to_datetime(series.where(is_date), errors='coerce'))
+
+def check_dates(report, sheet, df, column):
+    dates = parse_dates(df[column])
+    report.add(sheet, f"{column} is not a date or a YYYY-MM-DD string", dates.isna() & df[column].notna(), column)
+    return dates
+
+def check_in(report, sheet, df, column, allowed):
+    invalid = ~df[column].isin(allowed)
+    report.add(sheet, f"{column} must be one of {list(allowed)}", invalid, column)
+
+def join_keys(df, columns):
+    keys = df[columns[0]].astype(str)
+    for column in columns[1:]:
+        keys = keys + '\x1f' + df[column].astype(str)
+    return keys
+
+def check_references(report, sheet, df, columns, target_sheet, target_df, target_columns, level='error', message=None):
+    """Flag rows whose key columns match no row of the target sheet."""
+    columns, target_columns = list(columns), list(target_columns)
+    # Keys are compared as joined strings, which hashes rather than sorts the columns
+    dangling = ~join_keys(df, columns).isin(set(join_keys(target_df, target_columns))) & df[columns].notna().all(axis=1)
+    message = message or f"{' + '.join(columns)} not found in {target_sheet}"
+    report.add(sheet, message, dangling, columns[0], level=level)
+
+
+def validate_school_timetable(dataframes, require_school_id=True):
+    """Check a school timetable workbook before anything is written, returning the report as a dict."""
+    report = ValidationReport('school_timetable')
+    sheets = check_columns(report, dataframes, SCHOOL_TIMETABLE_COLUMNS)
+
+    school_df = sheets.get('school')
+    if school_df is not None:
+        identifiers = ['AcademicYearStart', 'AcademicYearEnd'] + (['SchoolID'] if require_school_id else [])
+        for identifier in identifiers:
+            rows = school_df[school_df['Identifier'] == identifier]
+            if rows.empty or rows['Data'].isna().iloc[0]:
+                report.add('school', f"Missing {identifier}", column='Data')
+        year_rows = school_df['Identifier'].isin(['AcademicYearStart', 'AcademicYearEnd'])
+        year_dates = parse_dates(school_df['Data'].where(year_rows))
+        report.add('school', "Academic year date is not a date or a YYYY-MM-DD string", year_rows & year_dates.isna() & school_df['Data'].notna(), 'Data')
+
+    terms_df = sheets.get('terms')
+    if terms_df is not None:
+        check_not_null(report, 'terms', terms_df, ('TermName', 'TermType'))
+        start = check_dates(report, 'terms', terms_df, 'StartDate')
+        end = check_dates(report, 'terms', terms_df, 'EndDate')
+        report.add('terms', "EndDate is before StartDate", end < start, 'EndDate')
+        # Days are matched to the one term or break covering them, so intervals must not overlap
+        order = start.sort_values().index
+        sorted_start = start[order]
+        previous_end = end[order].cummax().shift()
+        overlapping = pd.Series(False, index=terms_df.index)
+        overlapping[order] = (sorted_start <= previous_end).to_numpy()
+        report.add('terms', "Term overlaps an earlier term or break", overlapping, 'StartDate')
+        # Term break ids are built from the name alone
+        break_names = terms_df['TermName'].astype('string').str.replace(' ', '').where(terms_df['TermType'] != 'Term')
+        check_unique(report, 'terms', terms_df, 'TermName', break_names)
+
+    weeks_df = sheets.get('weeks')
+    if weeks_df is not None:
+        check_not_null(report, 'weeks', weeks_df, ('WeekNumber', 'WeekType'))
+        check_dates(report, 'weeks', weeks_df, 'WeekStart')
+        check_unique(report, 'weeks', weeks_df, 'WeekNumber')
+
+    days_df = sheets.get('days')
+    if days_df is not None:
+        check_dates(report, 'days', days_df, 'Date')
+        check_unique(report, 'days', days_df, 'Date')
+        check_in(report, 'days', days_df, 'DayType', DAY_TYPES)
+        check_not_null(report, 'days', days_df, ('WeekType',), mask=days_df['DayType'] == 'Academic')
+
+    periods_df = sheets.get('periods')
+    if periods_df is not None:
+        check_in(report, 'periods', periods_df, 'PeriodType', PERIOD_TYPES)
+        check_not_null(report, 'periods', periods_df, ('PeriodName',))
+        coded = periods_df['PeriodType'].isin(CODED_PERIOD_TYPES)
+        check_not_null(report, 'periods', periods_df, ('PeriodCode',), mask=coded)
+        for column in ('StartTime', 'EndTime'):
+            not_time = ~periods_df[column].map(lambda value: isinstance(value, datetime_time))
+            report.add('periods', f"{column} is not a time", not_time, column)
+
+    result = report.to_dict()
+    logging.info(f"Validated school timetable in {result['milliseconds']}ms: {len(result['errors'])} errors, {len(result['warnings'])} warnings")
+    return result
+
+def validate_curriculum(dataframes):
+    """Check a curriculum workbook before anything is written, returning the report as a dict."""
+    report = ValidationReport('curriculum')
+    sheets = check_columns(report, dataframes, CURRICULUM_COLUMNS)
+
+    for sheet, id_column in CURRICULUM_ID_COLUMNS.items():
+        if sheet in sheets:
+            check_not_null(report, sheet, sheets[sheet], (id_column,))
+            check_unique(report, sheet, sheets[sheet], id_column)
+
+    key_stages_df = sheets.get('keystagesyllabuses')
+    year_groups_df = sheets.get('yeargroupsyllabuses')
+    topics_df = sheets.get('topics')
+    lessons_df = sheets.get('lessons')
+    statements_df = sheets.get('statements')
+
+    if key_stages_df is not None:
+        check_not_null(report, 'keystagesyllabuses', key_stages_df, ('Subject', 'SubjectCode', 'KeyStage'))
+    if year_groups_df is not None:
+        check_not_null(report, 'yeargroupsyllabuses', year_groups_df, ('Subject', 'SubjectCode', 'KeyStage', 'YearGroup'))
+
+    # Lessons and statements are looked up by their parent's id and subject together
+    if lessons_df is not None and topics_df is not None:
+        check_references(report, 'lessons', lessons_df, ('TopicID', 'SyllabusSubject'), 'topics', topics_df, ('TopicID', 'SyllabusSubject'))
+    if statements_df is not None and lessons_df is not None:
+        check_references(report, 'statements', statements_df, ('LessonID', 'SyllabusSubject'), 'lessons', lessons_df, ('LessonID', 'SyllabusSubject'))
+
+    # Topics outside a year group or key stage syllabus are handled by the import, so only warn
+    if topics_df is not None and year_groups_df is not None:
+        check_references(
+            report, 'topics', topics_df, ('SyllabusYearID',), 'yeargroupsyllabuses', year_groups_df, ('ID',),
+            level='warning', message="SyllabusYearID not found in yeargroupsyllabuses, topic is linked to its key stage syllabus only"
+        )
+    if topics_df is not None and key_stages_df is not None:
+        check_references(
+            report, 'topics', topics_df, ('SyllabusSubject', 'SyllabusKeyStage'), 'keystagesyllabuses', key_stages_df, ('Subject', 'KeyStage'),
+            level='warning', message="No key stage syllabus for SyllabusSubject + SyllabusKeyStage, topic is skipped"
+        )
+
+    result = report.to_dict()
+    logging.info(f"Validated curriculum in {result['milliseconds']}ms: {len(result['errors'])} errors, {len(result['warnings'])} warnings")
+    return result
+
+def raise_for_report(report):
+    if not report['valid']:
+        raise WorkbookValidationError(report)
+    return report
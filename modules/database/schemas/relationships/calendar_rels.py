@@ -48,3 +48,14 @@ class DayFollowsDay(BaseRelationship):
     __relationshiptype__: ClassVar[str] = 'DAY_FOLLOWS_DAY'
     source: neo_calendar.CalendarDayNode
     target: neo_calendar.CalendarDayNode
+
+# Time chunk relationships
+class DayIncludesTimeChunk(BaseRelationship):
+    __relationshiptype__: ClassVar[str] = 'DAY_INCLUDES_TIME_CHUNK'
+    source: neo_calendar.CalendarDayNode
+    target: neo_calendar.CalendarTimeChunkNode
+
+class TimeChunkFollowsTimeChunk(BaseRelationship):
+    __relationshiptype__: ClassVar[str] = 'TIME_CHUNK_FOLLOWS_TIME_CHUNK'
+    source: neo_calendar.CalendarTimeChunkNode
+    target: neo_calendar.CalendarTimeChunkNode
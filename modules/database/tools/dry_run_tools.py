@@ -0,0 +1,186 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_tools_dry_run_tools'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import math
+import threading
+import time
+from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem, TLDRAW_FILE_NAME
+from modules.database.tools.import_index_tools import IncrementalWriteBuffer
+from modules.database.tools.neontology.writebuffer import GraphWriteBuffer
+
+# Rough per-item costs for estimating how long a planned import takes to write;
+# set them from the database_stats timings of real imports on the target server
+DRY_RUN_SECONDS_PER_STATEMENT = float(os.getenv("DRY_RUN_SECONDS_PER_STATEMENT", 0.01))
+DRY_RUN_SECONDS_PER_NODE = float(os.getenv("DRY_RUN_SECONDS_PER_NODE", 0.0002))
+DRY_RUN_SECONDS_PER_RELATIONSHIP = float(os.getenv("DRY_RUN_SECONDS_PER_RELATIONSHIP", 0.0004))
+DRY_RUN_SECONDS_PER_DIRECTORY = float(os.getenv("DRY_RUN_SECONDS_PER_DIRECTORY", 0.0001))
+DRY_RUN_SECONDS_PER_TLDRAW_FILE = float(os.getenv("DRY_RUN_SECONDS_PER_TLDRAW_FILE", 0.0003))
+
+
+def _primary_value(node):
+    return getattr(node, node.__primaryproperty__)
+
+
+class WritePlan:
+    """Records what an init pipeline would write, without touching the graph or the filesystem.
+
+    Pass the plan's write buffers and filesystems to the pipeline in place of the real ones.
+    Nodes are counted once per database and primary value, and relationships once per
+    database, type and endpoints, as MERGE would leave them in the graph. Statements are
+    counted with the same UNWIND chunking the buffers use when they write.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.relationships = {}
+        self.statements = {}
+        self.directories = set()
+        self.tldraw_files = set()
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def write_buffer(self, **kwargs):
+        return RecordingWriteBuffer(self, **kwargs)
+
+    def incremental_write_buffer(self, import_index, **kwargs):
+        return RecordingIncrementalWriteBuffer(self, import_index, **kwargs)
+
+    def filesystem(self, db_name, init_run_type=None):
+        return RecordingFilesystem(self, db_name, init_run_type)
+
+    def record_batch(self, database, nodes, relationships, chunk_size=None):
+        """Record one database's batch from a buffer flush, returning the buffer's write stats."""
+        stats = {"nodes": 0, "relationships": 0, "statements": 0, "seconds": 0.0, "error": None}
+        with self._lock:
+            for node_type, node_list in nodes:
+                self.nodes.setdefault((database, node_type.__primarylabel__), set()).update(
+                    _primary_value(node) for node in node_list
+                )
+                stats["statements"] += math.ceil(len(node_list) / (chunk_size or len(node_list) or 1))
+                stats["nodes"] += len(node_list)
+            for rel_type, source_type, target_type, rel_list in relationships:
+                self.relationships.setdefault((database, rel_type.get_relationship_type()), set()).update(
+                    (
+                        source_type.__primarylabel__, _primary_value(rel.source),
+                        target_type.__primarylabel__, _primary_value(rel.target),
+                    )
+                    for rel in rel_list
+                )
+                stats["statements"] += math.ceil(len(rel_list) / (chunk_size or len(rel_list) or 1))
+                stats["relationships"] += len(rel_list)
+            self.statements[database] = self.statements.get(database, 0) + stats["statements"]
+        return stats
+
+    def record_directory(self, path):
+        with self._lock:
+            self.directories.add(os.path.normpath(path))
+
+    def record_tldraw_file(self, node_path):
+        with self._lock:
+            self.directories.add(os.path.normpath(node_path))
+            self.tldraw_files.add(os.path.normpath(os.path.join(node_path, TLDRAW_FILE_NAME)))
+
+    def new_directories(self):
+        """The planned directories, and their parents, which are not on disk yet."""
+        new = set()
+        for path in self.directories:
+            while path not in new and not os.path.exists(path):
+                new.add(path)
+                parent = os.path.dirname(path)
+                if parent == path:
+                    break
+                path = parent
+        return new
+
+    def report(self):
+        """Counts per database, label and relationship type, with an estimated write time."""
+        with self._lock:
+            databases = {}
+            for (database, label), unique_ids in sorted(self.nodes.items()):
+                databases.setdefault(database, {'nodes': {}, 'relationships': {}})['nodes'][label] = len(unique_ids)
+            for (database, rel_type), keys in sorted(self.relationships.items()):
+                databases.setdefault(database, {'nodes': {}, 'relationships': {}})['relationships'][rel_type] = len(keys)
+            for database, counts in databases.items():
+                counts['node_count'] = sum(counts['nodes'].values())
+                counts['relationship_count'] = sum(counts['relationships'].values())
+                counts['statements'] = self.statements.get(database, 0)
+            new_directories = len(self.new_directories())
+            tldraw_files = len(self.tldraw_files)
+            existing_tldraw_files = sum(1 for path in self.tldraw_files if os.path.exists(path))
+
+        nodes = sum(counts['node_count'] for counts in databases.values())
+        relationships = sum(counts['relationship_count'] for counts in databases.values())
+        statements = sum(counts['statements'] for counts in databases.values())
+        graph_seconds = (
+            statements * DRY_RUN_SECONDS_PER_STATEMENT
+            + nodes * DRY_RUN_SECONDS_PER_NODE
+            + relationships * DRY_RUN_SECONDS_PER_RELATIONSHIP
+        )
+        filesystem_seconds = (
+            new_directories * DRY_RUN_SECONDS_PER_DIRECTORY
+            + tldraw_files * DRY_RUN_SECONDS_PER_TLDRAW_FILE
+        )
+        return {
+            'databases': databases,
+            'nodes': nodes,
+            'relationships': relationships,
+            'statements': statements,
+            'directories': new_directories,
+            'tldraw_files': tldraw_files,
+            'tldraw_files_existing': existing_tldraw_files,
+            'estimated_seconds': {
+                'graph': round(graph_seconds, 2),
+                'filesystem': round(filesystem_seconds, 2),
+                'total': round(graph_seconds + filesystem_seconds, 2),
+            },
+            'planning_seconds': round(time.perf_counter() - self._started, 2),
+        }
+
+
+class RecordingWriteBuffer(GraphWriteBuffer):
+    """A GraphWriteBuffer whose flushes are recorded in a WritePlan instead of written."""
+
+    def __init__(self, plan, **kwargs):
+        super().__init__(**kwargs)
+        self.plan = plan
+
+    def _write_database(self, database, nodes, relationships):
+        return self.plan.record_batch(database, nodes, relationships, self.flush_size)
+
+
+class RecordingIncrementalWriteBuffer(IncrementalWriteBuffer):
+    """An IncrementalWriteBuffer whose flushes are recorded in a WritePlan instead of written."""
+
+    def __init__(self, plan, import_index, **kwargs):
+        super().__init__(import_index, **kwargs)
+        self.plan = plan
+
+    _write_database = RecordingWriteBuffer._write_database
+
+
+class RecordingFilesystem(ClassroomCopilotFilesystem):
+    """A ClassroomCopilotFilesystem which records directories and tldraw files instead of creating them."""
+
+    def __init__(self, plan, db_name, init_run_type=None):
+        self.plan = plan
+        super().__init__(db_name, init_run_type)
+
+    def create_directory(self, path):
+        created = not os.path.exists(path) and os.path.normpath(path) not in self.plan.directories
+        self.plan.record_directory(path)
+        return created
+
+    def create_default_tldraw_file(self, node_path, node_data):
+        self.plan.record_tldraw_file(node_path)
+        return os.path.join(node_path, TLDRAW_FILE_NAME)
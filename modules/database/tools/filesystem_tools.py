@@ -13,14 +13,384 @@ logging = logger.get_logger(
     log_format='default'
 )
 from datetime import timedelta
+import hashlib
 import json
 import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from modules.database.tools.tldraw_snapshot_tools import get_tldraw_snapshot_store, serialise_snapshot
+from modules.database.tools.tldraw_cache_tools import tldraw_file_cache, stat_validator
+
+TLDRAW_FILE_NAME = 'tldraw_file.json'
+# With lazy files, init records each node's data in one index instead of writing its tldraw file
+TLDRAW_LAZY_FILES = os.getenv("TLDRAW_LAZY_FILES", "false").lower() == "true"
+LAZY_TLDRAW_INDEX_NAME = '.lazy_tldraw_nodes.sqlite3'
+# Directory plans with at least this many leaf directories are created on a thread pool
+DIRECTORY_PLAN_PARALLEL_THRESHOLD = int(os.getenv("DIRECTORY_PLAN_PARALLEL_THRESHOLD", 500))
+DIRECTORY_PLAN_MAX_WORKERS = int(os.getenv("DIRECTORY_PLAN_MAX_WORKERS", 8))
+
+# The document every node's tldraw file starts from, before node_data is added
+DEFAULT_TLDRAW_DOCUMENT = {
+    "document": {
+        "store": {
+            "document:document": {
+                "gridSize": 10,
+                "name": "",
+                "meta": {},
+                "id": "document:document",
+                "typeName": "document"
+            },
+            "page:page": {
+                "meta": {},
+                "id": "page:page",
+                "name": "Page 1",
+                "index": "a1",
+                "typeName": "page"
+            }
+        },
+        "schema": {
+            "schemaVersion": 2,
+            "sequences": {
+                "com.tldraw.store": 4,
+                "com.tldraw.asset": 1,
+                "com.tldraw.camera": 1,
+                "com.tldraw.document": 2,
+                "com.tldraw.instance": 25,
+                "com.tldraw.instance_page_state": 5,
+                "com.tldraw.page": 1,
+                "com.tldraw.instance_presence": 5,
+                "com.tldraw.pointer": 1,
+                "com.tldraw.shape": 4,
+                "com.tldraw.asset.bookmark": 2,
+                "com.tldraw.asset.image": 5,
+                "com.tldraw.asset.video": 5,
+                "com.tldraw.shape.arrow": 5,
+                "com.tldraw.shape.bookmark": 2,
+                "com.tldraw.shape.draw": 2,
+                "com.tldraw.shape.embed": 4,
+                "com.tldraw.shape.frame": 0,
+                "com.tldraw.shape.geo": 9,
+                "com.tldraw.shape.group": 0,
+                "com.tldraw.shape.highlight": 1,
+                "com.tldraw.shape.image": 4,
+                "com.tldraw.shape.line": 5,
+                "com.tldraw.shape.note": 8,
+                "com.tldraw.shape.text": 2,
+                "com.tldraw.shape.video": 2,
+                "com.tldraw.shape.youtube-embed": 0,
+                "com.tldraw.shape.calendar": 0,
+                "com.tldraw.shape.microphone": 1,
+                "com.tldraw.shape.transcriptionText": 0,
+                "com.tldraw.shape.slide": 0,
+                "com.tldraw.shape.slideshow": 0,
+                "com.tldraw.shape.user_node": 1,
+                "com.tldraw.shape.developer_node": 1,
+                "com.tldraw.shape.student_node": 1,
+                "com.tldraw.shape.teacher_node": 1,
+                "com.tldraw.shape.calendar_node": 1,
+                "com.tldraw.shape.calendar_year_node": 1,
+                "com.tldraw.shape.calendar_month_node": 1,
+                "com.tldraw.shape.calendar_week_node": 1,
+                "com.tldraw.shape.calendar_day_node": 1,
+                "com.tldraw.shape.calendar_time_chunk_node": 1,
+                "com.tldraw.shape.teacher_timetable_node": 1,
+                "com.tldraw.shape.timetable_lesson_node": 1,
+                "com.tldraw.shape.planned_lesson_node": 1,
+                "com.tldraw.shape.pastoral_structure_node": 1,
+                "com.tldraw.shape.year_group_node": 1,
+                "com.tldraw.shape.curriculum_structure_node": 1,
+                "com.tldraw.shape.key_stage_node": 1,
+                "com.tldraw.shape.key_stage_syllabus_node": 1,
+                "com.tldraw.shape.year_group_syllabus_node": 1,
+                "com.tldraw.shape.subject_node": 1,
+                "com.tldraw.shape.topic_node": 1,
+                "com.tldraw.shape.topic_lesson_node": 1,
+                "com.tldraw.shape.learning_statement_node": 1,
+                "com.tldraw.shape.science_lab_node": 1,
+                "com.tldraw.shape.school_timetable_node": 1,
+                "com.tldraw.shape.academic_year_node": 1,
+                "com.tldraw.shape.academic_term_node": 1,
+                "com.tldraw.shape.academic_week_node": 1,
+                "com.tldraw.shape.academic_day_node": 1,
+                "com.tldraw.shape.academic_period_node": 1,
+                "com.tldraw.shape.registration_period_node": 1,
+                "com.tldraw.shape.school_node": 1,
+                "com.tldraw.shape.department_node": 1,
+                "com.tldraw.shape.room_node": 1,
+                "com.tldraw.shape.subject_class_node": 1,
+                "com.tldraw.shape.general_relationship": 1,
+                "com.tldraw.binding.arrow": 0,
+                "com.tldraw.binding.slide-layout": 0
+            }
+        },
+        "recordVersions": {
+            "asset": {
+                "version": 1,
+                "subTypeKey": "type",
+                "subTypeVersions": {}
+            },
+            "camera": {
+                "version": 1
+            },
+            "document": {
+                "version": 2
+            },
+            "instance": {
+                "version": 21
+            },
+            "instance_page_state": {
+                "version": 5
+            },
+            "page": {
+                "version": 1
+            },
+            "shape": {
+                "version": 3,
+                "subTypeKey": "type",
+                "subTypeVersions": {}
+            },
+            "instance_presence": {
+                "version": 5
+            },
+            "pointer": {
+                "version": 1
+            }
+        },
+        "rootShapeIds": [],
+        "bindings": [],
+        "assets": []
+    },
+    "session": {
+        "version": 0,
+        "currentPageId": "page:page",
+        "pageStates": [
+            {
+                "pageId": "page:page",
+                "camera": {
+                    "x": 0,
+                    "y": 0,
+                    "z": 1
+                },
+                "selectedShapeIds": []
+            }
+        ]
+    }
+}
+
+# The default document is serialised once; each file splices its node_data in before the closing brace
+_DEFAULT_TLDRAW_PREFIX = json.dumps(DEFAULT_TLDRAW_DOCUMENT)[:-1].encode() + b', "node_data": '
+_DEFAULT_TLDRAW_SUFFIX = b'}'
+
+
+def render_default_tldraw_file(node_data):
+    """The bytes of a default tldraw file for a node."""
+    return _DEFAULT_TLDRAW_PREFIX + json.dumps(node_data, default=str).encode() + _DEFAULT_TLDRAW_SUFFIX
+
+
+def snapshot_etag(sha256):
+    return f'"{sha256}"'
+
+def file_etag(stat_result):
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+def etag_matches(header, etag, weak=False):
+    """Whether an If-Match or If-None-Match header value lists the ETag.
+
+    If-Match compares strongly, so a weak W/ tag never matches; If-None-Match passes
+    weak to compare the tags without their W/ prefix (RFC 9110, 8.8.3.2).
+    """
+    if etag is None or not header:
+        return False
+    if header.strip() == '*':
+        return True
+    for tag in (tag.strip() for tag in header.split(',')):
+        if tag.startswith('W/'):
+            if not weak:
+                continue
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class TldrawFileConflict(Exception):
+    """Raised when a tldraw file is saved against a version which is no longer its current one."""
+
+    def __init__(self, file_location, etag):
+        super().__init__(f"{file_location} has changed, its current ETag is {etag}")
+        self.etag = etag
+
+
+class LazyTldrawIndex:
+    """Node data for tldraw files which have not been written, keyed by node path, in one SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, node_data TEXT NOT NULL)")
+            self._conn.commit()
+        return self._conn
+
+    def put(self, node_path, node_data):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO nodes (path, node_data) VALUES (?, ?)",
+                (os.path.normpath(node_path), json.dumps(node_data, default=str))
+            )
+            conn.commit()
+
+    def get(self, node_path):
+        if not os.path.exists(self.path):
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT node_data FROM nodes WHERE path = ?", (os.path.normpath(node_path),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def write_default_tldraw_file(tldraw_path, node_data):
+    # Open first and only create the directory when it is missing, which saves a stat per file
+    try:
+        f = open(tldraw_path, 'wb')
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(tldraw_path), exist_ok=True)
+        f = open(tldraw_path, 'wb')
+    with f:
+        f.write(render_default_tldraw_file(node_data))
+
+
+def _split(items, parts):
+    """Split a list into at most parts contiguous chunks."""
+    size = -(-len(items) // parts) if items else 1
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+class DirectoryPlan:
+    """Directories, and the default tldraw files in them, to be created together.
+
+    Paths are collected and de-duplicated as an init runs. materialise() sorts them by
+    path component so that each directory is followed by its descendants, keeps only
+    the leaves, and creates each leaf with a single mkdir, falling back to makedirs for
+    its parents the first time a subtree is missing. Large plans are created on a small
+    thread pool, each worker taking a contiguous run of the sorted leaves.
+    """
+
+    def __init__(self):
+        self.paths = set()
+        self.files = {}
+        self.requested = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add(self, path):
+        """Queue a directory, returning False if it was already queued."""
+        path = os.path.normpath(path)
+        with self._lock:
+            self.requested += 1
+            if path in self.paths:
+                return False
+            self.paths.add(path)
+            return True
+
+    def add_tldraw_file(self, node_path, node_data):
+        self.add(node_path)
+        with self._lock:
+            self.files[os.path.normpath(os.path.join(node_path, TLDRAW_FILE_NAME))] = node_data
+
+    def leaves(self):
+        ordered = sorted(self.paths, key=lambda path: path.split(os.sep))
+        return [
+            path for path, following in zip(ordered, ordered[1:] + [None])
+            if following is None or not following.startswith(path.rstrip(os.sep) + os.sep)
+        ]
+
+    @staticmethod
+    def _make_leaves(leaves):
+        created = existing = 0
+        for leaf in leaves:
+            try:
+                os.mkdir(leaf)
+                created += 1
+            except FileExistsError:
+                existing += 1
+            except FileNotFoundError:
+                os.makedirs(leaf, exist_ok=True)
+                created += 1
+        return created, existing
+
+    @staticmethod
+    def _write_files(files):
+        for tldraw_path, node_data in files:
+            write_default_tldraw_file(tldraw_path, node_data)
+        return len(files)
+
+    def materialise(self, max_workers=None):
+        """Create the planned directories and files, returning counts and timings."""
+        start = time.perf_counter()
+        leaves = self.leaves()
+        files = sorted(self.files.items())
+        workers = 1
+        if len(leaves) + len(files) >= DIRECTORY_PLAN_PARALLEL_THRESHOLD:
+            workers = max(1, max_workers or DIRECTORY_PLAN_MAX_WORKERS)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='directory_plan') as executor:
+                made = list(executor.map(self._make_leaves, _split(leaves, workers)))
+                directories_seconds = time.perf_counter() - start
+                written = sum(executor.map(self._write_files, _split(files, workers)))
+        else:
+            made = [self._make_leaves(leaves)]
+            directories_seconds = time.perf_counter() - start
+            written = self._write_files(files)
+
+        stats = {
+            'requested': self.requested,
+            'directories': len(self.paths),
+            'leaves': len(leaves),
+            'leaves_created': sum(created for created, _ in made),
+            'leaves_existing': sum(existing for _, existing in made),
+            'tldraw_files': written,
+            'workers': workers,
+            'directories_seconds': round(directories_seconds, 3),
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+        logging.info(f"Materialised directory plan: {stats}")
+        return stats
+
+
+_lazy_tldraw_indexes = {}
+_lazy_tldraw_indexes_lock = threading.Lock()
+
+def get_lazy_tldraw_index(base_path):
+    """The lazy tldraw index for a filesystem base path, shared by every filesystem handler in the process."""
+    with _lazy_tldraw_indexes_lock:
+        if base_path not in _lazy_tldraw_indexes:
+            _lazy_tldraw_indexes[base_path] = LazyTldrawIndex(os.path.join(base_path, LAZY_TLDRAW_INDEX_NAME))
+        return _lazy_tldraw_indexes[base_path]
+
 
 class ClassroomCopilotFilesystem:
     def __init__(self, db_name: str, init_run_type: str = None):
         logging.info(f"Initializing ClassroomCopilotFilesystem with db_name: {db_name} and init_run_type: {init_run_type}")
         
         self.db_name = db_name
+        # Set by begin_directory_plan, while directories and tldraw files are being collected
+        self.directory_plan = None
         
         # Get base path from environment
         self.base_path = os.getenv("NODE_FILESYSTEM_PATH")
@@ -42,7 +412,7 @@ class ClassroomCopilotFilesystem:
             logging.debug(f"Default root path: {self.root_path}")
         
         # Ensure root directory exists
-        os.makedirs(self.root_path, exist_ok=True)
+        self.create_directory(self.root_path)
         
         logging.debug(f"Filesystem initialized with run type: {init_run_type} and root path: {self.root_path}")
 
@@ -54,11 +424,48 @@ class ClassroomCopilotFilesystem:
             subindent = ' ' * 4 * (level + 1)
             for f in files:
                 logging.info(f"{subindent}{f}")
+
+    def begin_directory_plan(self):
+        """Collect directories and tldraw files in a DirectoryPlan until create_planned_directories."""
+        if self.directory_plan is None:
+            self.directory_plan = DirectoryPlan()
+        return self.directory_plan
+
+    def create_planned_directories(self, max_workers=None):
+        """Create everything collected since begin_directory_plan, returning the plan's stats."""
+        plan, self.directory_plan = self.directory_plan, None
+        if plan is None:
+            return None
+        return plan.materialise(max_workers)
+
+    @contextmanager
+    def deferred_directories(self, max_workers=None):
+        """Plan the directories and tldraw files created in the block, then create them together.
+
+        The plan is dropped, with nothing created, if the block raises.
+        """
+        plan = self.begin_directory_plan()
+        try:
+            yield plan
+        except BaseException:
+            self.directory_plan = None
+            raise
+        self.create_planned_directories(max_workers)
                 
     def create_directory(self, path):
-        """Utility method to create a directory if it doesn't exist."""
+        """Utility method to create a directory if it doesn't exist.
+
+        While a directory plan is open the directory is queued instead, and the result
+        is whether it was newly queued.
+        """
+        if self.directory_plan is not None:
+            return self.directory_plan.add(path)
         if not os.path.exists(path):
-            os.makedirs(path)
+            try:
+                os.makedirs(path)
+            except FileExistsError:
+                # Created by another worker between the check and makedirs
+                return False
             logging.info(f"Directory {path} created.")
             return True
         return False
@@ -142,6 +549,10 @@ class ClassroomCopilotFilesystem:
 
     def setup_calendar_directories(self, start_date, end_date, calendar_path=None):
         """Setup directories for the range from start_date to end_date."""
+        with self.deferred_directories():
+            return self._setup_calendar_directories(start_date, end_date, calendar_path)
+
+    def _setup_calendar_directories(self, start_date, end_date, calendar_path=None):
         current_date = start_date
         while current_date <= end_date:
             year, month, day = current_date.year, current_date.month, current_date.day
@@ -280,136 +691,123 @@ class ClassroomCopilotFilesystem:
     
     # TLDraw File Creation
     def create_default_tldraw_file(self, node_path, node_data):
-        """Create a tldraw file for a node."""
-        logging.info(f"Creating tldraw file for node at {node_path}")
-        
-        # Ensure the directory exists
-        os.makedirs(node_path, exist_ok=True)
-        
-        tldraw_path = os.path.join(node_path, 'tldraw_file.json')
-        
-        # Create default tldraw content
-        tldraw_content = {
-            "document": {
-                "store": {
-                    "document:document": {
-                            "gridSize": 10,
-                            "name": "",
-                            "meta": {},
-                            "id": "document:document",
-                            "typeName": "document"
-                        },
-                        "page:page": {
-                            "meta": {},
-                            "id": "page:page",
-                            "name": "Page 1",
-                            "index": "a1",
-                            "typeName": "page"
-                        }
-                },
-                "schema":
-                    {"schemaVersion":2,
-                    "sequences": {
-                        "com.tldraw.store":4,
-                        "com.tldraw.asset":1,
-                        "com.tldraw.camera":1,
-                        "com.tldraw.document":2,
-                        "com.tldraw.instance":25,
-                        "com.tldraw.instance_page_state":5,
-                        "com.tldraw.page":1,
-                        "com.tldraw.instance_presence":5,
-                        "com.tldraw.pointer":1,
-                        "com.tldraw.shape":4,
-                        "com.tldraw.asset.bookmark":2,
-                        "com.tldraw.asset.image":5,
-                        "com.tldraw.asset.video":5,
-                        "com.tldraw.shape.arrow":5,
-                        "com.tldraw.shape.bookmark":2,
-                        "com.tldraw.shape.draw":2,
-                        "com.tldraw.shape.embed":4,
-                        "com.tldraw.shape.frame":0,
-                        "com.tldraw.shape.geo":9,
-                        "com.tldraw.shape.group":0,
-                        "com.tldraw.shape.highlight":1,
-                        "com.tldraw.shape.image":4,
-                        "com.tldraw.shape.line":5,
-                        "com.tldraw.shape.note":8,
-                        "com.tldraw.shape.text":2,
-                        "com.tldraw.shape.video":2,
-                        "com.tldraw.shape.youtube-embed":0,
-                        "com.tldraw.shape.calendar":0,
-                        "com.tldraw.shape.microphone":1,
-                        "com.tldraw.shape.transcriptionText":0,
-                        "com.tldraw.shape.slide":0,"com.tldraw.shape.slideshow":0,
-                        "com.tldraw.shape.user_node":1,
-                        "com.tldraw.shape.developer_node":1,
-                        "com.tldraw.shape.student_node":1,
-                        "com.tldraw.shape.teacher_node":1,
-                        "com.tldraw.shape.calendar_node":1,
-                        "com.tldraw.shape.calendar_year_node":1,
-                        "com.tldraw.shape.calendar_month_node":1,
-                        "com.tldraw.shape.calendar_week_node":1,
-                        "com.tldraw.shape.calendar_day_node":1,
-                        "com.tldraw.shape.calendar_time_chunk_node":1,
-                        "com.tldraw.shape.teacher_timetable_node":1,
-                        "com.tldraw.shape.timetable_lesson_node":1,
-                        "com.tldraw.shape.planned_lesson_node":1,
-                        "com.tldraw.shape.pastoral_structure_node":1,
-                        "com.tldraw.shape.year_group_node":1,
-                        "com.tldraw.shape.curriculum_structure_node":1,
-                        "com.tldraw.shape.key_stage_node":1,
-                        "com.tldraw.shape.key_stage_syllabus_node":1,
-                        "com.tldraw.shape.year_group_syllabus_node":1,
-                        "com.tldraw.shape.subject_node":1,
-                        "com.tldraw.shape.topic_node":1,
-                        "com.tldraw.shape.topic_lesson_node":1,
-                        "com.tldraw.shape.learning_statement_node":1,
-                        "com.tldraw.shape.science_lab_node":1,
-                        "com.tldraw.shape.school_timetable_node":1,
-                        "com.tldraw.shape.academic_year_node":1,
-                        "com.tldraw.shape.academic_term_node":1,
-                        "com.tldraw.shape.academic_week_node":1,
-                        "com.tldraw.shape.academic_day_node":1,
-                        "com.tldraw.shape.academic_period_node":1,
-                        "com.tldraw.shape.registration_period_node":1,
-                        "com.tldraw.shape.school_node":1,
-                        "com.tldraw.shape.department_node":1,
-                        "com.tldraw.shape.room_node":1,
-                        "com.tldraw.shape.subject_class_node":1,
-                        "com.tldraw.shape.general_relationship":1,
-                        "com.tldraw.binding.arrow":0,
-                        "com.tldraw.binding.slide-layout":0
-                    }
-                },
-                "recordVersions": {
-                    "asset": { "version": 1, "subTypeKey": "type", "subTypeVersions": {} },
-                    "camera": { "version": 1 },
-                    "document": { "version": 2 },
-                    "instance": { "version": 21 },
-                    "instance_page_state": { "version": 5 },
-                    "page": { "version": 1 },
-                    "shape": { "version": 3, "subTypeKey": "type", "subTypeVersions": {} },
-                    "instance_presence": { "version": 5 },
-                    "pointer": { "version": 1 }
-                },
-                "rootShapeIds":[],
-                "bindings":[],
-                "assets":[]
-                },
-                "session": {
-                    "version": 0,
-                    "currentPageId": "page:page",
-                    "pageStates": [{
-                        "pageId": "page:page",
-                        "camera": {"x": 0, "y": 0, "z": 1},
-                        "selectedShapeIds": []
-                    }]
-                },
-                "node_data": node_data
-        }
-        
-        with open(tldraw_path, 'w') as f:
-            json.dump(tldraw_content, f, indent=4)
-            
-        logging.info(f"tldraw file created at {tldraw_path}")
-        return tldraw_path
\ No newline at end of file
+        """Create a tldraw file for a node.
+
+        In lazy mode (TLDRAW_LAZY_FILES) nothing is written: the node data is recorded in
+        the lazy tldraw index and the default file is synthesised when it is first read.
+        """
+        tldraw_path = os.path.join(node_path, TLDRAW_FILE_NAME)
+        if TLDRAW_LAZY_FILES:
+            get_lazy_tldraw_index(self.base_path).put(node_path, node_data)
+            logging.debug(f"Deferred tldraw file for node at {node_path}")
+            return tldraw_path
+        if self.directory_plan is not None:
+            self.directory_plan.add_tldraw_file(node_path, node_data)
+            return tldraw_path
+
+        write_default_tldraw_file(tldraw_path, node_data)
+        logging.debug(f"tldraw file created at {tldraw_path}")
+        return tldraw_path
+
+    @property
+    def snapshot_store(self):
+        return get_tldraw_snapshot_store(self.base_path)
+
+    def has_tldraw_file(self, node_path):
+        """Whether a node has a tldraw file: a saved snapshot, a plain file, or a deferred default."""
+        return (
+            self.snapshot_store.current(node_path) is not None
+            or os.path.exists(os.path.join(node_path, TLDRAW_FILE_NAME))
+            or get_lazy_tldraw_index(self.base_path).get(node_path) is not None
+        )
+
+    def tldraw_file_validator(self, file_location):
+        """The cache validator of whichever file a read would come from, from a stat; None for neither."""
+        pointer_path = self.snapshot_store.pointer_path(os.path.dirname(file_location))
+        for kind, path in (('snapshot', pointer_path), ('file', file_location)):
+            try:
+                return stat_validator(kind, os.stat(path))
+            except FileNotFoundError:
+                continue
+        return None
+
+    def read_tldraw_file_bytes(self, file_location):
+        """The JSON bytes of a tldraw file and their ETag, without parsing them.
+
+        The node's current snapshot is read first, then a plain tldraw_file.json, which
+        init writes and nodes saved before the snapshot store still have, then the default
+        for a node whose file was deferred. A snapshot's ETag is its SHA-256, a plain
+        file's is its mtime and size. Returns None when there is nothing at the location.
+
+        Snapshots and plain files are served from tldraw_file_cache while a stat shows the
+        file they came from is unchanged.
+        """
+        validator = self.tldraw_file_validator(file_location)
+        if validator is not None:
+            cached = tldraw_file_cache.get(file_location, validator)
+            if cached is not None:
+                return cached
+        node_dir = os.path.dirname(file_location)
+        pointer, stat_result = self.snapshot_store.read_pointer_stat(node_dir)
+        if pointer is not None:
+            sha256 = pointer['current']
+            content = tldraw_file_cache.get_shared(sha256)
+            if content is None:
+                content = self.snapshot_store.get_blob(sha256)
+                tldraw_file_cache.put_shared(sha256, content)
+            return tldraw_file_cache.put(file_location, stat_validator('snapshot', stat_result), content, snapshot_etag(sha256))
+        try:
+            with open(file_location, 'rb') as f:
+                stat_result = os.fstat(f.fileno())
+                content = f.read()
+            return tldraw_file_cache.put(file_location, stat_validator('file', stat_result), content, file_etag(stat_result))
+        except FileNotFoundError:
+            pass
+        node_data = get_lazy_tldraw_index(self.base_path).get(node_dir)
+        if node_data is None:
+            return None
+        logging.debug(f"Synthesised default tldraw file for {file_location}")
+        content = render_default_tldraw_file(node_data)
+        return content, f'"default-{hashlib.sha256(content).hexdigest()}"'
+
+    def tldraw_file_etag(self, file_location):
+        """The ETag read_tldraw_file_bytes would return, reading the file only when it is not cached."""
+        result = self.read_tldraw_file_bytes(file_location)
+        return result[1] if result else None
+
+    def read_tldraw_file(self, file_location):
+        """Load a tldraw file, synthesising the default for a node whose file was deferred."""
+        result = self.read_tldraw_file_bytes(file_location)
+        return json.loads(result[0]) if result else None
+
+    def write_tldraw_file(self, file_location, data, if_match=None):
+        """Save a tldraw file as a new snapshot version, returning the version entry.
+
+        With if_match, an If-Match header value, the file is only saved if its current
+        ETag is listed, and TldrawFileConflict is raised otherwise. The check and the
+        save hold the node's lock, so two saves from the same version, in any worker
+        process, cannot both succeed. The saved bytes are written through to tldraw_file_cache.
+        """
+        node_dir = os.path.dirname(file_location)
+        content = serialise_snapshot(data)
+        with self.snapshot_store.node_lock(node_dir):
+            if if_match is not None:
+                etag = self.tldraw_file_etag(file_location)
+                if not etag_matches(if_match, etag):
+                    raise TldrawFileConflict(file_location, etag)
+            entry = self.snapshot_store.save_serialised(node_dir, content)
+            etag = snapshot_etag(entry['sha256'])
+            # Cached against the pointer as read back, unless another process has saved since
+            pointer, stat_result = self.snapshot_store.read_pointer_stat(node_dir)
+            if pointer is not None and pointer['current'] == entry['sha256']:
+                tldraw_file_cache.put(file_location, stat_validator('snapshot', stat_result), content, etag, write=True)
+            else:
+                tldraw_file_cache.discard(file_location)
+        tldraw_file_cache.put_shared(entry['sha256'], content)
+        return {**entry, 'etag': etag}
+
+    def tldraw_file_versions(self, file_location):
+        return self.snapshot_store.versions(os.path.dirname(file_location))
+
+    def rollback_tldraw_file(self, file_location, sha256=None):
+        return self.snapshot_store.rollback(os.path.dirname(file_location), sha256)
\ No newline at end of file
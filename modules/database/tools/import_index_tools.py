@@ -0,0 +1,272 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_tools_import_index_tools'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import hashlib
+import json
+import threading
+import pandas as pd
+from modules.database.tools.neontology.graphconnection import GraphConnection
+from modules.database.tools.neontology.writebuffer import GraphWriteBuffer, DEFAULT_FLUSH_SIZE
+
+INDEX_FILE_NAME = '.import_index.json'
+INDEX_VERSION = 1
+
+# Properties which change on every build and so are left out of node fingerprints
+UNHASHED_PROPERTIES = ('created', 'merged')
+
+
+def hash_rows(df, id_column):
+    """Content hash of each spreadsheet row, keyed by the row's id column."""
+    if df.empty:
+        return {}
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return {str(row_id): str(row_hash) for row_id, row_hash in zip(df[id_column], hashes)}
+
+def node_fingerprint(node):
+    """Content hash of the properties a node is merged with, excluding timestamps."""
+    properties = {k: v for k, v in node.to_dict().items() if k not in UNHASHED_PROPERTIES}
+    return hashlib.sha1(json.dumps(properties, sort_keys=True, default=str).encode()).hexdigest()
+
+def _diff_counts(previous, current):
+    return {
+        'added': sum(1 for key in current if key not in previous),
+        'changed': sum(1 for key, value in current.items() if key in previous and previous[key] != value),
+        'unchanged': sum(1 for key, value in current.items() if previous.get(key) == value),
+        'removed': sum(1 for key in previous if key not in current),
+    }
+
+
+class ImportIndex:
+    """Side index of what an import last wrote, used to diff the next import against it.
+
+    The index is a JSON file holding the content hash of every spreadsheet row, the
+    fingerprint and databases of every node, and the key of every relationship. With
+    skip_unchanged the import only writes nodes, relationships and tldraw files which
+    are new or different, and prune() removes whatever the new import no longer produced.
+    """
+
+    def __init__(self, index_dir, skip_unchanged=False):
+        self.path = os.path.join(index_dir, INDEX_FILE_NAME)
+        self.skip_unchanged = skip_unchanged
+        self.previous = self._load()
+        self.current = {'rows': {}, 'nodes': {}, 'relationships': set()}
+        self.changed_nodes = set()
+        self.tldraw_files = {'written': 0, 'skipped': 0}
+        self.removed = {'nodes': 0, 'relationships': 0}
+        self.pruned = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        empty = {'rows': {}, 'nodes': {}, 'relationships': set()}
+        if not os.path.exists(self.path):
+            return empty
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable import index {self.path}: {e}")
+            return empty
+        if data.get('version') != INDEX_VERSION:
+            logging.warning(f"Ignoring import index {self.path} with version {data.get('version')}")
+            return empty
+        return {
+            'rows': data.get('rows', {}),
+            'nodes': data.get('nodes', {}),
+            'relationships': {tuple(key) for key in data.get('relationships', [])},
+        }
+
+    def record_rows(self, sheet, row_hashes):
+        self.current['rows'][sheet] = row_hashes
+
+    def node_changed(self, node, databases):
+        """Record a node and return whether it needs writing to the given databases."""
+        unique_id = getattr(node, node.__primaryproperty__)
+        fingerprint = node_fingerprint(node)
+        with self._lock:
+            entry = self.current['nodes'].setdefault(
+                unique_id, {'hash': fingerprint, 'label': node.__primarylabel__, 'databases': []}
+            )
+            entry['hash'] = fingerprint
+            entry['databases'] = sorted(set(entry['databases']) | set(databases))
+
+            previous = self.previous['nodes'].get(unique_id)
+            changed = (
+                not self.skip_unchanged
+                or previous is None
+                or previous['hash'] != fingerprint
+                or not set(databases) <= set(previous['databases'])
+            )
+            if changed:
+                self.changed_nodes.add(unique_id)
+            return changed
+
+    def relationship_changed(self, relationship, database):
+        """Record a relationship and return whether it needs writing to the database."""
+        key = (
+            database,
+            relationship.get_relationship_type(),
+            relationship.source.__primarylabel__,
+            getattr(relationship.source, relationship.source.__primaryproperty__),
+            relationship.target.__primarylabel__,
+            getattr(relationship.target, relationship.target.__primaryproperty__),
+        )
+        with self._lock:
+            self.current['relationships'].add(key)
+            return not self.skip_unchanged or key not in self.previous['relationships']
+
+    def tldraw_needed(self, unique_id, has_tldraw_file):
+        """Whether a node's tldraw file has to be (re)written.
+
+        has_tldraw_file is called, only for an unchanged node, to ask the filesystem
+        whether the node still has a file.
+        """
+        with self._lock:
+            changed = not self.skip_unchanged or unique_id is None or unique_id in self.changed_nodes
+        needed = changed or not has_tldraw_file()
+        with self._lock:
+            self.tldraw_files['written' if needed else 'skipped'] += 1
+        return needed
+
+    def removed_nodes(self):
+        return {k: v for k, v in self.previous['nodes'].items() if k not in self.current['nodes']}
+
+    def removed_relationships(self):
+        removed_nodes = self.removed_nodes()
+        return [
+            key for key in self.previous['relationships']
+            if key not in self.current['relationships']
+            # relationships of removed nodes go with the detach delete
+            and key[3] not in removed_nodes and key[5] not in removed_nodes
+        ]
+
+    def prune(self):
+        """Delete the nodes and relationships the previous import wrote and this one did not."""
+        graph = GraphConnection()
+
+        nodes_by_label = {}
+        for unique_id, entry in self.removed_nodes().items():
+            for database in entry['databases']:
+                nodes_by_label.setdefault((database, entry['label']), []).append(unique_id)
+        for (database, label), unique_ids in nodes_by_label.items():
+            for start in range(0, len(unique_ids), DEFAULT_FLUSH_SIZE):
+                graph.cypher_write(f"""
+                USE {database}
+                UNWIND $unique_ids AS unique_id
+                MATCH (n:{label} {{unique_id: unique_id}})
+                DETACH DELETE n
+                """, {'unique_ids': unique_ids[start:start + DEFAULT_FLUSH_SIZE]})
+            self.removed['nodes'] += len(unique_ids)
+
+        rels_by_type = {}
+        for database, rel_type, source_label, source_id, target_label, target_id in self.removed_relationships():
+            rels_by_type.setdefault((database, rel_type, source_label, target_label), []).append([source_id, target_id])
+        for (database, rel_type, source_label, target_label), pairs in rels_by_type.items():
+            for start in range(0, len(pairs), DEFAULT_FLUSH_SIZE):
+                graph.cypher_write(f"""
+                USE {database}
+                UNWIND $pairs AS pair
+                MATCH (source:{source_label} {{unique_id: pair[0]}})-[r:{rel_type}]->(target:{target_label} {{unique_id: pair[1]}})
+                DELETE r
+                """, {'pairs': pairs[start:start + DEFAULT_FLUSH_SIZE]})
+            self.removed['relationships'] += len(pairs)
+
+        self.pruned = True
+        logging.info(f"Pruned {self.removed['nodes']} nodes and {self.removed['relationships']} relationships")
+
+    def save(self):
+        """Write the current import as the baseline for the next one."""
+        current = self.current
+        if not self.pruned:
+            # keep what was not pruned so a later prune can still remove it
+            current = {
+                'rows': current['rows'],
+                'nodes': {**self.removed_nodes(), **current['nodes']},
+                'relationships': current['relationships'] | set(self.removed_relationships()),
+            }
+        data = {
+            'version': INDEX_VERSION,
+            'rows': current['rows'],
+            'nodes': current['nodes'],
+            'relationships': sorted(list(key) for key in current['relationships']),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        logging.debug(f"Saved import index to {self.path}")
+
+    def summary(self):
+        """Counts of what changed between the previous import and this one."""
+        previous_nodes = {k: v['hash'] for k, v in self.previous['nodes'].items()}
+        current_nodes = {k: v['hash'] for k, v in self.current['nodes'].items()}
+        previous_rels = self.previous['relationships']
+        current_rels = self.current['relationships']
+        return {
+            'incremental': self.skip_unchanged,
+            'pruned': self.pruned,
+            'rows': {
+                sheet: _diff_counts(self.previous['rows'].get(sheet, {}), row_hashes)
+                for sheet, row_hashes in self.current['rows'].items()
+            },
+            'nodes': _diff_counts(previous_nodes, current_nodes),
+            'relationships': {
+                'added': len(current_rels - previous_rels),
+                'unchanged': len(current_rels & previous_rels),
+                'removed': len(previous_rels - current_rels),
+            },
+            'tldraw_files': dict(self.tldraw_files),
+            'deleted': dict(self.removed),
+        }
+
+
+class IncrementalWriteBuffer(GraphWriteBuffer):
+    """A GraphWriteBuffer which only queues nodes and relationships the ImportIndex says have changed."""
+
+    def __init__(self, import_index, **kwargs):
+        super().__init__(**kwargs)
+        self.import_index = import_index
+        self.skipped = 0
+
+    def merge_node(self, node, database=None):
+        databases = self._databases(database)
+        if self.import_index.node_changed(node, databases):
+            return super().merge_node(node, database=databases)
+        self.skipped += 1
+        return node
+
+    def merge_relationship(self, relationship, database=None):
+        databases = tuple(
+            db for db in self._databases(database)
+            if self.import_index.relationship_changed(relationship, db)
+        )
+        if databases:
+            return super().merge_relationship(relationship, database=databases)
+        self.skipped += 1
+        return relationship
+
+
+class IncrementalFilesystem:
+    """Wraps a ClassroomCopilotFilesystem so unchanged nodes keep their existing tldraw files."""
+
+    def __init__(self, fs_handler, import_index):
+        self._fs_handler = fs_handler
+        self.import_index = import_index
+
+    def __getattr__(self, name):
+        return getattr(self._fs_handler, name)
+
+    def create_default_tldraw_file(self, node_path, node_data):
+        has_tldraw_file = lambda: self._fs_handler.has_tldraw_file(node_path)
+        if self.import_index.tldraw_needed(node_data.get('unique_id'), has_tldraw_file):
+            return self._fs_handler.create_default_tldraw_file(node_path, node_data)
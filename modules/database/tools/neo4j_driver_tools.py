@@ -13,8 +13,10 @@ logging = logger.get_logger(
     log_format='default'
 )
 import time
+import threading
 from neo4j import GraphDatabase as gd
 from contextlib import contextmanager
+from fastapi import HTTPException
 
 def get_driver(db_name=None, url=None, auth=None):
     if url is None:
@@ -56,27 +58,112 @@ def close_driver(driver):
     logging.info(f"Closing driver")
     driver.close()
 
-# Global driver instance
-_driver = None
+# Pool settings for the shared drivers handed out by the registry
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", 100))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", 60))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", 3600))
+
+def get_default_connection():
+    """Get the default bolt url and auth from the environment."""
+    host = os.getenv("HOST_NEO4J")
+    port = os.getenv("PORT_NEO4J_BOLT")
+    return f"bolt://{host}:{port}", (os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD"))
+
+class DriverRegistry:
+    """Process-wide registry of pooled Neo4j drivers keyed by url and credentials.
+
+    Drivers are created once and shared, so requests borrow a pooled connection
+    instead of paying for a new driver, handshake and authentication every time.
+    Sessions are cheap and are opened per target database.
+    """
+
+    def __init__(self, max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
+                 connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+                 max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME):
+        self.max_connection_pool_size = max_connection_pool_size
+        self.connection_acquisition_timeout = connection_acquisition_timeout
+        self.max_connection_lifetime = max_connection_lifetime
+        self._drivers = {}
+        self._lock = threading.Lock()
+
+    def get_driver(self, url=None, auth=None):
+        """Get the shared driver for url and auth, creating it on first use."""
+        if url is None:
+            url, auth = get_default_connection()
+        key = (url, auth)
+        neo_driver = self._drivers.get(key)
+        if neo_driver is not None:
+            return neo_driver
+        with self._lock:
+            neo_driver = self._drivers.get(key)
+            if neo_driver is None:
+                logging.info(f"Creating pooled Neo4j driver for {url}")
+                neo_driver = gd.driver(
+                    url,
+                    auth=auth,
+                    max_connection_pool_size=self.max_connection_pool_size,
+                    connection_acquisition_timeout=self.connection_acquisition_timeout,
+                    max_connection_lifetime=self.max_connection_lifetime
+                )
+                try:
+                    neo_driver.verify_connectivity()
+                except Exception as e:
+                    logging.error(f"Failed to connect to Neo4j at {url}: {e}")
+                    neo_driver.close()
+                    raise
+                self._drivers[key] = neo_driver
+        return neo_driver
+
+    @contextmanager
+    def session(self, database=None, url=None, auth=None):
+        """Open a session on the shared driver for the target database."""
+        neo_session = self.get_driver(url, auth).session(database=database)
+        try:
+            yield neo_session
+        finally:
+            neo_session.close()
+
+    def close_all(self):
+        """Close every driver in the registry."""
+        with self._lock:
+            for (url, _), neo_driver in self._drivers.items():
+                logging.info(f"Closing pooled Neo4j driver for {url}")
+                neo_driver.close()
+            self._drivers = {}
+
+# Global driver registry, opened and closed by the FastAPI lifespan hook
+driver_registry = DriverRegistry()
+
+def init_driver_registry():
+    """Create the default pooled driver at startup."""
+    try:
+        driver_registry.get_driver()
+    except Exception as e:
+        logging.warning(f"Default Neo4j driver not available at startup, will retry on first use: {e}")
+    return driver_registry
+
+def close_driver_registry():
+    driver_registry.close_all()
 
 def get_global_driver():
-    """Get or create the global Neo4j driver instance."""
-    global _driver
-    if _driver is None:
-        _driver = get_driver()
-    return _driver
+    """Get the shared default Neo4j driver instance."""
+    try:
+        return driver_registry.get_driver()
+    except Exception:
+        return None
 
 @contextmanager
 def get_session(database=None):
-    """Get a Neo4j session using the global driver."""
-    driver = get_global_driver()
-    if driver is None:
-        raise Exception("Failed to get Neo4j driver")
-    
-    session = None
+    """Get a Neo4j session on the target database using the shared driver."""
+    with driver_registry.session(database=database) as session:
+        yield session
+
+def get_db_session(db_name: str):
+    """FastAPI dependency yielding a session on the database named by the db_name query parameter."""
     try:
-        session = driver.session(database=database)
+        neo_driver = driver_registry.get_driver()
+    except Exception as e:
+        logging.error(f"Failed to get Neo4j driver for database {db_name}: {e}")
+        raise HTTPException(status_code=503, detail="Failed to connect to the database")
+    with neo_driver.session(database=db_name) as session:
         yield session
-    finally:
-        if session:
-            session.close()
\ No newline at end of file
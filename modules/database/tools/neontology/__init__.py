@@ -2,8 +2,9 @@
 
 from .basenode import BaseNode
 from .baserelationship import BaseRelationship
-from .graphconnection import GraphConnection, init_neontology
+from .graphconnection import AsyncGraphConnection, GraphConnection, init_neontology
 from .utils import auto_constrain
+from .writebuffer import GraphWriteBuffer
 
 __all__ = [
     # BaseNode
@@ -13,6 +14,9 @@ __all__ = [
     # GraphConnection
     "init_neontology",
     "GraphConnection",
+    "AsyncGraphConnection",
     # utils
     "auto_constrain",
+    # GraphWriteBuffer
+    "GraphWriteBuffer",
 ]
@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 
 from .commonmodel import CommonModel
-from .graphconnection import GraphConnection
+from .graphconnection import AsyncGraphConnection, GraphConnection
 
 B = TypeVar("B", bound="BaseNode")
 
@@ -67,27 +67,43 @@ class BaseNode(CommonModel):  # pyre-ignore[13]
         
         return self.__class__(**dict(result["n"]))
 
-    def merge(self, database: str = 'neo4j') -> None:
-        """Merge this node into the graph."""
-
-        params = self._get_merge_parameters()
-
-        all_labels = [self.__primarylabel__] + self.__secondarylabels__
+    @classmethod
+    def _merge_cypher(cls, database: str) -> str:
+        all_labels = [cls.__primarylabel__] + cls.__secondarylabels__
 
-        cypher = f"""
+        return f"""
         USE {database}
-        MERGE (n:{":".join(all_labels)} {{ {self.__primaryproperty__}: $pp }})
+        MERGE (n:{":".join(all_labels)} {{ {cls.__primaryproperty__}: $pp }})
         ON MATCH SET n += $set_on_match
         ON CREATE SET n += $set_on_create
         SET n += $always_set
         RETURN n
         """
 
+    def merge(self, database: str = 'neo4j') -> None:
+        """Merge this node into the graph."""
+
+        params = self._get_merge_parameters()
+
+        cypher = self._merge_cypher(database)
+
         graph = GraphConnection()
         result = graph.cypher_write_single(cypher, params)
 
         return self.__class__(**dict(result["n"]))
 
+    async def amerge(self, database: str = 'neo4j') -> None:
+        """Merge this node into the graph without blocking the event loop."""
+
+        params = self._get_merge_parameters()
+
+        cypher = self._merge_cypher(database)
+
+        graph = AsyncGraphConnection()
+        result = await graph.cypher_write_single(cypher, params)
+
+        return self.__class__(**dict(result["n"]))
+
     @classmethod
     def create_nodes(cls: Type[B], nodes: List[B]) -> List[Union[str, int]]:
         """Create the given nodes in the database.
@@ -130,11 +146,12 @@ class BaseNode(CommonModel):  # pyre-ignore[13]
         return matched_nodes
 
     @classmethod
-    def merge_nodes(cls: Type[B], nodes: List[B]) -> List[B]:
+    def merge_nodes(cls: Type[B], nodes: List[B], database: str = 'neo4j') -> List[B]:
         """Merge multiple nodes into the database.
 
         Args:
             nodes (List[B]): A list of nodes to merge.
+            database (str, optional): The database to merge into. Defaults to 'neo4j'.
 
         Returns:
             list: A list of the primary property values
@@ -143,15 +160,61 @@ class BaseNode(CommonModel):  # pyre-ignore[13]
             TypeError: Raised if any of the nodes provided don't match this class.
         """
 
+        node_list = cls._get_merge_nodes_list(nodes)
+
+        cypher = cls._merge_nodes_cypher(database)
+
+        graph = GraphConnection()
+        results = graph.cypher_write_many(
+            cypher=cypher, params={"node_list": node_list}
+        )
+
+        matched_nodes = [cls(**dict(x["n"])) for x in results]
+
+        return matched_nodes
+
+    @classmethod
+    async def amerge_nodes(cls: Type[B], nodes: List[B], database: str = 'neo4j') -> List[B]:
+        """Merge multiple nodes into the database without blocking the event loop.
+
+        Args:
+            nodes (List[B]): A list of nodes to merge.
+            database (str, optional): The database to merge into. Defaults to 'neo4j'.
+
+        Returns:
+            list: The merged nodes
+
+        Raises:
+            TypeError: Raised if any of the nodes provided don't match this class.
+        """
+
+        node_list = cls._get_merge_nodes_list(nodes)
+
+        cypher = cls._merge_nodes_cypher(database)
+
+        graph = AsyncGraphConnection()
+        results = await graph.cypher_write_many(
+            cypher=cypher, params={"node_list": node_list}
+        )
+
+        matched_nodes = [cls(**dict(x["n"])) for x in results]
+
+        return matched_nodes
+
+    @classmethod
+    def _get_merge_nodes_list(cls: Type[B], nodes: List[B]) -> List[Dict[str, Any]]:
         for node in nodes:
             if isinstance(node, cls) is False:
                 raise TypeError("Node was incorrect type.")
 
-        node_list = [x._get_merge_parameters() for x in nodes]
+        return [x._get_merge_parameters() for x in nodes]
 
+    @classmethod
+    def _merge_nodes_cypher(cls, database: str) -> str:
         all_labels = [cls.__primarylabel__] + cls.__secondarylabels__
 
-        cypher = f"""
+        return f"""
+        USE {database}
         UNWIND $node_list AS node
         MERGE (n:{":".join(all_labels)} {{{cls.__primaryproperty__}: node.pp}})
         ON MATCH SET n += node.set_on_match
@@ -160,15 +223,6 @@ class BaseNode(CommonModel):  # pyre-ignore[13]
         RETURN n
         """
 
-        graph = GraphConnection()
-        results = graph.cypher_write_many(
-            cypher=cypher, params={"node_list": node_list}
-        )
-
-        matched_nodes = [cls(**dict(x["n"])) for x in results]
-
-        return matched_nodes
-
     @classmethod
     def merge_records(cls: Type[B], records: dict) -> List[B]:
         """Take a list of dictionaries and use them to merge in nodes in the graph.
@@ -240,11 +294,7 @@ class BaseNode(CommonModel):  # pyre-ignore[13]
             Optional[B]: If the node exists, return it as an instance.
         """
 
-        cypher = f"""
-        MATCH (n:{cls.__primarylabel__})
-        WHERE n.{cls.__primaryproperty__} = $pp
-        RETURN n
-        """
+        cypher = cls._match_cypher()
 
         params = {"pp": pp}
 
@@ -258,6 +308,44 @@ class BaseNode(CommonModel):  # pyre-ignore[13]
         else:
             return None
 
+    @classmethod
+    async def amatch(cls: Type[B], pp: str, database: Optional[str] = None) -> Optional[B]:
+        """MATCH a single node of this type with the given primary property, without blocking.
+
+        Args:
+            pp (str): The value of the primary property (pp) to match on.
+            database (Optional[str], optional): The database to match in. Defaults to the
+                server's default database.
+
+        Returns:
+            Optional[B]: If the node exists, return it as an instance.
+        """
+
+        cypher = cls._match_cypher(database)
+
+        params = {"pp": pp}
+
+        graph = AsyncGraphConnection()
+
+        result = await graph.cypher_read(cypher, params)
+
+        if result:
+            return cls(**dict(result["n"]))
+
+        else:
+            return None
+
+    @classmethod
+    def _match_cypher(cls, database: Optional[str] = None) -> str:
+        use_clause = f"USE {database}" if database else ""
+
+        return f"""
+        {use_clause}
+        MATCH (n:{cls.__primarylabel__})
+        WHERE n.{cls.__primaryproperty__} = $pp
+        RETURN n
+        """
+
     @classmethod
     def delete(cls, pp: str) -> None:
         """Delete a node from the graph.
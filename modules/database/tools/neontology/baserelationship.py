@@ -16,13 +16,12 @@ The BaseRelationship class is used for creating and matching on relationships in
 
 """
 
-from typing import Any, ClassVar, Dict, List, Optional, Type, TypeVar
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Type, TypeVar
 
 import numpy as np
 import pandas as pd
-from pydantic import PrivateAttr
 
-from modules.database.tools.neontology.graphconnection import GraphConnection
+from modules.database.tools.neontology.graphconnection import AsyncGraphConnection, GraphConnection
 
 from .basenode import BaseNode
 from .commonmodel import CommonModel
@@ -36,15 +35,9 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
 
     __relationshiptype__: ClassVar[Optional[str]] = None
 
-    _merge_on: List[
-        str
-    ] = PrivateAttr()  # what relationship properties should we merge on
-
     def __init__(self, **data: dict):
         super().__init__(**data)
 
-        self._merge_on = self._get_prop_usage("merge_on")
-
         # we can define 'abstract' relationships which don't have a label
         # these are to provide common properties to be used by subclassed relationships
         # but shouldn't be put in the graph or even instantiated
@@ -53,6 +46,11 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
                 "Nodes to be used in the graph must define a primary label."
             )
 
+    @property
+    def _merge_on(self) -> Tuple[str, ...]:
+        """What relationship properties should we merge on."""
+        return self._get_prop_usage("merge_on")
+
     @classmethod
     def get_relationship_type(cls) -> str:
         """Get the relationship type to use for creating and matching this relationship.
@@ -95,11 +93,7 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
 
         return params
 
-    def merge(
-        self,
-        database: Optional[str] = 'neo4j'  # default to 'neo4j' if not specified
-    ) -> None:
-        """Merge this relationship into the database."""
+    def _get_merge_query(self, database: str) -> Tuple[str, Dict[str, Any]]:
         source_label = self.source.__primarylabel__
         target_label = self.target.__primarylabel__
 
@@ -125,10 +119,27 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
         SET r += $always_set
         """
 
+        return cypher, params
+
+    def merge(
+        self,
+        database: Optional[str] = 'neo4j'  # default to 'neo4j' if not specified
+    ) -> None:
+        """Merge this relationship into the database."""
+        cypher, params = self._get_merge_query(database)
+
         graph = GraphConnection()
 
         graph.cypher_write(cypher, params)
 
+    async def amerge(self, database: Optional[str] = 'neo4j') -> None:
+        """Merge this relationship into the database without blocking the event loop."""
+        cypher, params = self._get_merge_query(database)
+
+        graph = AsyncGraphConnection()
+
+        await graph.cypher_write(cypher, params)
+
     @classmethod
     def merge_relationships(
         cls: Type[R],
@@ -137,6 +148,7 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
         target_type: Optional[Type[BaseNode]] = None,
         source_prop: Optional[str] = None,
         target_prop: Optional[str] = None,
+        database: str = 'neo4j',
     ) -> None:
         """Merge multiple relationships (of this type) into the database.
 
@@ -149,11 +161,66 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
         Args:
             cls (Type[R]): this class
             rels (List[R]): a list of relationships which are instances of this class
+            database (str, optional): The database to merge into. Defaults to 'neo4j'.
+
+        Raises:
+            TypeError: If relationships are provided which aren't of this class
+        """
+        cypher, params = cls._get_merge_relationships_query(
+            rels,
+            source_type=source_type,
+            target_type=target_type,
+            source_prop=source_prop,
+            target_prop=target_prop,
+            database=database,
+        )
+
+        graph = GraphConnection()
+
+        graph.cypher_write(cypher=cypher, params=params)
+
+    @classmethod
+    async def amerge_relationships(
+        cls: Type[R],
+        rels: List[R],
+        source_type: Optional[Type[BaseNode]] = None,
+        target_type: Optional[Type[BaseNode]] = None,
+        source_prop: Optional[str] = None,
+        target_prop: Optional[str] = None,
+        database: str = 'neo4j',
+    ) -> None:
+        """Merge multiple relationships (of this type) into the database without blocking.
+
+        Takes the same arguments as merge_relationships.
 
         Raises:
             TypeError: If relationships are provided which aren't of this class
         """
 
+        cypher, params = cls._get_merge_relationships_query(
+            rels,
+            source_type=source_type,
+            target_type=target_type,
+            source_prop=source_prop,
+            target_prop=target_prop,
+            database=database,
+        )
+
+        graph = AsyncGraphConnection()
+
+        await graph.cypher_write(cypher=cypher, params=params)
+
+    @classmethod
+    def _get_merge_relationships_query(
+        cls: Type[R],
+        rels: List[R],
+        source_type: Optional[Type[BaseNode]] = None,
+        target_type: Optional[Type[BaseNode]] = None,
+        source_prop: Optional[str] = None,
+        target_prop: Optional[str] = None,
+        database: str = 'neo4j',
+    ) -> Tuple[str, Dict[str, Any]]:
+
         if source_type is None:
             source_type = cls.model_fields["source"].annotation
 
@@ -178,7 +245,6 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
         target_label = target_type.__primarylabel__
 
         # build a string of properties to merge on "prop_name: $prop_name"
-        # we need to instantiate the class so that _merge_on is generated as part of __init__
         merge_props = ", ".join([f"{x}: ${x}" for x in cls._get_prop_usage("merge_on")])
 
         rel_list: List[Dict[str, Any]] = [
@@ -188,8 +254,8 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
         rel_type = cls.get_relationship_type()
 
         cypher = f"""
-        UNWIND $rel_list AS rel
         USE {database}
+        UNWIND $rel_list AS rel
         MATCH (source:{source_label})
         WHERE source.{source_prop} = rel.source_prop
         MATCH (target:{target_label})
@@ -200,9 +266,7 @@ class BaseRelationship(CommonModel):  # pyre-ignore[13]
         SET r += rel.always_set
         """
 
-        graph = GraphConnection()
-
-        graph.cypher_write(cypher=cypher, params={"rel_list": rel_list})
+        return cypher, {"rel_list": rel_list}
 
     @classmethod
     def merge_records(
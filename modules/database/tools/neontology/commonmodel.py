@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import date, datetime, time, timedelta
-from typing import Any, ClassVar, Dict, List, Optional, Set
+from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple
 
 from neo4j.time import Date as Neo4jDate
 from neo4j.time import DateTime as Neo4jDateTime
@@ -9,7 +9,6 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
-    PrivateAttr,
     field_validator,
     model_validator,
 )
@@ -27,10 +26,6 @@ class CommonModel(BaseModel, ABC):
     )
     merged: Optional[datetime] = Field(default=None, validate_default=True)
 
-    _set_on_match: List[str] = PrivateAttr()
-    _set_on_create: List[str] = PrivateAttr()
-    _always_set: List[str] = PrivateAttr()
-
     _neo4j_supported_types: ClassVar[Any] = (
         list,
         bool,
@@ -45,31 +40,76 @@ class CommonModel(BaseModel, ABC):
         timedelta,
     )
 
-    def __init__(self, **data: dict):
-        super().__init__(**data)
+    # the schema derived property usage is cached per class under this attribute
+    _prop_usage_attribute: ClassVar[str] = "__neontology_prop_usage__"
+
+    @classmethod
+    def _derive_prop_usage(cls) -> Dict[str, Tuple[str, ...]]:
+        """Build the property usage map from this class's JSON schema.
+
+        Returns:
+            Dict[str, Tuple[str, ...]]: property names for each of set_on_match, set_on_create,
+                merge_on and always_set.
+        """
+        all_props = cls.model_json_schema()["properties"]
+
+        prop_usage = {
+            usage_type: tuple(
+                prop for prop, entry in all_props.items() if entry.get(usage_type) is True
+            )
+            for usage_type in ("set_on_match", "set_on_create", "merge_on")
+        }
+
+        excluded = set(prop_usage["set_on_match"] + prop_usage["set_on_create"]) | {
+            "source",
+            "target",
+        }
 
-        self._set_on_match = self._get_prop_usage("set_on_match")
-        self._set_on_create = self._get_prop_usage("set_on_create")
-        self._always_set = [
+        prop_usage["always_set"] = tuple(
             x
-            for x in self.model_dump().keys()
-            if x not in self._set_on_match + self._set_on_create + ["source", "target"]
-        ]
+            for x in list(cls.model_fields) + list(cls.model_computed_fields)
+            if x not in excluded
+        )
+
+        return prop_usage
 
     @classmethod
-    def _get_prop_usage(cls, usage_type: str) -> List[str]:
-        all_props = cls.model_json_schema()["properties"]
+    def _get_prop_usage_map(cls) -> Dict[str, Tuple[str, ...]]:
+        """Get the property usage map for this class, building it on first use.
+
+        Generating the JSON schema is expensive, so it is done once per class rather than
+            every time a model is instantiated. The result is stored on the class itself so
+            that subclasses get their own entry.
+
+        Returns:
+            Dict[str, Tuple[str, ...]]: property names for each usage type.
+        """
+        prop_usage = cls.__dict__.get(cls._prop_usage_attribute)
+
+        if prop_usage is None:
+            prop_usage = cls._derive_prop_usage()
+            setattr(cls, cls._prop_usage_attribute, prop_usage)
+
+        return prop_usage
+
+    @classmethod
+    def _get_prop_usage(cls, usage_type: str) -> Tuple[str, ...]:
+        return cls._get_prop_usage_map()[usage_type]
 
-        selected_props = []
+    @property
+    def _set_on_match(self) -> Tuple[str, ...]:
+        return self._get_prop_usage("set_on_match")
 
-        for prop, entry in all_props.items():
-            if entry.get(usage_type) is True:
-                selected_props.append(prop)
+    @property
+    def _set_on_create(self) -> Tuple[str, ...]:
+        return self._get_prop_usage("set_on_create")
 
-        return selected_props
+    @property
+    def _always_set(self) -> Tuple[str, ...]:
+        return self._get_prop_usage("always_set")
 
     def _get_prop_values(
-        self, props: List[str], exclude: Set[str] = set()
+        self, props: Tuple[str, ...], exclude: Set[str] = set()
     ) -> Dict[str, Any]:
         """
 
@@ -12,9 +12,12 @@ logging = logger.get_logger(
     runtime=True,
     log_format='default'
 )
+import asyncio
+import weakref
 from typing import Any, Dict, List, Optional
 
-from neo4j import GraphDatabase, Neo4jDriver
+from neo4j import AsyncDriver, AsyncGraphDatabase, GraphDatabase, Neo4jDriver
+from neo4j import AsyncManagedTransaction, AsyncResult
 from neo4j import Record as Neo4jRecord
 from neo4j import Result as Neo4jResult
 from neo4j import Transaction as Neo4jTransaction
@@ -219,6 +222,194 @@ class GraphConnection(object):
         )
 
 
+class AsyncGraphConnection(object):
+    """Class for managing asynchronous connections to Neo4j.
+
+    Mirrors GraphConnection with awaitable methods so that async request handlers
+        don't block the event loop while they wait on the database.
+
+    Async drivers are bound to the event loop they are first used on,
+        so a driver is created lazily for each running loop.
+    """
+
+    _instance = None
+
+    def __new__(
+        cls,
+        neo4j_uri: Optional[str] = None,
+        neo4j_username: Optional[str] = None,
+        neo4j_password: Optional[str] = None,
+    ) -> "AsyncGraphConnection":
+        """Make sure we only have a single set of connection details.
+
+        Args:
+            neo4j_uri (Optional[str], optional): Neo4j URI to connect to. Defaults to None.
+            neo4j_username (Optional[str], optional): Neo4j username. Defaults to None.
+            neo4j_password (Optional[str], optional): Neo4j password. Defaults to None.
+
+        Returns:
+            AsyncGraphConnection: Instance of the connection
+        """
+
+        if cls._instance is None:
+            if neo4j_uri is None:
+                logging.error(
+                    "Error: async connection not established. Have you run init_neontology?"
+                )
+                return None
+
+            instance = object.__new__(cls)
+            instance._neo4j_uri = neo4j_uri
+            instance._neo4j_auth = (neo4j_username, neo4j_password)
+            instance._drivers = weakref.WeakKeyDictionary()
+            instance.global_nodes = None
+            instance.global_rels = None
+            cls._instance = instance
+
+        return cls._instance
+
+    @property
+    def driver(self) -> AsyncDriver:
+        """The async driver for the running event loop."""
+
+        loop = asyncio.get_running_loop()
+        driver = self._drivers.get(loop)
+
+        if driver is None:
+            driver = AsyncGraphDatabase.driver(self._neo4j_uri, auth=self._neo4j_auth)
+            self._drivers[loop] = driver
+
+        return driver
+
+    async def verify_connectivity(self) -> None:
+        await self.driver.verify_connectivity()
+
+    async def close(self) -> None:
+        """Close the driver for the running event loop."""
+
+        driver = self._drivers.pop(asyncio.get_running_loop(), None)
+
+        if driver is not None:
+            await driver.close()
+
+    @staticmethod
+    async def run_transaction_single(
+        tx: AsyncManagedTransaction, query: str, params: Dict[str, Any]
+    ) -> Optional[Neo4jRecord]:
+        """Run a transaction which is expected to return a single result."""
+
+        result = await tx.run(query, **params)
+        return await result.single()
+
+    @staticmethod
+    async def run_transaction_many(
+        tx: AsyncManagedTransaction, query: str, params: Dict[str, Any]
+    ) -> List[Neo4jRecord]:
+        """Run a transation which is expected to return multiple nodes."""
+
+        result = await tx.run(query, **params)
+        return [record async for record in result]
+
+    async def cypher_write(self, cypher: str, params: Dict[str, Any] = {}) -> None:
+        """Execute a write transaction.
+
+        Args:
+            cypher (str): cypher query
+            params (Dict[str, Any]): parameters to pass to the query
+        """
+
+        async with self.driver.session() as session:
+            await session.execute_write(self.run_transaction_single, cypher, params)
+
+    async def cypher_write_single(
+        self, cypher: str, params: Dict[str, Any] = {}
+    ) -> Optional[Neo4jRecord]:
+        """Execute a write transaction which is expected to return a single result.
+
+        Args:
+            cypher (str): cypher query
+            params (Dict[str, Any]): parameters to pass to the query
+        """
+
+        async with self.driver.session() as session:
+            return await session.execute_write(self.run_transaction_single, cypher, params)
+
+    async def cypher_write_many(
+        self, cypher: str, params: Dict[str, Any] = {}
+    ) -> List[Neo4jRecord]:
+        """Execute a write transaction which returns multiple records.
+
+        Args:
+            cypher (str): cypher query
+            params (Dict[str, Any]): parameters to pass to the query
+        """
+
+        async with self.driver.session() as session:
+            return await session.execute_write(self.run_transaction_many, cypher, params)
+
+    async def cypher_read(
+        self, cypher: str, params: Dict[str, Any] = {}
+    ) -> Optional[Neo4jRecord]:
+        """Run a cypher read only query which is expected to return a single result.
+
+        Args:
+            cypher (str): cypher query string
+            params (Dict[str, Any]): parameters to pass to the query
+
+        Returns:
+            Neo4jRecord: the resulting Neo4j 'Record', or None
+        """
+
+        async with self.driver.session() as session:
+            return await session.execute_read(self.run_transaction_single, cypher, params)
+
+    async def cypher_read_many(
+        self, cypher: str, params: Dict[str, Any] = {}
+    ) -> List[Neo4jRecord]:
+        """Run a cypher read query which will return multiple records.
+
+        Args:
+            cypher (str): cypher string to run
+            params (Dict[str, Any]): parameters to pass to the query
+
+        Returns:
+            List[Neo4jRecord]: A list of Neo4j 'Records' returned by the query.
+        """
+
+        async with self.driver.session() as session:
+            return await session.execute_read(self.run_transaction_many, cypher, params)
+
+    async def evaluate_query_single(self, cypher, params={}):
+        result = await self.driver.execute_query(
+            cypher, parameters_=params, result_transformer_=AsyncResult.single
+        )
+
+        if result:
+            return result.value()
+
+        else:
+            return None
+
+    async def evaluate_query(self, cypher, params={}):
+        if self.global_nodes is None:
+            from .utils import get_node_types, get_rels_by_type
+
+            # capture all possible types of node and relationship
+            self.global_nodes = get_node_types()
+            self.global_rels = get_rels_by_type()
+
+        result = await self.driver.execute_query(cypher, parameters_=params)
+
+        neo4j_records = result.records
+        neontology_records = neo4j_records_to_neontology_records(
+            neo4j_records, self.global_nodes, self.global_rels
+        )
+
+        return NeontologyResult(
+            records=neo4j_records, neontology_records=neontology_records
+        )
+
+
 def init_neontology(
     neo4j_uri: Optional[str] = None,
     neo4j_username: Optional[str] = None,
@@ -248,3 +439,4 @@ def init_neontology(
         neo4j_username = os.getenv("NEO4J_USERNAME")
 
     GraphConnection(neo4j_uri, neo4j_username, neo4j_password)
+    AsyncGraphConnection(neo4j_uri, neo4j_username, neo4j_password)
@@ -0,0 +1,56 @@
+# type: ignore
+"""Microbenchmark for node and relationship instantiation.
+
+Compares building nodes and relationships with the per-class property usage cache
+against the previous behaviour, where the JSON schema was generated on every instantiation.
+
+    python -m modules.database.tools.neontology.tests.benchmark_prop_usage [iterations]
+
+"""
+import sys
+import timeit
+from datetime import date
+
+from modules.database.schemas.calendar_neo import CalendarDayNode
+from modules.database.schemas.relationships.calendar_rels import DayFollowsDay
+
+
+def build_day(i):
+    return CalendarDayNode(
+        unique_id=f"CalendarDay_bench_{i}",
+        date=date(2024, 9, 1),
+        day_of_week="Sunday",
+        iso_day="2024-09-01",
+        path="/bench",
+    )
+
+
+def build_with_cache(i):
+    source, target = build_day(i), build_day(i + 1)
+    rel = DayFollowsDay(source=source, target=target)
+    return source._get_merge_parameters(), rel._get_merge_parameters("unique_id", "unique_id")
+
+
+def build_without_cache(i):
+    # what instantiation used to pay: two schema builds per node (set_on_match and
+    # set_on_create) and a third for a relationship's merge_on properties
+    for model in (CalendarDayNode,) * 4 + (DayFollowsDay,) * 3:
+        model.model_json_schema()
+    return build_with_cache(i)
+
+
+def main(iterations=2000):
+    # warm up so the one-off cache population isn't counted
+    build_with_cache(0)
+
+    before = timeit.timeit(lambda: build_without_cache(1), number=iterations)
+    after = timeit.timeit(lambda: build_with_cache(1), number=iterations)
+
+    print(f"{iterations} x (2 day nodes + 1 relationship + merge parameters)")
+    print(f"  schema per instance: {before * 1e6 / iterations:8.1f} us per iteration")
+    print(f"  cached per class:    {after * 1e6 / iterations:8.1f} us per iteration")
+    print(f"  speed up:            {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,127 @@
+# type: ignore
+import asyncio
+from typing import ClassVar, Optional
+
+from modules.database.tools.neontology.graphconnection import AsyncGraphConnection
+
+from modules.database.tools.neontology.basenode import BaseNode
+from modules.database.tools.neontology.baserelationship import BaseRelationship
+
+
+class PracticeNode(BaseNode):
+    __primaryproperty__: ClassVar[str] = "pp"
+    __primarylabel__: ClassVar[Optional[str]] = "PracticeNode"
+    pp: str
+
+
+class PracticeRelationship(BaseRelationship):
+    source: PracticeNode
+    target: PracticeNode
+    __relationshiptype__: ClassVar[Optional[str]] = "PRACTICE_RELATIONSHIP"
+
+
+def run_async(coroutine_function):
+    """Run a coroutine on a fresh loop, closing the loop's driver afterwards."""
+
+    async def runner():
+        try:
+            return await coroutine_function()
+        finally:
+            await AsyncGraphConnection().close()
+
+    return asyncio.run(runner())
+
+
+def test_async_cypher_write_and_read(use_graph):
+    async def write_and_read():
+        gc = AsyncGraphConnection()
+
+        await gc.cypher_write("CREATE (tn:TestNode {name: $name})", {"name": "Foo Bar"})
+
+        return await gc.cypher_read("MATCH (tn:TestNode) RETURN tn.name AS name")
+
+    result = run_async(write_and_read)
+
+    assert result["name"] == "Foo Bar"
+
+
+def test_async_cypher_read_many(use_graph):
+    use_graph.evaluate("CREATE (:TestNode {name: 'Foo'}), (:TestNode {name: 'Bar'})")
+
+    async def read_many():
+        return await AsyncGraphConnection().cypher_read_many(
+            "MATCH (tn:TestNode) RETURN tn.name AS name ORDER BY name"
+        )
+
+    results = run_async(read_many)
+
+    assert [x["name"] for x in results] == ["Bar", "Foo"]
+
+
+def test_async_evaluate_query(use_graph):
+    async def evaluate():
+        PracticeNode(pp="Test Node").merge()
+
+        return await AsyncGraphConnection().evaluate_query(
+            "MATCH (n:PracticeNode) RETURN n"
+        )
+
+    result = run_async(evaluate)
+
+    assert result.nodes[0].pp == "Test Node"
+
+
+def test_amerge_and_amatch(use_graph):
+    async def merge_and_match():
+        await PracticeNode(pp="Test Node").amerge()
+
+        return await PracticeNode.amatch("Test Node")
+
+    result = run_async(merge_and_match)
+
+    assert result.pp == "Test Node"
+
+
+def test_amatch_missing(use_graph):
+    result = run_async(lambda: PracticeNode.amatch("Missing Node"))
+
+    assert result is None
+
+
+def test_amerge_nodes_and_relationships(use_graph):
+    source = PracticeNode(pp="Source Node")
+    target = PracticeNode(pp="Target Node")
+
+    async def merge_all():
+        merged = await PracticeNode.amerge_nodes([source, target])
+        await PracticeRelationship.amerge_relationships(
+            [PracticeRelationship(source=source, target=target)]
+        )
+        return merged
+
+    merged = run_async(merge_all)
+
+    assert sorted(x.pp for x in merged) == ["Source Node", "Target Node"]
+
+    cypher = """
+    MATCH (src:PracticeNode)-[r:PRACTICE_RELATIONSHIP]->(tgt:PracticeNode)
+    RETURN COLLECT([src.pp, tgt.pp])
+    """
+
+    assert use_graph.evaluate(cypher) == [["Source Node", "Target Node"]]
+
+
+def test_relationship_amerge(use_graph):
+    source = PracticeNode(pp="Source Node")
+    target = PracticeNode(pp="Target Node")
+    source.merge()
+    target.merge()
+
+    run_async(lambda: PracticeRelationship(source=source, target=target).amerge())
+
+    cypher = """
+    MATCH (:PracticeNode)-[r:PRACTICE_RELATIONSHIP]->(:PracticeNode)
+    RETURN COUNT(r)
+    """
+
+    assert use_graph.evaluate(cypher) == 1
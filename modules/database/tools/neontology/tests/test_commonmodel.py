@@ -35,9 +35,9 @@ def test_set_on_match():
 
     test_model = TestModel(only_set_on_match="Foo", normal_field="Bar")
 
-    assert test_model._set_on_create == ["created"]
-    assert test_model._set_on_match == ["only_set_on_match"]
-    assert test_model._always_set == ["merged", "normal_field"]
+    assert test_model._set_on_create == ("created",)
+    assert test_model._set_on_match == ("only_set_on_match",)
+    assert test_model._always_set == ("merged", "normal_field")
 
 
 def test_set_on_create():
@@ -49,9 +49,37 @@ def test_set_on_create():
 
     test_model = TestModel(only_set_on_create="Foo", normal_field="Bar")
 
-    assert test_model._set_on_create == ["created", "only_set_on_create"]
-    assert test_model._set_on_match == []
-    assert test_model._always_set == ["merged", "normal_field"]
+    assert test_model._set_on_create == ("created", "only_set_on_create")
+    assert test_model._set_on_match == ()
+    assert test_model._always_set == ("merged", "normal_field")
+
+
+def test_prop_usage_cached_per_class():
+    """Check the schema is only used once per class and subclasses get their own entry"""
+
+    class TestModel(PracticeModel):
+        only_set_on_match: str = Field(json_schema_extra={"set_on_match": True})
+
+    class TestSubModel(TestModel):
+        only_set_on_create: str = Field(json_schema_extra={"set_on_create": True})
+
+    schema_calls = []
+    original_schema = TestModel.model_json_schema.__func__
+
+    def counting_schema(cls, *args, **kwargs):
+        schema_calls.append(cls)
+        return original_schema(cls, *args, **kwargs)
+
+    TestModel.model_json_schema = classmethod(counting_schema)
+
+    for _ in range(3):
+        assert TestModel(only_set_on_match="Foo")._set_on_match == ("only_set_on_match",)
+        assert TestSubModel(only_set_on_match="Foo", only_set_on_create="Bar")._set_on_create == (
+            "created",
+            "only_set_on_create",
+        )
+
+    assert schema_calls == [TestModel, TestSubModel]
 
 
 @pytest.mark.parametrize(
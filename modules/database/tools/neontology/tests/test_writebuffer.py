@@ -0,0 +1,181 @@
+# type: ignore
+
+from typing import ClassVar, Optional
+
+import pytest
+
+from modules.database.tools.neontology.basenode import BaseNode
+from modules.database.tools.neontology.baserelationship import BaseRelationship
+from modules.database.tools.neontology.writebuffer import GraphWriteBuffer
+
+
+class PracticeNode(BaseNode):
+    __primaryproperty__: ClassVar[str] = "pp"
+    __primarylabel__: ClassVar[Optional[str]] = "PracticeNode"
+    pp: str
+
+
+class OtherPracticeNode(BaseNode):
+    __primaryproperty__: ClassVar[str] = "pp"
+    __primarylabel__: ClassVar[Optional[str]] = "OtherPracticeNode"
+    pp: str
+
+
+class PracticeRelationship(BaseRelationship):
+    source: PracticeNode
+    target: PracticeNode
+    __relationshiptype__: ClassVar[Optional[str]] = "PRACTICE_RELATIONSHIP"
+
+
+@pytest.fixture
+def recorded_writes(monkeypatch):
+    """Replace the bulk merge methods with ones which record what they were given."""
+    writes = []
+
+    def fake_merge_nodes(cls, nodes, database="neo4j"):
+        writes.append(("nodes", cls, database, [x.pp for x in nodes]))
+
+    def fake_merge_relationships(cls, rels, source_type=None, target_type=None, database="neo4j", **kwargs):
+        writes.append(("relationships", cls, database, [(x.source.pp, x.target.pp) for x in rels]))
+
+    monkeypatch.setattr(BaseNode, "merge_nodes", classmethod(fake_merge_nodes))
+    monkeypatch.setattr(BaseRelationship, "merge_relationships", classmethod(fake_merge_relationships))
+
+    return writes
+
+
+def test_buffer_groups_by_class_and_database(recorded_writes):
+    buffer = GraphWriteBuffer(database="db1", flush_size=None)
+
+    buffer.merge_node(PracticeNode(pp="A"))
+    buffer.merge_node(OtherPracticeNode(pp="B"))
+    buffer.merge_node(PracticeNode(pp="C"), database="db2")
+    buffer.merge_node(PracticeNode(pp="D"))
+
+    assert buffer.pending == 4
+    assert recorded_writes == []
+
+    stats = buffer.flush()
+
+    assert stats == {"nodes": 4, "relationships": 0, "statements": 3}
+    assert ("nodes", PracticeNode, "db1", ["A", "D"]) in recorded_writes
+    assert ("nodes", OtherPracticeNode, "db1", ["B"]) in recorded_writes
+    assert ("nodes", PracticeNode, "db2", ["C"]) in recorded_writes
+    assert buffer.pending == 0
+
+
+def test_buffer_collapses_repeated_nodes(recorded_writes):
+    buffer = GraphWriteBuffer(flush_size=None)
+
+    buffer.merge_node(PracticeNode(pp="A"))
+    buffer.merge_node(PracticeNode(pp="A"))
+
+    assert buffer.pending == 1
+
+
+def test_buffer_writes_nodes_before_relationships(recorded_writes):
+    source = PracticeNode(pp="Source")
+    target = PracticeNode(pp="Target")
+
+    with GraphWriteBuffer(flush_size=None) as buffer:
+        buffer.merge_relationship(PracticeRelationship(source=source, target=target))
+        buffer.merge_node(source)
+        buffer.merge_node(target)
+
+    assert [x[0] for x in recorded_writes] == ["nodes", "relationships"]
+    assert recorded_writes[1][3] == [("Source", "Target")]
+
+
+def test_buffer_flush_size_chunks_and_auto_flushes(recorded_writes):
+    buffer = GraphWriteBuffer(flush_size=2)
+
+    for pp in ["A", "B", "C"]:
+        buffer.merge_node(PracticeNode(pp=pp))
+
+    assert recorded_writes == [("nodes", PracticeNode, "neo4j", ["A", "B"])]
+    assert buffer.pending == 1
+
+    buffer.flush()
+
+    assert buffer.nodes_written == 3
+    assert buffer.statements_run == 2
+
+
+def test_buffer_discards_on_error(recorded_writes):
+    with pytest.raises(RuntimeError):
+        with GraphWriteBuffer(flush_size=None) as buffer:
+            buffer.merge_node(PracticeNode(pp="A"))
+            raise RuntimeError("Something went wrong")
+
+    assert buffer.pending == 0
+    assert recorded_writes == []
+
+
+def test_buffer_replicates_to_several_databases(recorded_writes):
+    source = PracticeNode(pp="Source")
+    target = PracticeNode(pp="Target")
+
+    buffer = GraphWriteBuffer(database="db1", flush_size=None)
+    buffer.merge_node(source, database=("db1", "db2"))
+    buffer.merge_node(target, database=["db1", "db2", "db1"])
+    buffer.merge_node(PracticeNode(pp="Only"))
+    buffer.merge_relationship(PracticeRelationship(source=source, target=target), database=("db1", "db2"))
+
+    assert buffer.pending == 7
+
+    stats = buffer.flush()
+
+    assert stats == {"nodes": 5, "relationships": 2, "statements": 4}
+    assert ("nodes", PracticeNode, "db1", ["Source", "Target", "Only"]) in recorded_writes
+    assert ("nodes", PracticeNode, "db2", ["Source", "Target"]) in recorded_writes
+    assert ("relationships", PracticeRelationship, "db2", [("Source", "Target")]) in recorded_writes
+    assert buffer.database_stats["db1"]["nodes"] == 3
+    assert buffer.database_stats["db2"]["relationships"] == 1
+    assert buffer.database_stats["db2"]["errors"] == 0
+
+
+def test_buffer_reports_errors_per_database(recorded_writes, monkeypatch):
+    def failing_merge_nodes(cls, nodes, database="neo4j"):
+        if database == "bad_db":
+            raise RuntimeError("Database unavailable")
+        recorded_writes.append(("nodes", cls, database, [x.pp for x in nodes]))
+
+    monkeypatch.setattr(BaseNode, "merge_nodes", classmethod(failing_merge_nodes))
+
+    buffer = GraphWriteBuffer(flush_size=None)
+    buffer.merge_node(PracticeNode(pp="A"), database=("good_db", "bad_db"))
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+
+    assert recorded_writes == [("nodes", PracticeNode, "good_db", ["A"])]
+    assert buffer.database_stats["good_db"]["errors"] == 0
+    assert buffer.database_stats["bad_db"]["errors"] == 1
+    assert buffer.pending == 0
+
+
+def test_buffer_invalid_flush_size():
+    with pytest.raises(ValueError):
+        GraphWriteBuffer(flush_size=0)
+
+    with pytest.raises(ValueError):
+        GraphWriteBuffer(max_workers=0)
+
+
+def test_buffer_merge(use_graph):
+    source = PracticeNode(pp="Source Node")
+    target = PracticeNode(pp="Target Node")
+
+    with GraphWriteBuffer(flush_size=1) as buffer:
+        buffer.merge_node(source)
+        buffer.merge_node(target)
+        buffer.merge_relationship(PracticeRelationship(source=source, target=target))
+
+    cypher = """
+    MATCH (src:PracticeNode)-[r:PRACTICE_RELATIONSHIP]->(tgt:PracticeNode)
+    RETURN COLLECT([src.pp, tgt.pp])
+    """
+
+    results = use_graph.evaluate(cypher)
+
+    assert results == [["Source Node", "Target Node"]]
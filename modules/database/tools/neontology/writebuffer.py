@@ -0,0 +1,280 @@
+"""Defines the GraphWriteBuffer class.
+
+The GraphWriteBuffer is a unit of work for writing lots of nodes and relationships.
+Rather than sending one MERGE per object, nodes and relationships are collected,
+grouped by class and target database, and written with chunked UNWIND merges.
+
+Nodes are always written before relationships so that relationships can match
+on nodes which were added to the same buffer.
+
+A node or relationship can be replicated to several databases by passing a tuple
+of database names. It is built once and queued for each database, and on flush the
+batch for each database is written concurrently, with the outcome recorded per
+database in database_stats.
+
+    Typical usage example:
+
+    with GraphWriteBuffer(database="my_db", flush_size=1000) as buffer:
+        buffer.merge_node(source_node)
+        buffer.merge_node(target_node)
+        buffer.merge_relationship(MyRel(source=source_node, target=target_node))
+        buffer.merge_node(shared_node, database=("my_db", "my_other_db"))
+
+"""
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_tools_neontology_writebuffer'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from .basenode import BaseNode
+from .baserelationship import BaseRelationship
+
+DEFAULT_FLUSH_SIZE = int(os.getenv("NEO4J_WRITE_BUFFER_FLUSH_SIZE", 1000))
+DEFAULT_MAX_WORKERS = int(os.getenv("NEO4J_WRITE_BUFFER_MAX_WORKERS", 4))
+
+Databases = Union[str, Sequence[str]]
+
+NodeGroupKey = Tuple[str, Type[BaseNode]]
+RelationshipGroupKey = Tuple[str, Type[BaseRelationship], Type[BaseNode], Type[BaseNode]]
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class GraphWriteBuffer(object):
+    """Collect nodes and relationships and write them in bulk."""
+
+    def __init__(
+        self,
+        database: str = 'neo4j',
+        flush_size: Optional[int] = DEFAULT_FLUSH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """
+        Args:
+            database (str, optional): The default database to write to. Defaults to 'neo4j'.
+            flush_size (Optional[int], optional): Number of pending items which triggers an
+                automatic flush, also used as the UNWIND chunk size. None disables automatic
+                flushing. Defaults to DEFAULT_FLUSH_SIZE.
+            max_workers (int, optional): Number of databases written to concurrently on flush.
+                Defaults to DEFAULT_MAX_WORKERS.
+        """
+        if flush_size is not None and flush_size < 1:
+            raise ValueError("flush_size must be a positive integer or None.")
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
+
+        self.database = database
+        self.flush_size = flush_size
+        self.max_workers = max_workers
+
+        # nodes are keyed on their primary property so repeated merges of the same node collapse
+        self._nodes: Dict[NodeGroupKey, Dict[Any, BaseNode]] = {}
+        self._relationships: Dict[RelationshipGroupKey, List[BaseRelationship]] = {}
+
+        self.nodes_written = 0
+        self.relationships_written = 0
+        self.statements_run = 0
+        # cumulative nodes, relationships, statements, seconds and errors for each database
+        self.database_stats: Dict[str, Dict[str, Any]] = {}
+
+    def __enter__(self) -> "GraphWriteBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.flush()
+        else:
+            logging.warning(
+                f"Discarding {self.pending} pending graph writes after error: {exc_value}"
+            )
+            self.clear()
+
+    @property
+    def pending(self) -> int:
+        """The number of nodes and relationships waiting to be written."""
+        return sum(len(x) for x in self._nodes.values()) + sum(
+            len(x) for x in self._relationships.values()
+        )
+
+    def _databases(self, database: Optional[Databases]) -> Tuple[str, ...]:
+        if database is None:
+            return (self.database,)
+        if isinstance(database, str):
+            return (database,)
+        return tuple(dict.fromkeys(database))
+
+    def merge_node(self, node: BaseNode, database: Optional[Databases] = None) -> BaseNode:
+        """Add a node to be merged on the next flush.
+
+        Args:
+            node (BaseNode): The node to merge.
+            database (Optional[Databases], optional): Target database, or several databases to
+                replicate the node to. Defaults to the buffer database.
+
+        Returns:
+            BaseNode: The node, so calls can be used in place of node.merge().
+        """
+        primary_value = getattr(node, node.__primaryproperty__)
+        for db in self._databases(database):
+            self._nodes.setdefault((db, type(node)), {})[primary_value] = node
+        self._auto_flush()
+        return node
+
+    def merge_nodes(self, nodes: List[BaseNode], database: Optional[Databases] = None) -> None:
+        """Add several nodes to be merged on the next flush."""
+        for node in nodes:
+            self.merge_node(node, database=database)
+
+    def merge_relationship(
+        self, relationship: BaseRelationship, database: Optional[Databases] = None
+    ) -> BaseRelationship:
+        """Add a relationship to be merged on the next flush.
+
+        Args:
+            relationship (BaseRelationship): The relationship to merge.
+            database (Optional[Databases], optional): Target database, or several databases to
+                replicate the relationship to. Defaults to the buffer database.
+
+        Returns:
+            BaseRelationship: The relationship.
+        """
+        for db in self._databases(database):
+            key = (
+                db,
+                type(relationship),
+                type(relationship.source),
+                type(relationship.target),
+            )
+            self._relationships.setdefault(key, []).append(relationship)
+        self._auto_flush()
+        return relationship
+
+    def merge_relationships(
+        self, relationships: List[BaseRelationship], database: Optional[Databases] = None
+    ) -> None:
+        """Add several relationships to be merged on the next flush."""
+        for relationship in relationships:
+            self.merge_relationship(relationship, database=database)
+
+    def _auto_flush(self) -> None:
+        if self.flush_size is not None and self.pending >= self.flush_size:
+            self.flush()
+
+    def clear(self) -> None:
+        """Drop everything pending without writing it."""
+        self._nodes = {}
+        self._relationships = {}
+
+    def _write_database(
+        self,
+        database: str,
+        nodes: List[Tuple[Type[BaseNode], List[BaseNode]]],
+        relationships: List[Tuple[Type[BaseRelationship], Type[BaseNode], Type[BaseNode], List[BaseRelationship]]],
+    ) -> Dict[str, Any]:
+        """Write one database's batch, nodes first and then relationships."""
+        stats: Dict[str, Any] = {"nodes": 0, "relationships": 0, "statements": 0, "seconds": 0.0, "error": None}
+        start = time.perf_counter()
+
+        try:
+            for node_type, node_list in nodes:
+                for chunk in _chunks(node_list, self.flush_size or len(node_list)):
+                    node_type.merge_nodes(chunk, database=database)
+                    stats["statements"] += 1
+                stats["nodes"] += len(node_list)
+
+            for rel_type, source_type, target_type, rel_list in relationships:
+                for chunk in _chunks(rel_list, self.flush_size or len(rel_list)):
+                    rel_type.merge_relationships(
+                        chunk,
+                        source_type=source_type,
+                        target_type=target_type,
+                        database=database,
+                    )
+                    stats["statements"] += 1
+                stats["relationships"] += len(rel_list)
+
+        except Exception as e:
+            logging.error(f"Error flushing graph write buffer to {database}: {e}")
+            stats["error"] = e
+
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def flush(self) -> Dict[str, int]:
+        """Write everything pending, nodes first and then relationships.
+
+        Each database's batch is written by its own worker, so replicated writes to
+        several databases run concurrently. The outcome for each database is added to
+        database_stats.
+
+        Raises:
+            Exception: The first error from any database is re-raised once every
+                database has finished.
+
+        Returns:
+            Dict[str, int]: Counts of nodes, relationships and statements written by this flush.
+        """
+        nodes, relationships = self._nodes, self._relationships
+        self.clear()
+
+        batches: Dict[str, Tuple[list, list]] = {}
+        for (database, node_type), keyed_nodes in nodes.items():
+            batches.setdefault(database, ([], []))[0].append((node_type, list(keyed_nodes.values())))
+        for (database, rel_type, source_type, target_type), rel_list in relationships.items():
+            batches.setdefault(database, ([], []))[1].append((rel_type, source_type, target_type, rel_list))
+
+        if len(batches) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                futures = {
+                    database: executor.submit(self._write_database, database, *batch)
+                    for database, batch in batches.items()
+                }
+                results = {database: future.result() for database, future in futures.items()}
+        else:
+            results = {database: self._write_database(database, *batch) for database, batch in batches.items()}
+
+        stats = {"nodes": 0, "relationships": 0, "statements": 0}
+        errors = []
+        for database, result in results.items():
+            for key in stats:
+                stats[key] += result[key]
+
+            database_stats = self.database_stats.setdefault(
+                database, {"nodes": 0, "relationships": 0, "statements": 0, "seconds": 0.0, "errors": 0}
+            )
+            for key in ("nodes", "relationships", "statements", "seconds"):
+                database_stats[key] += result[key]
+            if result["error"] is not None:
+                database_stats["errors"] += 1
+                errors.append(result["error"])
+
+            if result["statements"]:
+                logging.debug(
+                    f"Flushed {result['nodes']} nodes and {result['relationships']} relationships "
+                    f"to {database} in {result['statements']} statements ({result['seconds']:.2f}s)"
+                )
+
+        self.nodes_written += stats["nodes"]
+        self.relationships_written += stats["relationships"]
+        self.statements_run += stats["statements"]
+
+        if errors:
+            raise errors[0]
+
+        return stats
@@ -15,6 +15,7 @@ logging = logger.get_logger(
 from modules.database.tools.neontology.graphconnection import init_neontology
 from modules.database.tools.neontology.basenode import BaseNode
 from modules.database.tools.neontology.baserelationship import BaseRelationship
+from modules.database.tools.neontology.writebuffer import GraphWriteBuffer
 from pydantic import ValidationError
 import os
 import neo4j
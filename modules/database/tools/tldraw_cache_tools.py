@@ -0,0 +1,171 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_tools_tldraw_cache_tools'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import threading
+import time
+from collections import OrderedDict
+from redis import Redis
+from redis.exceptions import RedisError
+
+TLDRAW_CACHE_MAX_BYTES = int(os.getenv("TLDRAW_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# A single canvas larger than this is not cached, so one huge file cannot empty the cache
+TLDRAW_CACHE_MAX_ENTRY_BYTES = int(os.getenv("TLDRAW_CACHE_MAX_ENTRY_BYTES", TLDRAW_CACHE_MAX_BYTES // 8))
+# Optional shared tier holding snapshot blobs by SHA-256, e.g. redis://localhost:6379/2
+TLDRAW_CACHE_REDIS_URL = os.getenv("TLDRAW_CACHE_REDIS_URL", "")
+TLDRAW_CACHE_REDIS_TTL = int(os.getenv("TLDRAW_CACHE_REDIS_TTL", 24 * 3600))
+TLDRAW_CACHE_REDIS_TIMEOUT = float(os.getenv("TLDRAW_CACHE_REDIS_TIMEOUT", 0.25))
+# After a Redis error the shared tier is skipped for this long rather than slowing every read
+TLDRAW_CACHE_REDIS_RETRY_SECONDS = float(os.getenv("TLDRAW_CACHE_REDIS_RETRY_SECONDS", 30))
+REDIS_KEY_PREFIX = 'tldraw:snapshot:'
+
+
+def stat_validator(kind, stat_result):
+    """What a cached file is checked against: which file was read, and its inode, mtime and size.
+
+    Snapshot pointers are replaced by a rename on every save, so each version has a new inode
+    even when two saves land within the filesystem's mtime resolution.
+    """
+    return (kind, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
+
+class TldrawFileCache:
+    """An LRU of serialised tldraw files, bounded by the total bytes held rather than the entry count.
+
+    Entries are keyed by file location and hold the file's bytes, its ETag and the validator
+    of the file they were read from. A lookup is only a hit when the caller's fresh stat of the
+    file gives the same validator, so a file changed by another worker process, or on disk, is
+    read again rather than served stale. Each process has its own cache.
+
+    With a Redis URL, snapshot blobs are also shared between processes under their SHA-256.
+    Blobs never change once written, so the shared tier needs no invalidation.
+    """
+
+    def __init__(self, max_bytes=TLDRAW_CACHE_MAX_BYTES, max_entry_bytes=TLDRAW_CACHE_MAX_ENTRY_BYTES,
+                 redis_url=TLDRAW_CACHE_REDIS_URL, redis_ttl=TLDRAW_CACHE_REDIS_TTL):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.redis_ttl = redis_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('hits', 'misses', 'stale', 'evictions', 'writes', 'too_large',
+             'shared_hits', 'shared_misses', 'shared_errors'), 0
+        )
+        self._redis = None
+        self._redis_retry_at = 0.0
+        if redis_url:
+            self._redis = Redis.from_url(
+                redis_url, socket_timeout=TLDRAW_CACHE_REDIS_TIMEOUT, socket_connect_timeout=TLDRAW_CACHE_REDIS_TIMEOUT
+            )
+            logging.info(f"Sharing tldraw snapshots through Redis at {redis_url}")
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _remove(self, key):
+        content, _, _ = self._entries.pop(key)
+        self._bytes -= len(content)
+
+    def get(self, key, validator):
+        """The cached (content, etag) for a file whose fresh validator is given, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] != validator:
+                self._remove(key)
+                self._counters['stale'] += 1
+                entry = None
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry[0], entry[1]
+
+    def put(self, key, validator, content, etag, write=False):
+        """Cache a file's bytes, evicting the least recently used files to make room.
+
+        write marks bytes which came from a save rather than a read, for the counters.
+        Returns (content, etag), so a read can cache and return in one call.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if write:
+                self._counters['writes'] += 1
+            if len(content) > self.max_entry_bytes:
+                self._counters['too_large'] += 1
+                return content, etag
+            while self._entries and self._bytes + len(content) > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters['evictions'] += 1
+            self._entries[key] = (content, etag, validator)
+            self._bytes += len(content)
+        return content, etag
+
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _shared_available(self):
+        return self._redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _shared_failed(self, e):
+        logging.warning(f"Redis tldraw cache unavailable, retrying in {TLDRAW_CACHE_REDIS_RETRY_SECONDS}s: {e}")
+        self._redis_retry_at = time.monotonic() + TLDRAW_CACHE_REDIS_RETRY_SECONDS
+        self._count('shared_errors')
+
+    def get_shared(self, sha256):
+        """A snapshot blob's serialised bytes from the shared tier, or None."""
+        if not self._shared_available():
+            return None
+        try:
+            content = self._redis.get(REDIS_KEY_PREFIX + sha256)
+        except RedisError as e:
+            self._shared_failed(e)
+            return None
+        self._count('shared_hits' if content is not None else 'shared_misses')
+        return content
+
+    def put_shared(self, sha256, content):
+        if not self._shared_available() or len(content) > self.max_entry_bytes:
+            return
+        try:
+            self._redis.set(REDIS_KEY_PREFIX + sha256, content, ex=self.redis_ttl)
+        except RedisError as e:
+            self._shared_failed(e)
+
+    def metrics(self):
+        with self._lock:
+            metrics = {
+                **self._counters,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'pid': os.getpid(),
+            }
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_ratio'] = round(metrics['hits'] / lookups, 3) if lookups else None
+        metrics['shared'] = self._redis is not None
+        return metrics
+
+
+tldraw_file_cache = TldrawFileCache()
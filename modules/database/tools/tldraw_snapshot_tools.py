@@ -0,0 +1,254 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_database_tools_tldraw_snapshot_tools'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import fcntl
+import gzip
+import hashlib
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, snapshots fall back to gzip
+    zstandard = None
+
+TLDRAW_SNAPSHOT_KEEP = int(os.getenv("TLDRAW_SNAPSHOT_KEEP", 10))
+TLDRAW_SNAPSHOT_COMPRESSION = os.getenv("TLDRAW_SNAPSHOT_COMPRESSION", "gzip")
+SNAPSHOT_POINTER_NAME = 'tldraw_snapshot.json'
+SNAPSHOT_STORE_DIR_NAME = '.tldraw_snapshots'
+SNAPSHOT_LOCK_NAME = '.tldraw_snapshot.lock'
+POINTER_VERSION = 1
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+BLOB_EXTENSIONS = {'gzip': '.json.gz', 'zstd': '.json.zst'}
+
+
+def atomic_write(path, content):
+    """Write bytes to a temporary file beside path and rename it into place."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def serialise_snapshot(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+
+def compress(content, compression):
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(content)
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+def decompress(blob):
+    if blob.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("Snapshot is zstd compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    if blob.startswith(GZIP_MAGIC):
+        return gzip.decompress(blob)
+    return blob
+
+
+class TldrawSnapshotStore:
+    """Versioned tldraw files stored as compressed, content-addressed blobs.
+
+    Each snapshot is stored once under the SHA-256 of its JSON, so identical canvases,
+    such as untouched defaults, share one blob across every node. A node's directory
+    holds a small pointer file listing its last `keep` versions, newest first. Blobs
+    and pointers are written to a temporary file and renamed into place, so a reader
+    never sees a partial write, and a node's pointer only changes under its node lock,
+    which holds across worker processes. Blobs no longer listed by any pointer are left
+    in place.
+    """
+
+    def __init__(self, store_path, keep=TLDRAW_SNAPSHOT_KEEP, compression=TLDRAW_SNAPSHOT_COMPRESSION):
+        if compression not in BLOB_EXTENSIONS:
+            raise ValueError(f"Unknown snapshot compression {compression}, expected one of {tuple(BLOB_EXTENSIONS)}")
+        if compression == 'zstd' and zstandard is None:
+            logging.warning("zstandard is not installed, compressing tldraw snapshots with gzip")
+            compression = 'gzip'
+        self.store_path = store_path
+        self.keep = max(1, keep)
+        self.compression = compression
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._lock_depths = {}
+
+    @contextmanager
+    def node_lock(self, node_dir):
+        """Hold the lock under which a node's pointer changes.
+
+        Threads of a process queue on an RLock, and processes on an flock of a lock file
+        in the node directory. The lock is re-entrant within a thread, so a caller can
+        hold it across a save: the file lock is taken by the outermost holder only, since
+        a second flock from the same process would wait on the first.
+        """
+        node_dir = os.path.normpath(node_dir)
+        with self._locks_lock:
+            lock = self._locks.setdefault(node_dir, threading.RLock())
+        with lock:
+            depth = self._lock_depths.get(node_dir, 0)
+            self._lock_depths[node_dir] = depth + 1
+            try:
+                if depth:
+                    yield
+                    return
+                os.makedirs(node_dir, exist_ok=True)
+                with open(os.path.join(node_dir, SNAPSHOT_LOCK_NAME), 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+            finally:
+                if depth:
+                    self._lock_depths[node_dir] = depth
+                else:
+                    del self._lock_depths[node_dir]
+
+    def _blob_path(self, sha256, compression):
+        return os.path.join(self.store_path, sha256[:2], f"{sha256}{BLOB_EXTENSIONS[compression]}")
+
+    def find_blob(self, sha256):
+        for compression in BLOB_EXTENSIONS:
+            path = self._blob_path(sha256, compression)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put_blob(self, content):
+        """Store serialised snapshot bytes, returning their SHA-256 and whether they were already stored."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        if self.find_blob(sha256):
+            return sha256, True
+        atomic_write(self._blob_path(sha256, self.compression), compress(content, self.compression))
+        return sha256, False
+
+    def get_blob(self, sha256):
+        path = self.find_blob(sha256)
+        if path is None:
+            raise FileNotFoundError(f"Snapshot blob {sha256} not found in {self.store_path}")
+        with open(path, 'rb') as f:
+            return decompress(f.read())
+
+    def pointer_path(self, node_dir):
+        return os.path.join(node_dir, SNAPSHOT_POINTER_NAME)
+
+    def read_pointer_stat(self, node_dir):
+        """The node's pointer and the stat of the pointer file it was read from, or (None, None).
+
+        Pointers are only ever replaced, never written in place, so the stat taken from the
+        open file always describes the pointer that was read.
+        """
+        try:
+            with open(self.pointer_path(node_dir), 'rb') as f:
+                stat_result = os.fstat(f.fileno())
+                pointer = json.loads(f.read())
+        except FileNotFoundError:
+            return None, None
+        if pointer.get('version') != POINTER_VERSION or not pointer.get('history'):
+            logging.warning(f"Ignoring unreadable tldraw snapshot pointer in {node_dir}")
+            return None, None
+        return pointer, stat_result
+
+    def read_pointer(self, node_dir):
+        return self.read_pointer_stat(node_dir)[0]
+
+    def _write_pointer(self, node_dir, history):
+        pointer = {'version': POINTER_VERSION, 'current': history[0]['sha256'], 'history': history}
+        atomic_write(self.pointer_path(node_dir), json.dumps(pointer).encode())
+
+    def _push(self, node_dir, sha256, size):
+        """Make a blob the node's current version, returning the pointer entry."""
+        pointer = self.read_pointer(node_dir)
+        history = pointer['history'] if pointer else []
+        if history and history[0]['sha256'] == sha256:
+            return history[0]
+        entry = {'sha256': sha256, 'size': size, 'saved': datetime.now(timezone.utc).isoformat()}
+        self._write_pointer(node_dir, [entry] + history[:self.keep - 1])
+        return entry
+
+    def save(self, node_dir, data):
+        """Save a node's tldraw document as its current version, returning the version entry."""
+        return self.save_serialised(node_dir, serialise_snapshot(data))
+
+    def save_serialised(self, node_dir, content):
+        """Save a document already serialised with serialise_snapshot."""
+        sha256, deduplicated = self.put_blob(content)
+        with self.node_lock(node_dir):
+            entry = self._push(node_dir, sha256, len(content))
+        logging.debug(f"Saved tldraw snapshot {sha256} for {node_dir} ({len(content)} bytes, deduplicated: {deduplicated})")
+        return {**entry, 'deduplicated': deduplicated}
+
+    def current(self, node_dir):
+        """The SHA-256 of the node's current version, or None if it has no snapshots."""
+        pointer = self.read_pointer(node_dir)
+        return pointer['current'] if pointer else None
+
+    def load(self, node_dir, sha256=None):
+        """The node's current document, or the given version of it; None if it has no snapshots."""
+        pointer = self.read_pointer(node_dir)
+        if pointer is None:
+            return None
+        if sha256 is not None and sha256 not in {entry['sha256'] for entry in pointer['history']}:
+            raise KeyError(f"Version {sha256} is not kept for {node_dir}")
+        return json.loads(self.get_blob(sha256 or pointer['current']))
+
+    def versions(self, node_dir):
+        pointer = self.read_pointer(node_dir)
+        return pointer['history'] if pointer else []
+
+    def rollback(self, node_dir, sha256=None):
+        """Make an earlier version current again, by default the one before the current version.
+
+        The rollback is recorded as a new version, so it can itself be rolled back.
+        """
+        with self.node_lock(node_dir):
+            history = self.versions(node_dir)
+            if sha256 is None:
+                if len(history) < 2:
+                    raise KeyError(f"No earlier version kept for {node_dir}")
+                target = history[1]
+            else:
+                target = next((entry for entry in history if entry['sha256'] == sha256), None)
+                if target is None:
+                    raise KeyError(f"Version {sha256} is not kept for {node_dir}")
+            if self.find_blob(target['sha256']) is None:
+                raise FileNotFoundError(f"Snapshot blob {target['sha256']} not found in {self.store_path}")
+            entry = self._push(node_dir, target['sha256'], target['size'])
+        logging.info(f"Rolled back tldraw file for {node_dir} to {target['sha256']}")
+        return entry
+
+
+_snapshot_stores = {}
+_snapshot_stores_lock = threading.Lock()
+
+def get_tldraw_snapshot_store(base_path):
+    """The snapshot store under a filesystem base path, shared by every filesystem handler in the process."""
+    with _snapshot_stores_lock:
+        if base_path not in _snapshot_stores:
+            _snapshot_stores[base_path] = TldrawSnapshotStore(os.path.join(base_path, SNAPSHOT_STORE_DIR_NAME))
+        return _snapshot_stores[base_path]
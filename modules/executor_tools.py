@@ -0,0 +1,127 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_modules_executor_tools'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+IO_EXECUTOR_MAX_WORKERS = int(os.getenv("IO_EXECUTOR_MAX_WORKERS", 32))
+CPU_EXECUTOR_MAX_WORKERS = int(os.getenv("CPU_EXECUTOR_MAX_WORKERS", os.cpu_count() or 1))
+# Forking a process that holds driver pools, executor threads and locks can deadlock the child
+CPU_EXECUTOR_START_METHOD = os.getenv("CPU_EXECUTOR_START_METHOD", "spawn")
+
+
+class InstrumentedExecutor:
+    """A lazily created executor which counts the work submitted to it.
+
+    Work beyond max_workers waits in the executor's queue, so the number of calls in
+    flight less the pool size is the queue depth.
+    """
+
+    def __init__(self, name, executor_class, max_workers):
+        if max_workers < 1:
+            raise ValueError(f"{name} executor needs at least one worker, got {max_workers}")
+        self.name = name
+        self.executor_class = executor_class
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_queued = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                logging.info(f"Starting {self.name} executor with {self.max_workers} workers")
+                if self.executor_class is ThreadPoolExecutor:
+                    kwargs = {'thread_name_prefix': self.name}
+                else:
+                    kwargs = {'mp_context': multiprocessing.get_context(CPU_EXECUTOR_START_METHOD)}
+                self._executor = self.executor_class(max_workers=self.max_workers, **kwargs)
+            return self._executor
+
+    def _done(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def run(self, func, *args, **kwargs):
+        """Run func in the pool and await its result without blocking the event loop."""
+        executor = self._get_executor()
+        future = executor.submit(func, *args, **kwargs)
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_queued = max(self.max_queued, self.in_flight - self.max_workers)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'started': self._executor is not None,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'running': min(self.in_flight, self.max_workers),
+                'queued': max(self.in_flight - self.max_workers, 0),
+                'max_queued': self.max_queued,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            logging.info(f"Stopping {self.name} executor")
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Blocking I/O: the sync Neo4j driver, HTTP clients and file reads and writes
+io_executor = InstrumentedExecutor('io', ThreadPoolExecutor, IO_EXECUTOR_MAX_WORKERS)
+# CPU bound parsing; functions and arguments sent here must be picklable
+cpu_executor = InstrumentedExecutor('cpu', ProcessPoolExecutor, CPU_EXECUTOR_MAX_WORKERS)
+
+
+async def run_io(func, *args, **kwargs):
+    return await io_executor.run(func, *args, **kwargs)
+
+async def run_cpu(func, *args, **kwargs):
+    return await cpu_executor.run(func, *args, **kwargs)
+
+def offload_io(func):
+    """Decorate a blocking route handler so it runs in the I/O pool.
+
+    The handler is written as a plain def and the decorator turns it into a coroutine,
+    keeping its signature so FastAPI still resolves its parameters and dependencies.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await io_executor.run(func, *args, **kwargs)
+    return wrapper
+
+def executor_metrics():
+    return {executor.name: executor.metrics() for executor in (io_executor, cpu_executor)}
+
+def shutdown_executors():
+    for executor in (io_executor, cpu_executor):
+        executor.shutdown()
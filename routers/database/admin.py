@@ -19,7 +19,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from neo4j import GraphDatabase
 from pydantic import BaseModel
 from run.dependencies import admin_dependency
-import time
+from modules.executor_tools import offload_io, run_io
+import asyncio
 
 router = APIRouter()
 
@@ -28,35 +29,40 @@ class DatabaseRequest(BaseModel):
 
 @router.get("/check-database-availability")
 async def check_database_availability_endpoint(db_name: str, retries: int = 5, delay: int = 3):
-    driver = driver_tools.get_driver()
-    if driver is None:
+    # Polled until a database is ready, so it borrows the shared pooled driver rather than opening one per call
+    if await run_io(driver_tools.get_global_driver) is None:
         raise HTTPException(status_code=503, detail="Unable to establish connection with Neo4j")
 
     check_query = f"SHOW DATABASES WHERE name='{db_name}'"
+
+    def fetch_database_status():
+        with driver_tools.get_session(database="system") as session:
+            return session.run(check_query).data()
+
     for _ in range(retries):
         try:
             logging.info(f"Checking availability for database {db_name}")
-            with driver.session(database="system") as session:
-                result = session.run(check_query)
-                records = result.data()
-                if records and records[0].get("currentStatus") == "online":
-                    return {"status": "ready"}
-                else:
-                    logging.error(f"Database {db_name} is not online: {records}")
+            records = await run_io(fetch_database_status)
+            if records and records[0].get("currentStatus") == "online":
+                return {"status": "ready"}
+            else:
+                logging.error(f"Database {db_name} is not online: {records}")
         except Exception as e:
             logging.error(f"Error checking database availability for {db_name}: {e}")
-            time.sleep(delay)
+            await asyncio.sleep(delay)
     raise HTTPException(status_code=503, detail="Database not available after retries")
 
 @router.post("/create-database")
-async def create_database(db_name: str):
+@offload_io
+def create_database(db_name: str):
     logging.info(f"Creating database: {db_name}")
     generated_query = query.create_database(db_name)
     logging.info(f"Generated query: {generated_query}")
     return http.send_query(generated_query, encoded_credentials=None, params=None, method="POST", database="system", endpoint="/tx/commit")
 
 @router.post("/stop-database")
-async def stop_database(request: DatabaseRequest):
+@offload_io
+def stop_database(request: DatabaseRequest):
     db_name = request.db_name
     logging.info(f"Stopping database: {db_name}")
     generated_query = query.stop_database(db_name)
@@ -64,7 +70,8 @@ async def stop_database(request: DatabaseRequest):
     return http.send_query(generated_query, encoded_credentials=None, params=None, method="POST", database="system", endpoint="/tx/commit")
 
 @router.post("/drop-database")
-async def drop_database(request: DatabaseRequest):
+@offload_io
+def drop_database(request: DatabaseRequest):
     db_name = request.db_name
     logging.info(f"Dropping database: {db_name}")
     generated_query = query.drop_database(db_name)
@@ -72,7 +79,8 @@ async def drop_database(request: DatabaseRequest):
     return http.send_query(generated_query, encoded_credentials=None, params=None, method="POST", database="system", endpoint="/tx/commit")
 
 @router.post("/reset-database")
-async def reset_database(db_name: str):
+@offload_io
+def reset_database(db_name: str):
     logging.info(f"Resetting database: {db_name}")
     generated_query = query.reset_database(db_name)
     logging.info(f"Generated query: {generated_query}")
@@ -21,12 +21,16 @@ from fastapi import HTTPException
 router = APIRouter()
 
 @router.post("/create-calendar")
-async def create_calendar(db_name: str, start_date: date, end_date: date, attach_to_calendar_node: bool = False, entity_node: BaseNode = None):
+async def create_calendar(db_name: str, start_date: date, end_date: date, attach_to_calendar_node: bool = False, entity_node: BaseNode = None, engine: str = None):
     try:
         logging.info(f"Creating calendar for {db_name} from {start_date} to {end_date}")
         if entity_node is None:
             logging.info("No user entity node provided, proceeding without attaching to user entity.")
-        return init_calendar.create_calendar(db_name, start_date, end_date, attach_to_calendar_node, entity_node)
+        return init_calendar.create_calendar(db_name, start_date, end_date, attach_to_calendar_node, entity_node, engine=engine)
     except Exception as e:
         logging.error(f"Error processing request: {e}")
-        raise HTTPException(status_code=422, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.get("/calendar-template-cache")
+async def calendar_template_cache():
+    return init_calendar.calendar_template_cache_info()
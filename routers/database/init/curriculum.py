@@ -13,9 +13,14 @@ logging = logger.get_logger(
     log_format='default'
 )
 import modules.database.init.xl_tools as xl
+import modules.database.init.xl_ingest as xl_ingest
+import modules.database.init.xl_validation as xl_validation
 import modules.database.init.init_curriculum as init_curriculum
+import modules.database.init.init_job_handlers  # registers the init job handlers
+from modules.database.init.init_jobs import job_runner
 from modules.database.schemas.entity_neo import SchoolNode
-from fastapi import APIRouter, File, UploadFile, Form
+from modules.executor_tools import run_io
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException
 
 router = APIRouter()
 
@@ -24,8 +29,8 @@ async def upload_curriculum(file: UploadFile = File(...), db_name: str = Form(..
     if file.content_type != 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
         return {"status": "Error", "message": "Invalid file format"}
     logging.info(f"Uploading curriculum for {db_name}")
-    dataframes = xl.create_dataframes_from_fastapiuploadfile(file)
-    return init_curriculum.create_curriculum(db_name, dataframes)
+    dataframes = await xl.create_dataframes_from_upload(file)
+    return await run_io(init_curriculum.create_curriculum, db_name, dataframes)
 
 @router.post("/upload-school-curriculum")
 async def upload_school_curriculum(
@@ -34,12 +39,16 @@ async def upload_school_curriculum(
     school_uuid: str = Form(...),
     school_name: str = Form(...),
     school_website: str = Form(...),
-    school_path: str = Form(...)
+    school_path: str = Form(...),
+    curriculum_db_name: str = Form(None),
+    incremental: bool = Form(False),
+    prune: bool = Form(False),
+    background: bool = Form(False),
+    dry_run: bool = Form(False)
 ):
     if file.content_type != 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet':
         return {"status": "Error", "message": "Invalid file format"}
     logging.info(f"Uploading curriculum for school {school_name} in {db_name}")
-    dataframes = xl.create_dataframes_from_fastapiuploadfile(file)
     school_node = SchoolNode(
         unique_id=f'School_{school_uuid}',
         school_uuid=school_uuid,
@@ -47,4 +56,47 @@ async def upload_school_curriculum(
         school_website=school_website,
         path=school_path
     )
-    return init_curriculum.create_curriculum(db_name, dataframes, school_node)
\ No newline at end of file
+    try:
+        dataframes = await xl_ingest.ingest_upload(file, xl_ingest.CURRICULUM_SHEETS)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Check the whole workbook before anything is written
+    report = await run_io(xl_validation.validate_curriculum, dataframes)
+    if not report['valid']:
+        raise HTTPException(status_code=422, detail=report)
+    if dry_run:
+        # Planning writes nothing and is quick, so it is never queued
+        node_library = await run_io(
+            init_curriculum.create_curriculum,
+            dataframes=dataframes,
+            db_name=db_name,
+            curriculum_db_name=curriculum_db_name or f"{db_name}.curriculum",
+            school_node=school_node,
+            incremental=incremental,
+            prune=prune,
+            dry_run=True
+        )
+        return {"status": "Planned", "dry_run": node_library['dry_run'], "import_summary": node_library['import_summary']}
+    if background:
+        await file.seek(0)
+        job_id = job_runner.submit(
+            'school_curriculum',
+            {
+                'db_name': db_name,
+                'curriculum_db_name': curriculum_db_name or f"{db_name}.curriculum",
+                'school_node': school_node.model_dump(mode='json'),
+                'incremental': incremental,
+                'prune': prune
+            },
+            upload_content=await file.read()
+        )
+        return {"status": "Accepted", "message": "Processing of school curriculum started", "job_id": job_id}
+    return await run_io(
+        init_curriculum.create_curriculum,
+        dataframes=dataframes,
+        db_name=db_name,
+        curriculum_db_name=curriculum_db_name or f"{db_name}.curriculum",
+        school_node=school_node,
+        incremental=incremental,
+        prune=prune
+    )
\ No newline at end of file
@@ -13,6 +13,7 @@ logging = logger.get_logger(
     log_format='default'
 )
 import modules.database.init.xl_tools as xl
+from modules.executor_tools import run_cpu
 from fastapi import APIRouter, File, UploadFile
 
 router = APIRouter()
@@ -23,6 +24,6 @@ async def get_dataframes_from_xl(file: UploadFile = File(...)):
         return {"status": "Error", "message": "Invalid file format"}
     try:
         logging.info(f"Getting dataframes from {file.filename}")
-        return xl.create_dataframes(await file.read())
+        return await run_cpu(xl.create_dataframes, await file.read())
     except Exception as e:
         return {"status": "Error", "message": str(e)}
\ No newline at end of file
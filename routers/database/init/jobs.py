@@ -0,0 +1,42 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_routers_database_init_jobs'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+from fastapi import APIRouter, HTTPException
+from modules.database.init.init_jobs import job_runner, JOB_STATUSES
+
+router = APIRouter()
+
+@router.get("")
+async def list_jobs(status: str = None, limit: int = 50):
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=422, detail=f"Invalid status, expected one of {JOB_STATUSES}")
+    return {"status": "success", "jobs": job_runner.list(status=status, limit=limit)}
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.post("/{job_id}/resume")
+async def resume_job(job_id: str):
+    try:
+        job_runner.resume(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logging.info(f"Resumed job {job_id}")
+    return {"status": "Accepted", "job_id": job_id}
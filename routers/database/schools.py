@@ -1,99 +1,81 @@
-from fastapi import APIRouter, Depends, File, UploadFile
-from backend.app.run.dependencies import admin_dependency
-from pydantic import BaseModel
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import modules.logger_tool as logger
+log_name = 'api_routers_database_schools'
+log_dir = os.getenv("LOG_PATH", "/logs")  # Default path as fallback
+logging = logger.get_logger(
+    name=log_name,
+    log_level=os.getenv("LOG_LEVEL", "DEBUG"),
+    log_path=log_dir,
+    log_file=log_name,
+    runtime=True,
+    log_format='default'
+)
+from io import BytesIO
+import pandas as pd
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+import modules.database.init.init_gias as init_gias
+import modules.database.init.xl_ingest as xl_ingest
+import modules.database.init.init_job_handlers  # registers the init job handlers
+from modules.database.init.init_jobs import job_runner
+from modules.executor_tools import run_io
+from run.dependencies import admin_dependency
 
 router = APIRouter()
 
-class NodeBase(BaseModel):
-    Name: str
-
-class LocalAuthority(NodeBase):
-    pass
-
-class SchoolNode(NodeBase):
-    Type: str
-    Status: str
-
-class ParliamentaryConstituency(NodeBase):
-    pass
-
-class AdministrativeWard(NodeBase):
-    pass
-
-class RelationshipBase(BaseModel):
-    start_node: NodeBase
-    end_node: NodeBase
-    relationship_type: str
-
-class HasParliamentaryConstituency(RelationshipBase):
-    pass
-
-class HasAdministrativeWard(RelationshipBase):
-    pass
-
-class HasSchool(RelationshipBase):
-    pass
-
 @router.post("/batch-create-schools")
-async def add_school_to_global(file: UploadFile = File(...)):
-    if file is None:
-        return {"status": "Error", "message": "No file received"}
+async def batch_create_schools(
+    file: UploadFile = File(...),
+    db_name: str = Form(init_gias.GIAS_DB_NAME),
+    incremental: bool = Form(True),
+    prune: bool = Form(False),
+    background: bool = Form(False),
+    admin: bool = Depends(admin_dependency)
+):
+    """Import the GIAS establishment register CSV as LA -> constituency -> ward -> school."""
+    if not file.filename or not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=422, detail="Expected a GIAS establishment CSV")
+    logging.info(f"Importing GIAS register {file.filename} into {db_name}")
+    if background:
+        job_id = job_runner.submit(
+            'gias_register',
+            {'db_name': db_name, 'incremental': incremental, 'prune': prune},
+            upload_content=await file.read(),
+            upload_suffix='.csv'
+        )
+        return {"status": "Accepted", "message": "Import of the GIAS register started", "job_id": job_id}
 
+    path, _ = await run_io(xl_ingest.spool_upload, file, suffix='.csv')
     try:
-        import pandas as pd
-        from io import BytesIO
-        from app.modules.driver_tools import create_node_http, create_relationship_http
-        data = pd.read_csv(BytesIO(await file.read()), usecols=["LA (name)", "ParliamentaryConstituency (name)", "AdministrativeWard (name)", "EstablishmentName", "TypeOfEstablishment (name)", "EstablishmentStatus (name)"])
-        unique_las = data["LA (name)"].unique()
-        for la_name in unique_las:
-            la_node = {"Name": la_name}
-            la_id = create_node_http("LocalAuthority", la_node, db="GlobalSchools")
-            constituencies = data[data["LA (name)"] == la_name]["ParliamentaryConstituency (name)"].unique()
-            for constituency in constituencies:
-                constituency_node = {"Name": constituency}
-                constituency_id = create_node_http("ParliamentaryConstituency", constituency_node, db="GlobalSchools")
-                create_relationship_http({"start_node": {"id": la_id}, "end_node": {"id": constituency_id}, "relationship_type": "HAS_PARLIAMENTARY_CONSTITUENCY"}, db="GlobalSchools")
-                wards = data[(data["LA (name)"] == la_name) & (data["ParliamentaryConstituency (name)"] == constituency)]["AdministrativeWard (name)"].unique()
-                for ward in wards:
-                    ward_node = {"Name": ward}
-                    ward_id = create_node_http("AdministrativeWard", ward_node, db="GlobalSchools")
-                    create_relationship_http({"start_node": {"id": constituency_id}, "end_node": {"id": ward_id}, "relationship_type": "HAS_ADMINISTRATIVE_WARD"}, db="GlobalSchools")
-                    schools = data[(data["LA (name)"] == la_name) & (data["ParliamentaryConstituency (name)"] == constituency) & (data["AdministrativeWard (name)"] == ward)]
-                    for index, school in schools.iterrows():
-                        school_node = {
-                            "Name": school["EstablishmentName"],
-                            "Type": school["TypeOfEstablishment (name)"],
-                            "Status": school["EstablishmentStatus (name)"]
-                        }
-                        school_id = create_node_http("School", school_node, db="GlobalSchools")
-                        create_relationship_http({"start_node": {"id": ward_id}, "end_node": {"id": school_id}, "relationship_type": "HAS_SCHOOL"}, db="GlobalSchools")
-        return {"status": "Success", "message": "Graph structure updated successfully"}
-    except Exception as e:
-        print("Failed to process file:", e)
-        return {"status": "Error", "message": "Failed to process file"}
+        summary = await run_io(init_gias.import_gias_register, path, db_name=db_name, incremental=incremental, prune=prune)
+    except ValueError as e:
+        # Raised by the CSV reader for missing register columns
+        raise HTTPException(status_code=422, detail=str(e))
+    finally:
+        await run_io(os.remove, path)
+    return {"status": "Success", "message": "Graph structure updated successfully", "summary": summary}
 
 @router.post("/create-school")
-async def add_school_to_global(file: UploadFile = File(...)):
-    if file is None:
-        return {"status": "Error", "message": "No file received"}
-
+async def create_global_school(
+    file: UploadFile = File(...),
+    db_name: str = Form(init_gias.GIAS_DB_NAME),
+    admin: bool = Depends(admin_dependency)
+):
     try:
-        import pandas as pd
-        from io import BytesIO
         data = pd.read_excel(BytesIO(await file.read()), usecols=[0], nrows=5).squeeze()
-        print("Data read from file:", data)
-        if len(data) < 5:
-            return {"status": "Error", "message": "Insufficient data in file"}
-        school_data = {
-            "name": data[0],
-            "address": data[1],
-            "ofsted_number": data[2],
-            "website": data[3],
-            "geo_location": data[4]
-        }
-        from app.modules.driver_tools import create_node_http
-        response = create_node_http("globalschools", "School", school_data)
-        return {"status": "School added to global school db via HTTP", "school_data": school_data, "response": response}
     except Exception as e:
-        print("Failed to process file:", e)
+        logging.error(f"Failed to process file: {e}")
         return {"status": "Error", "message": "Failed to process file"}
+    logging.debug(f"Data read from file: {data}")
+    if len(data) < 5:
+        return {"status": "Error", "message": "Insufficient data in file"}
+    school_data = {
+        "name": data[0],
+        "address": data[1],
+        "ofsted_number": data[2],
+        "website": data[3],
+        "geo_location": data[4]
+    }
+    await run_io(init_gias.merge_school, school_data, db_name)
+    return {"status": "School added to global school db", "school_data": school_data}
@@ -55,12 +55,8 @@ async def get_teacher_timetable_events(
     worker_db_name: str
 ):
     logging.info(f"Getting timetable events for teacher {unique_id} from database {worker_db_name}")
-    neo_driver = driver.get_driver(db_name=worker_db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=worker_db_name) as neo_session:
+        with driver.get_session(database=worker_db_name) as neo_session:
             query = """
             MATCH (t:Teacher {unique_id: $unique_id})-[:TEACHER_HAS_TIMETABLE]->(tt:TeacherTimetable)
             -[:TIMETABLE_HAS_CLASS]->(sc:SubjectClass)-[:CLASS_HAS_LESSON]->(tl:TimetableLesson)
@@ -97,5 +93,3 @@ async def get_teacher_timetable_events(
     except Exception as e:
         logging.error(f"Error fetching events: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
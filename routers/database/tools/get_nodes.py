@@ -18,72 +18,65 @@ from modules.database.schemas.calendar_neo import CalendarNode
 from modules.database.schemas.timetable_neo import SchoolTimetableNode, AcademicYearNode, AcademicTermNode, AcademicWeekNode, AcademicDayNode, AcademicPeriodNode, RegistrationPeriodNode
 from modules.database.schemas.entity_neo import UserNode, StandardUserNode, DeveloperNode, SchoolAdminNode, SchoolNode, DepartmentNode, TeacherNode, StudentNode, SubjectClassNode, RoomNode
 from modules.database.schemas.teacher_timetable_neo import TeacherTimetableNode, TimetableLessonNode, PlannedLessonNode, UserTeacherTimetableNode
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from modules.executor_tools import offload_io
 
 router = APIRouter()
 
 @router.get("/get-node")
-async def get_node(unique_id: str = Query(...), db_name: str = Query(...)):
+@offload_io
+def get_node(unique_id: str = Query(...), db_name: str = Query(...), neo_session=Depends(driver.get_db_session)):
     logging.info(f"Getting node for {unique_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
     try:
-        with neo_driver.session(database=db_name) as neo_session:
-            query = """
-            MATCH (n {unique_id: $unique_id})
-            RETURN n
-            """
-            result = neo_session.run(query, unique_id=unique_id)
-            record = result.single()
+        query = """
+        MATCH (n {unique_id: $unique_id})
+        RETURN n
+        """
+        result = neo_session.run(query, unique_id=unique_id)
+        record = result.single()
+        
+        if record:
+            node = record['n']
+            node_labels = list(node.labels)
+            node_data = dict(node)
             
-            if record:
-                node = record['n']
-                node_labels = list(node.labels)
-                node_data = dict(node)
+            try:
+                # Convert node based on its type
+                node_type = node_labels[0] if node_labels else "Unknown"
+                if node_type in globals():
+                    node_class = globals()[f"{node_type}Node"]
+                    node_object = node_class(**node_data)
+                    node_dict = node_object.to_dict()
+                else:
+                    node_dict = node_data
                 
-                try:
-                    # Convert node based on its type
-                    node_type = node_labels[0] if node_labels else "Unknown"
-                    if node_type in globals():
-                        node_class = globals()[f"{node_type}Node"]
-                        node_object = node_class(**node_data)
-                        node_dict = node_object.to_dict()
-                    else:
-                        node_dict = node_data
-                    
-                    return {
-                        "status": "success",
-                        "node": {
-                            "node_type": node_type,
-                            "node_data": node_dict
-                        }
-                    }
-                except Exception as e:
-                    logging.error(f"Error converting node to dict: {str(e)}")
-                    return {
-                        "status": "error",
-                        "message": "Error processing node data",
-                        "details": str(e)
+                return {
+                    "status": "success",
+                    "node": {
+                        "node_type": node_type,
+                        "node_data": node_dict
                     }
-            else:
-                return {"status": "not_found", "message": "Node not found"}
+                }
+            except Exception as e:
+                logging.error(f"Error converting node to dict: {str(e)}")
+                return {
+                    "status": "error",
+                    "message": "Error processing node data",
+                    "details": str(e)
+                }
+        else:
+            return {"status": "not_found", "message": "Node not found"}
     except Exception as e:
         logging.error(f"Error retrieving node: {str(e)}")
         return {"status": "error", "message": "Internal server error"}
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-user-node")
-async def get_user_node(user_id: str = Query(...)):
+@offload_io
+def get_user_node(user_id: str = Query(...)):
     db_name = f"cc.ccusers.{user_id}"
     logging.info(f"Getting user node for user {user_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             nodes = session.find_nodes_by_label_and_properties(neo_session, "User", {"user_id": user_id})
             if nodes:
                 user_node = nodes[0]
@@ -95,88 +88,78 @@ async def get_user_node(user_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving user node: {str(e)}")
         return {"status": "error", "message": "Internal server error"}
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-connected-nodes")
-async def get_connected_nodes(unique_id: str = Query(...), db_name: str = Query(...)):
+@offload_io
+def get_connected_nodes(unique_id: str = Query(...), db_name: str = Query(...), neo_session=Depends(driver.get_db_session)):
     logging.info(f"Getting connected nodes for {unique_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
-            query = """
-            MATCH (n {unique_id: $unique_id})
-            OPTIONAL MATCH (n)-[]-(connected)
-            RETURN n, collect(connected) as connected_nodes
-            """
-            result = neo_session.run(query, unique_id=unique_id)
-            record = result.single()
-            if record:
-                main_node = record['n']
-                connected_nodes = record['connected_nodes']
-                
-                main_node_labels = list(main_node.labels)
-                main_node_type = main_node_labels[0] if main_node_labels else "Unknown"
-                main_node_data = dict(main_node)
-                
+        query = """
+        MATCH (n {unique_id: $unique_id})
+        OPTIONAL MATCH (n)-[]-(connected)
+        RETURN n, collect(connected) as connected_nodes
+        """
+        result = neo_session.run(query, unique_id=unique_id)
+        record = result.single()
+        if record:
+            main_node = record['n']
+            connected_nodes = record['connected_nodes']
+            
+            main_node_labels = list(main_node.labels)
+            main_node_type = main_node_labels[0] if main_node_labels else "Unknown"
+            main_node_data = dict(main_node)
+            
+            try:
+                main_node_class = globals()[f"{main_node_type}Node"]
+                main_node_object = main_node_class(**main_node_data)
+                main_node_dict = main_node_object.to_dict()
+            except Exception as e:
+                logging.error(f"Error converting main node to dict: {str(e)}")
+                main_node_dict = main_node_data
+            
+            connected_nodes_list = []
+            
+            for node in connected_nodes:
+                node_labels = list(node.labels)
+                node_type = node_labels[0] if node_labels else "Unknown"
+                node_data = dict(node)
                 try:
-                    main_node_class = globals()[f"{main_node_type}Node"]
-                    main_node_object = main_node_class(**main_node_data)
-                    main_node_dict = main_node_object.to_dict()
+                    node_class = globals()[f"{node_type}Node"]
+                    node_object = node_class(**node_data)
+                    connected_node_dict = node_object.to_dict()
                 except Exception as e:
-                    logging.error(f"Error converting main node to dict: {str(e)}")
-                    main_node_dict = main_node_data
-                
-                connected_nodes_list = []
-                
-                for node in connected_nodes:
-                    node_labels = list(node.labels)
-                    node_type = node_labels[0] if node_labels else "Unknown"
-                    node_data = dict(node)
-                    try:
-                        node_class = globals()[f"{node_type}Node"]
-                        node_object = node_class(**node_data)
-                        connected_node_dict = node_object.to_dict()
-                    except Exception as e:
-                        logging.error(f"Error converting connected node to dict: {str(e)}")
-                        connected_node_dict = node_data
-                    
-                    connected_node_info = {
-                        "node_type": node_type,
-                        "node_data": connected_node_dict
-                    }
-                    connected_nodes_list.append(connected_node_info)
-                
-                logging.debug(f"connected_nodes_list: {connected_nodes_list}")
+                    logging.error(f"Error converting connected node to dict: {str(e)}")
+                    connected_node_dict = node_data
                 
-                return {
-                    "status": "success",
-                    "main_node": {
-                        "node_type": main_node_type,
-                        "node_data": main_node_dict
-                    },
-                    "connected_nodes": connected_nodes_list
+                connected_node_info = {
+                    "node_type": node_type,
+                    "node_data": connected_node_dict
                 }
-            else:
-                return {"status": "not_found", "message": "Node not found"}
+                connected_nodes_list.append(connected_node_info)
+            
+            logging.debug(f"connected_nodes_list: {connected_nodes_list}")
+            
+            return {
+                "status": "success",
+                "main_node": {
+                    "node_type": main_node_type,
+                    "node_data": main_node_dict
+                },
+                "connected_nodes": connected_nodes_list
+            }
+        else:
+            return {"status": "not_found", "message": "Node not found"}
     except Exception as e:
         logging.error(f"Error retrieving connected nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-user-connected-nodes")
-async def get_user_connected_nodes(unique_id: str = Query(...)):
+@offload_io
+def get_user_connected_nodes(unique_id: str = Query(...)):
     logging.info(f"Getting user adjacent nodes for node {unique_id}")
     db_name = os.getenv("NEO4J_DB_NAME", "cc.ccschools.kevlarai") # TODO: This function needs to be able to take a db_name as a parameter
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             user_node_and_connected_nodes = session.get_node_by_unique_id_and_adjacent_nodes(neo_session, unique_id)
             user_node = user_node_and_connected_nodes['node']
             connected_nodes = user_node_and_connected_nodes['connected_nodes']
@@ -248,18 +231,14 @@ async def get_user_connected_nodes(unique_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving adjacent nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-worker-connected-nodes")
-async def get_worker_connected_nodes(unique_id: str = Query(...)):
+@offload_io
+def get_worker_connected_nodes(unique_id: str = Query(...)):
     logging.info(f"Getting worker adjacent nodes for node {unique_id}")
     db_name = os.getenv("NEO4J_DB_NAME", "cc.ccschools.kevlarai") # TODO: This function needs to be able to take a db_name as a parameter
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             node_and_connected_nodes = session.get_node_by_unique_id_and_adjacent_nodes(neo_session, unique_id)
             worker_node = node_and_connected_nodes['node']
             connected_nodes = node_and_connected_nodes['connected_nodes']
@@ -316,19 +295,14 @@ async def get_worker_connected_nodes(unique_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving worker adjacent nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-calendar-connected-nodes")
-async def get_calendar_connected_nodes(unique_id: str = Query(...)):
+@offload_io
+def get_calendar_connected_nodes(unique_id: str = Query(...)):
     db_name = os.getenv("NEO4J_DB_NAME", "cc.ccschools.kevlarai")
     logging.info(f"Getting connected nodes for calendar {unique_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             query = """
             MATCH (n)
             WHERE n.unique_id = $unique_id AND (n:Calendar OR n:CalendarYear OR n:CalendarMonth OR n:CalendarWeek OR n:CalendarDay OR n:CalendarTimeChunk)
@@ -366,19 +340,14 @@ async def get_calendar_connected_nodes(unique_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving connected nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
     
 @router.get("/get-teacher-timetable-connected-nodes")
-async def get_teacher_timetable_connected_nodes(unique_id: str = Query(...)):
+@offload_io
+def get_teacher_timetable_connected_nodes(unique_id: str = Query(...)):
     db_name = os.getenv("NEO4J_DB_NAME", "cc.ccschools.kevlarai")
     logging.info(f"Getting connected nodes for teacher timetable {unique_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             query = """
             MATCH (n:TeacherTimetable {unique_id: $unique_id})
             OPTIONAL MATCH (n)-[]-(connected)
@@ -419,19 +388,14 @@ async def get_teacher_timetable_connected_nodes(unique_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving connected nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-school-timetable-connected-nodes")
-async def get_school_timetable_connected_nodes(unique_id: str = Query(...)):
+@offload_io
+def get_school_timetable_connected_nodes(unique_id: str = Query(...)):
     db_name = os.getenv("NEO4J_DB_NAME", "cc.ccschools.kevlarai")
     logging.info(f"Getting connected nodes for school timetable {unique_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             query = """
             MATCH (n:SchoolTimetable {unique_id: $unique_id})
             OPTIONAL MATCH (n)-[]-(connected)
@@ -480,19 +444,14 @@ async def get_school_timetable_connected_nodes(unique_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving connected nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-curriculum-connected-nodes")
-async def get_curriculum_connected_nodes(unique_id: str = Query(...)):
+@offload_io
+def get_curriculum_connected_nodes(unique_id: str = Query(...)):
     db_name = os.getenv("NEO4J_DB_NAME", "cc.ccschools.kevlarai")
     logging.info(f"Getting connected nodes for curriculum {unique_id} from database {db_name}")
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             query = """
             MATCH (n)
             WHERE n.unique_id = $unique_id AND (n:PastoralStructure OR n:YearGroup OR n:CurriculumStructure OR n:KeyStage OR n:KeyStageSyllabus OR n:YearGroupSyllabus OR n:Subject OR n:Topic OR n:TopicLesson OR n:LearningStatement OR n:ScienceLab)
@@ -530,19 +489,14 @@ async def get_curriculum_connected_nodes(unique_id: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving connected nodes: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        driver.close_driver(neo_driver)
 
 @router.get("/get-school-node")
-async def get_school_node(school_uuid: str = Query(...)):
+@offload_io
+def get_school_node(school_uuid: str = Query(...)):
     logging.info(f"Getting school node for school {school_uuid}...")
     db_name = f"cc.ccschools.{school_uuid}"
-    neo_driver = driver.get_driver(db_name=db_name)
-    if neo_driver is None:
-        return {"status": "error", "message": "Failed to connect to the database"}
-    
     try:
-        with neo_driver.session(database=db_name) as neo_session:
+        with driver.get_session(database=db_name) as neo_session:
             nodes = session.find_nodes_by_label_and_properties(neo_session, "School", {"school_uuid": school_uuid})
             if nodes:
                 school_node = nodes[0]
@@ -560,5 +514,3 @@ async def get_school_node(school_uuid: str = Query(...)):
     except Exception as e:
         logging.error(f"Error retrieving school node: {str(e)}")
         return {"status": "error", "message": "Internal server error"}
-    finally:
-        driver.close_driver(neo_driver)
\ No newline at end of file
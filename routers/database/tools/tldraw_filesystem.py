@@ -12,19 +12,72 @@ logging = logger.get_logger(
     runtime=True,
     log_format='default'
 )
-from fastapi import APIRouter, HTTPException, Query
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Query, Header, Response
+from fastapi.responses import JSONResponse
+from typing import Dict, Optional
 import json
 from fastapi.middleware.cors import CORSMiddleware
 
-from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem
+from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem, TldrawFileConflict, TLDRAW_FILE_NAME, etag_matches
 from modules.database.schemas.entity_neo import UserNode
 from modules.database.tools.neo4j_db_formatter import format_user_email_for_neo_db
+from modules.executor_tools import offload_io
 
 router = APIRouter()
 
+def node_file_location(fs, path, prod_base_path, dev_mode=None, missing_path_detail="Path not provided"):
+    """The location of a node's tldraw file, which the ETag, cache and lock are all keyed on.
+
+    In dev mode the file is under the node's own path, otherwise under prod_base_path.
+    dev_mode defaults to the DEV_MODE environment variable.
+    """
+    if dev_mode is None:
+        dev_mode = os.getenv("DEV_MODE") == "true"
+    if dev_mode:
+        if not path:
+            raise HTTPException(status_code=400, detail=missing_path_detail)
+        logging.debug(f"Using DEV_MODE path: {path}")
+        base_path = os.path.normpath(path)
+    else:
+        logging.warning(f"Using db_name as base path not ready in prod: {prod_base_path}")
+        base_path = prod_base_path
+    file_location = os.path.normpath(os.path.join(fs.root_path, base_path, TLDRAW_FILE_NAME))
+    logging.debug(f"File location: {file_location}")
+    return file_location
+
+def tldraw_file_response(fs, file_location, if_none_match=None):
+    """Serve a tldraw file's bytes as stored, with its ETag, or 304 if the client's copy is current."""
+    try:
+        # A node whose file was deferred at init gets the default file until it is first set
+        result = fs.read_tldraw_file_bytes(file_location)
+    except Exception as e:
+        logging.error(f"Error reading file: {e}")
+        raise HTTPException(status_code=500, detail="Error reading file")
+    if result is None:
+        logging.debug(f"File does not exist: {file_location}")
+        raise HTTPException(status_code=404, detail="File not found")
+    content, etag = result
+    if etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def save_tldraw_file(fs, file_location, data, if_match=None):
+    """Save a tldraw file, honouring If-Match, and return the new version with its ETag."""
+    try:
+        # Saved as a compressed snapshot version, the previous versions are kept for rollback
+        version = fs.write_tldraw_file(file_location, data, if_match=if_match)
+    except TldrawFileConflict as e:
+        logging.info(f"Rejected stale write to {file_location}: {e}")
+        headers = {"ETag": e.etag} if e.etag else None
+        raise HTTPException(status_code=412, detail="File has changed since it was read", headers=headers)
+    except Exception as e:
+        logging.error(f"Error writing file: {e}")
+        raise HTTPException(status_code=500, detail="Error writing file")
+    return JSONResponse({"status": "success", "version": version}, headers={"ETag": version["etag"]})
+
 @router.post("/get_tldraw_user_node_file")
-async def read_tldraw_user_node_file(user_node: UserNode):
+@offload_io
+def read_tldraw_user_node_file(user_node: UserNode):
     logging.debug(f"Reading tldraw file for user node: {user_node.user_email}")
     
     # Format the database name using the email
@@ -35,45 +88,14 @@ async def read_tldraw_user_node_file(user_node: UserNode):
     
     logging.debug(f"Filesystem root path: {fs.root_path}")
     
-    # Handle path based on environment
-    if os.getenv("DEV_MODE") == "true":
-        # In dev mode, use the full system path from the node
-        if not user_node.path:
-            raise HTTPException(status_code=400, detail="Node path not found")
-        logging.debug(f"Using DEV_MODE path: {user_node.path}")
-        base_path = os.path.normpath(user_node.path)
-    else:
-        # In prod mode, construct path using formatted email
-        logging.warning(f"Using db_name as base path not ready in prod: {db_name}")
-        base_path = formatted_email
-    
-    # Construct final path including tldraw file
-    logging.debug(f"Base path: {base_path}")
-    file_path = os.path.join(base_path, "tldraw_file.json")
-    logging.debug(f"File path: {file_path}")
-    file_location = os.path.normpath(os.path.join(fs.root_path, file_path))
-    logging.debug(f"File location: {file_location}")
+    # In dev mode the file is under the node's own path, in prod under the formatted email
+    file_location = node_file_location(fs, user_node.path, formatted_email, missing_path_detail="Node path not found")
     
-    logging.debug(f"Attempting to read file at: {file_location}")
-    
-    if os.path.exists(file_location):
-        logging.debug(f"File exists: {file_location}")
-        try:
-            with open(file_location, "r") as file:
-                data = json.load(file)
-            return data
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse JSON from file: {e}")
-            raise HTTPException(status_code=500, detail="Invalid JSON in file")
-        except Exception as e:
-            logging.error(f"Error reading file: {e}")
-            raise HTTPException(status_code=500, detail="Error reading file")
-    else:
-        logging.debug(f"File does not exist: {file_location}")
-        raise HTTPException(status_code=404, detail="File not found")
+    return tldraw_file_response(fs, file_location)
 
 @router.post("/set_tldraw_user_node_file")
-async def set_tldraw_user_node_file(user_node: UserNode, data: Dict):
+@offload_io
+def set_tldraw_user_node_file(user_node: UserNode, data: Dict, if_match: Optional[str] = Header(None)):
     logging.debug(f"Setting tldraw file for user node: {user_node.user_email}")
     
     # Format the database name using the email
@@ -82,116 +104,58 @@ async def set_tldraw_user_node_file(user_node: UserNode, data: Dict):
     
     fs = ClassroomCopilotFilesystem(db_name=db_name, init_run_type="user")
     
-    # Handle path based on environment
-    if os.getenv("ENVIRONMENT") == "dev":
-        # In dev mode, use the full system path from the node
-        if not user_node.path:
-            raise HTTPException(status_code=400, detail="Node path not found")
-        base_path = os.path.normpath(user_node.path)
-    else:
-        # In prod mode, construct path using formatted email
-        base_path = formatted_email
-    
-    # Construct final path including tldraw file
-    file_path = os.path.join(base_path, "tldraw_file.json")
-    file_location = os.path.normpath(os.path.join(fs.root_path, file_path))
-    
-    logging.debug(f"Attempting to write file at: {file_location}")
+    # In dev mode the file is under the node's own path, in prod under the formatted email
+    file_location = node_file_location(
+        fs, user_node.path, formatted_email,
+        dev_mode=os.getenv("ENVIRONMENT") == "dev", missing_path_detail="Node path not found"
+    )
     
-    try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_location), exist_ok=True)
-        
-        # Write the file
-        with open(file_location, "w") as file:
-            json.dump(data, file)
-        return {"status": "success"}
-    except Exception as e:
-        logging.error(f"Error writing file: {e}")
-        raise HTTPException(status_code=500, detail="Error writing file")
+    return save_tldraw_file(fs, file_location, data, if_match)
 
 @router.get("/get_tldraw_node_file")
-async def read_tldraw_node_file(path: str, db_name: str):
+@offload_io
+def read_tldraw_node_file(path: str, db_name: str, if_none_match: Optional[str] = Header(None)):
     logging.debug(f"Reading tldraw file for path: {path}")
     
     fs = ClassroomCopilotFilesystem(db_name=db_name, init_run_type="user")
     
     logging.debug(f"Filesystem root path: {fs.root_path}")
     
-    # Handle path based on environment
-    if os.getenv("DEV_MODE") == "true":
-        # In dev mode, use the full system path from the node
-        if not path:
-            raise HTTPException(status_code=400, detail="Path not provided")
-        logging.debug(f"Using DEV_MODEpath: {path}")
-        base_path = os.path.normpath(path)
-    else:
-        # In prod mode, construct path
-        logging.warning(f"Using db_name as base path not ready in prod: {db_name}")
-        base_path = db_name
-    
-    # Construct final path including tldraw file
-    logging.debug(f"Base path: {base_path}")
-    file_path = os.path.join(base_path, "tldraw_file.json")
-    logging.debug(f"File path: {file_path}")
-    file_location = os.path.normpath(os.path.join(fs.root_path, file_path))
-    logging.debug(f"File location: {file_location}")
+    file_location = node_file_location(fs, path, db_name)
     
-    logging.debug(f"Attempting to read file at: {file_location}")
-    
-    if os.path.exists(file_location):
-        logging.debug(f"File exists: {file_location}")
-        try:
-            with open(file_location, "r") as file:
-                data = json.load(file)
-            return data
-        except json.JSONDecodeError as e:
-            logging.error(f"Failed to parse JSON from file: {e}")
-            raise HTTPException(status_code=500, detail="Invalid JSON in file")
-        except Exception as e:
-            logging.error(f"Error reading file: {e}")
-            raise HTTPException(status_code=500, detail="Error reading file")
-    else:
-        logging.debug(f"File does not exist: {file_location}")
-        raise HTTPException(status_code=404, detail="File not found")
+    return tldraw_file_response(fs, file_location, if_none_match)
 
 @router.post("/set_tldraw_node_file")
-async def set_tldraw_node_file(path: str, db_name: str, data: Dict):
+@offload_io
+def set_tldraw_node_file(path: str, db_name: str, data: Dict, if_match: Optional[str] = Header(None)):
     logging.debug(f"Setting tldraw file for path: {path}")
     
     fs = ClassroomCopilotFilesystem(db_name=db_name, init_run_type="user")
     
     logging.debug(f"Filesystem root path: {fs.root_path}")
     
-    # Handle path based on environment
-    if os.getenv("DEV_MODE") == "true":
-        # In dev mode, use the full system path from the node
-        if not path:
-            raise HTTPException(status_code=400, detail="Path not provided")
-        logging.debug(f"Using DEV_MODEpath: {path}")
-        base_path = os.path.normpath(path)
-    else:
-        # In prod mode, construct path
-        logging.warning(f"Using db_name as base path not ready in prod: {db_name}")
-        base_path = db_name
-    
-    # Construct final path including tldraw file
-    logging.debug(f"Base path: {base_path}")
-    file_path = os.path.join(base_path, "tldraw_file.json")
-    logging.debug(f"File path: {file_path}")
-    file_location = os.path.normpath(os.path.join(fs.root_path, file_path))
-    logging.debug(f"File location: {file_location}")
-    
-    logging.debug(f"Attempting to set file at: {file_location}")
+    file_location = node_file_location(fs, path, db_name)
     
+    return save_tldraw_file(fs, file_location, data, if_match)
+
+@router.get("/get_tldraw_node_file_versions")
+@offload_io
+def get_tldraw_node_file_versions(path: str, db_name: str):
+    fs = ClassroomCopilotFilesystem(db_name=db_name, init_run_type="user")
+    file_location = node_file_location(fs, path, db_name)
+    return {"versions": fs.tldraw_file_versions(file_location)}
+
+@router.post("/rollback_tldraw_node_file")
+@offload_io
+def rollback_tldraw_node_file(path: str, db_name: str, sha256: Optional[str] = None):
+    """Make an earlier snapshot current, by default the one before the current snapshot."""
+    fs = ClassroomCopilotFilesystem(db_name=db_name, init_run_type="user")
+    file_location = node_file_location(fs, path, db_name)
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_location), exist_ok=True)
-        
-        # Write the file
-        with open(file_location, "w") as file:
-            json.dump(data, file)
-        return {"status": "success"}
-    except Exception as e:
-        logging.error(f"Error writing file: {e}")
-        raise HTTPException(status_code=500, detail="Error writing file")
+        version = fs.rollback_tldraw_file(file_location, sha256)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except FileNotFoundError as e:
+        logging.error(f"Error rolling back file: {e}")
+        raise HTTPException(status_code=500, detail="Snapshot missing from the store")
+    return {"status": "success", "version": version}
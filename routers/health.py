@@ -1,5 +1,8 @@
 from fastapi import APIRouter, status
 from pydantic import BaseModel
+from modules.executor_tools import executor_metrics
+from modules.database.init.init_jobs import job_runner
+from modules.database.tools.tldraw_cache_tools import tldraw_file_cache
 
 router = APIRouter()
 
@@ -20,4 +23,39 @@ async def health_check() -> HealthCheck:
     Endpoint to perform a healthcheck. Used by container orchestration systems
     to determine if the service is healthy and ready to receive traffic.
     """
-    return HealthCheck()
\ No newline at end of file
+    return HealthCheck()
+
+@router.get(
+    "/health/executors",
+    tags=["Health"],
+    summary="Executor queue metrics",
+    response_description="Return the load on the blocking I/O and CPU worker pools",
+    status_code=status.HTTP_200_OK
+)
+async def executor_health() -> dict:
+    """
+    Endpoint reporting how much work is running and queued in the shared executors
+    and the init job runner, for spotting requests stalled behind blocking calls.
+    """
+    metrics = executor_metrics()
+    if job_runner.started:
+        metrics['init_jobs'] = {
+            'max_workers': job_runner.max_workers,
+            'queued': job_runner.queue_depth(),
+        }
+    return metrics
+
+
+@router.get(
+    "/health/tldraw_cache",
+    tags=["Health"],
+    summary="tldraw file cache metrics",
+    response_description="Return the hit, miss and eviction counts of the tldraw file cache",
+    status_code=status.HTTP_200_OK
+)
+async def tldraw_cache_health() -> dict:
+    """
+    Endpoint reporting the tldraw file cache of the worker process which serves the
+    request; each uvicorn worker keeps its own cache, so counts differ between calls.
+    """
+    return tldraw_file_cache.metrics()
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional
 import ollama
 from ollama import Client
+from modules.executor_tools import offload_io
 
 load_dotenv(find_dotenv())
 
@@ -28,7 +29,8 @@ class UserRequest(BaseModel):
     max_tokens: Optional[int] = None
 
 @router.post("/ollama_text_prompt")
-async def ollama_text_prompt(user_request: UserRequest):
+@offload_io
+def ollama_text_prompt(user_request: UserRequest):
     model_name = user_request.model
     question = user_request.question
     options = {
@@ -57,7 +59,8 @@ class GenerateRequest(BaseModel):
     prompt: str
 
 @router.post("/ollama_generate")
-async def ollama_generate(request: GenerateRequest):
+@offload_io
+def ollama_generate(request: GenerateRequest):
     try:
         response = client.generate(model=request.model, prompt=request.prompt)
         return {"model": request.model, "response": response}
@@ -70,7 +73,8 @@ class VisionRequest(BaseModel):
     prompt: str
 
 @router.post("/ollama_vision_prompt")
-async def ollama_vision_prompt(request: VisionRequest):
+@offload_io
+def ollama_vision_prompt(request: VisionRequest):
     try:
         response = client.vision(model=request.model, image_path=request.image_path, prompt=request.prompt)
         return {"model": request.model, "response": response}
@@ -87,7 +91,8 @@ class CopilotRequest(BaseModel):
     options: Optional[Dict[str, float]] = None
     
 @router.post("/ollama_copilot_prompt")
-async def ollama_copilot_prompt(request: CopilotRequest):
+@offload_io
+def ollama_copilot_prompt(request: CopilotRequest):
     model_name = request.model
     messages = request.messages
     options = request.options or {}
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from openai import OpenAI
+from modules.executor_tools import offload_io
 import os
 import logging
 
@@ -24,7 +25,8 @@ class CopilotRequest(BaseModel):
     options: Optional[Dict[str, float]] = None
 
 @router.post("/openai_copilot_prompt")
-async def openai_copilot_prompt(request: CopilotRequest):
+@offload_io
+def openai_copilot_prompt(request: CopilotRequest):
     logging.info("Received request: %s", request.model_dump_json())
     try:
         response = client.chat.completions.create(
@@ -47,7 +49,8 @@ class GeneralOpenAIRequest(BaseModel):
     stop: Optional[List[str]] = None
 
 @router.post("/openai_general_prompt")
-async def openai_general_prompt(request: GeneralOpenAIRequest):
+@offload_io
+def openai_general_prompt(request: GeneralOpenAIRequest):
     logging.info("Received general request: %s", request.model_dump_json())
     try:
         if "gpt-4" in request.model or "gpt-3.5" in request.model:
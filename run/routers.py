@@ -8,7 +8,8 @@ from routers.health import router as health_router
 from routers.msgraph import router_onenote
 from routers.dev.tests import timetable_test
 from routers.database import admin
-from routers.database.init import entity_init, calendar, timetables, curriculum, get_data, schools
+from routers.database import schools as global_schools
+from routers.database.init import entity_init, calendar, timetables, curriculum, get_data, schools, jobs
 from routers.database.tools import get_nodes, get_nodes_and_edges, tldraw_filesystem, get_events, calendar_structure_router, default_nodes_router, worker_structure_router
 from routers.assets import powerpoint, word, pdf
 from routers.llm.private.ollama import ollama
@@ -37,8 +38,10 @@ def register_routes(app: FastAPI):
     app.include_router(get_nodes_and_edges.router, prefix="/api/database/tools", tags=["Tools"])
     app.include_router(calendar.router, prefix="/api/database/calendar", tags=["Calendar"])
     app.include_router(schools.router, prefix="/api/database/schools", tags=["Schools"])
+    app.include_router(global_schools.router, prefix="/api/database/global-schools", tags=["Schools"])
     app.include_router(timetables.router, prefix="/api/database/timetables", tags=["Timetables"])
     app.include_router(curriculum.router, prefix="/api/database/curriculum", tags=["Curriculum"])
+    app.include_router(jobs.router, prefix="/api/database/jobs", tags=["Jobs"])
     
     # Navigation Routes
     app.include_router(calendar_structure_router.router, prefix="/api/database/calendar-structure", tags=["Calendar"])
@@ -8,6 +8,7 @@ logger = initialise_logger(
     runtime=True
 )
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
 import yaml
 import time
 
@@ -15,10 +16,28 @@ import modules.database.init.init_school as init_school
 import modules.database.init.init_school_timetable as init_school_timetable
 import modules.database.init.init_curriculum as init_curriculum
 import modules.database.init.xl_tools as xl
+import modules.database.init.init_job_handlers  # registers the init job handlers
+from modules.database.init.init_jobs import job_runner
+from modules.executor_tools import shutdown_executors
 import modules.database.tools.neo4j_driver_tools as driver_tools
 import modules.database.tools.neo4j_session_tools as session_tools
 from modules.database.schemas.entity_neo import SchoolNode
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared Neo4j driver registry and the init job runner at startup, and close them and the executors at shutdown"""
+    logger.debug("Opening Neo4j driver registry")
+    app.state.neo4j_drivers = driver_tools.init_driver_registry()
+    logger.debug("Starting init job runner")
+    job_runner.start()
+    yield
+    logger.debug("Stopping init job runner")
+    job_runner.shutdown()
+    logger.debug("Stopping executors")
+    shutdown_executors()
+    logger.debug("Closing Neo4j driver registry")
+    driver_tools.close_driver_registry()
+
 def setup_cors(app: FastAPI) -> None:
     """Configure CORS middleware for the FastAPI application"""
     from fastapi.middleware.cors import CORSMiddleware
@@ -91,6 +110,7 @@ def initialise_school_at_startup(school_config: dict):
             - curriculum_file: Path to Excel file containing curriculum data
     """
     db_name = f"cc.ccschools.{school_config['school_uuid']}"
+    curriculum_db_name = f"{db_name}.curriculum"
     
     logger.info(f"Creating database for {school_config['school_name']} using db_name: {db_name}")
     driver = driver_tools.get_driver()
@@ -101,6 +121,10 @@ def initialise_school_at_startup(school_config: dict):
     with driver.session() as session:
         session_tools.create_database(session, db_name)
         logger.debug(f"Database {db_name} created")
+        
+        # Create curriculum database
+        session_tools.create_database(session, curriculum_db_name)
+        logger.debug(f"Curriculum database {curriculum_db_name} created")
     
     # Add filesystem path debugging
     base_path = os.getenv("NODE_FILESYSTEM_PATH")
@@ -162,6 +186,7 @@ def initialise_school_at_startup(school_config: dict):
     init_curriculum.create_curriculum(
         dataframes=school_curriculum_dataframes, 
         db_name=db_name, 
+        curriculum_db_name=curriculum_db_name,
         school_node=refreshed_school_node
     )
     logger.success("Curriculum entries created successfully")
@@ -0,0 +1,60 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import multiprocessing
+import os
+import pytest
+from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem, TldrawFileConflict, etag_matches
+
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize('header, weak, expected', [
+    ('"abc123"', False, True),
+    ('"other"', False, False),
+    ('*', False, True),
+    ('"other", "abc123"', False, True),
+    ('"other","abc123"', True, True),
+    ('W/"abc123"', False, False),
+    ('W/"abc123"', True, True),
+    ('"other", W/"abc123"', True, True),
+    ('', True, False),
+    (None, False, False),
+])
+def test_etag_matches(header, weak, expected):
+    assert etag_matches(header, ETAG, weak=weak) is expected
+
+
+def test_star_does_not_match_a_missing_file():
+    assert etag_matches('*', None) is False
+
+
+def save_if_match(base_path, file_location, if_match, value, results):
+    os.environ["NODE_FILESYSTEM_PATH"] = base_path
+    fs = ClassroomCopilotFilesystem('db', init_run_type='user')
+    try:
+        fs.write_tldraw_file(file_location, {'value': value}, if_match=if_match)
+        results.put('saved')
+    except TldrawFileConflict:
+        results.put('conflict')
+
+
+def test_if_match_saves_from_several_processes_only_one_wins(monkeypatch, tmp_path):
+    monkeypatch.setenv("NODE_FILESYSTEM_PATH", str(tmp_path))
+    fs = ClassroomCopilotFilesystem('db', init_run_type='user')
+    file_location = os.path.join(fs.root_path, 'node', 'tldraw_file.json')
+    etag = fs.write_tldraw_file(file_location, {'value': 'first'})['etag']
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=save_if_match, args=(str(tmp_path), file_location, etag, value, results))
+        for value in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    outcomes = sorted(results.get(timeout=5) for _ in processes)
+
+    assert outcomes == ['conflict', 'conflict', 'conflict', 'saved']
+    assert len(fs.tldraw_file_versions(file_location)) == 2
@@ -0,0 +1,158 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import datetime as dt
+import os
+import pytest
+import modules.database.init.init_calendar as init_calendar
+import modules.database.schemas.relationships.calendar_rels as cal_rels
+from modules.database.schemas.entity_neo import SchoolNode
+from modules.database.tools.neontology.graphconnection import GraphConnection, init_neontology
+
+# A range whose first ISO week of 2025 starts on Monday 30 December 2024
+YEAR_BOUNDARY_RANGE = (dt.date(2024, 12, 25), dt.date(2025, 1, 10))
+
+
+def template_pairs(template, rel_class):
+    return next(pairs for edge_class, _, _, pairs in template['edges'] if edge_class is rel_class)
+
+
+def test_calendar_frames_for_a_range_crossing_a_year():
+    frames = init_calendar.build_calendar_frames(*YEAR_BOUNDARY_RANGE)
+
+    assert list(frames['years']['key']) == ['2024', '2025']
+    assert list(frames['years']['rel_path']) == ['years/2024', 'years/2025']
+    months = frames['months']
+    assert list(months['key']) == ['2024_12', '2025_1']
+    assert list(months['month_name']) == ['December', 'January']
+    assert list(months['rel_path']) == ['years/2024/months/12', 'years/2025/months/01']
+    weeks = frames['weeks']
+    assert list(weeks['key']) == ['2024_52', '2025_1', '2025_2']
+    assert list(weeks['year_key']) == ['2024', '2024', '2025']
+    assert list(weeks['start_date']) == [dt.date(2024, 12, 23), dt.date(2024, 12, 30), dt.date(2025, 1, 6)]
+    assert list(weeks['iso_week']) == ['2024-W52', '2025-W01', '2025-W02']
+    assert list(weeks['rel_path']) == ['years/2024/weeks/52', 'years/2024/weeks/1', 'years/2025/weeks/2']
+    days = frames['days']
+    assert len(days) == 17
+    first, last = days.iloc[0], days.iloc[-1]
+    assert (first['key'], first['iso_day'], first['day_of_week'], first['week_key']) == \
+        ('2024_12_25', '2024-12-25', 'Wednesday', '2024_52')
+    assert (last['key'], last['rel_path'], last['week_key']) == ('2025_1_10', 'years/2025/months/01/10', '2025_2')
+    assert 'time_chunks' not in frames
+
+
+def test_calendar_frames_time_chunks():
+    frames = init_calendar.build_calendar_frames(dt.date(2025, 1, 1), dt.date(2025, 1, 2), time_chunk_interval=60)
+
+    time_chunks = frames['time_chunks']
+    assert len(time_chunks) == 2 * 24
+    assert list(time_chunks['key'][:2]) == ['2025_1_1_0', '2025_1_1_1']
+    assert time_chunks.iloc[-1]['key'] == '2025_1_2_23'
+    assert (time_chunks.iloc[-1]['start_time'], time_chunks.iloc[-1]['end_time']) == (dt.time(23), dt.time(0))
+
+
+@pytest.mark.parametrize('start, end, interval', [
+    (dt.date(2025, 1, 2), dt.date(2025, 1, 1), None),
+    (dt.date(2025, 1, 1), dt.date(2025, 1, 2), 7),
+])
+def test_calendar_frames_reject_bad_arguments(start, end, interval):
+    with pytest.raises(ValueError):
+        init_calendar.build_calendar_frames(start, end, interval)
+
+
+def test_calendar_template_cache_hits_and_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(init_calendar, "CALENDAR_TEMPLATE_CACHE_SIZE", 2)
+    init_calendar.clear_calendar_template_cache()
+    january, february, march = (
+        (dt.date(2025, month, 1), dt.date(2025, month, 7)) for month in (1, 2, 3)
+    )
+    try:
+        template = init_calendar.get_calendar_template(*january)
+        assert init_calendar.get_calendar_template(*january) is template
+        assert init_calendar.calendar_template_cache_info() == {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 2}
+
+        init_calendar.get_calendar_template(*february)
+        # Using January again leaves February as the least recently used
+        init_calendar.get_calendar_template(*january)
+        init_calendar.get_calendar_template(*march)
+        assert init_calendar.calendar_template_cache_info() == {'hits': 2, 'misses': 3, 'size': 2, 'max_size': 2}
+
+        assert init_calendar.get_calendar_template(*january) is template
+        init_calendar.get_calendar_template(*february)
+        assert init_calendar.calendar_template_cache_info()['misses'] == 4
+        # A different time chunk interval is a different template
+        assert init_calendar.get_calendar_template(*january, time_chunk_interval=60) is not template
+    finally:
+        init_calendar.clear_calendar_template_cache()
+
+
+def test_week_crossing_year_belongs_to_first_year():
+    template = init_calendar.build_calendar_template(*YEAR_BOUNDARY_RANGE)
+
+    year_weeks = template_pairs(template, cal_rels.YearIncludesWeek)
+    assert ('2024', '2025_1') in year_weeks
+    assert ('2025', '2025_1') not in year_weeks
+    # Every week is included by exactly one year
+    week_keys = [week_key for _, week_key in year_weeks]
+    assert len(week_keys) == len(set(week_keys)) == len(template['nodes']['weeks'])
+
+
+@pytest.fixture
+def neo4j_graph():
+    uri = os.getenv("TEST_NEO4J_URI")
+    if not uri:
+        pytest.skip("TEST_NEO4J_URI is not set")
+    init_neontology(uri, os.getenv("TEST_NEO4J_USERNAME"), os.getenv("TEST_NEO4J_PASSWORD"))
+    return GraphConnection()
+
+
+def read_calendar_graph(graph, database, entity_unique_id):
+    """The calendar below an entity, with the entity's id replaced so two entities' calendars compare equal."""
+    records = graph.cypher_read_many(f"""
+    USE {database}
+    MATCH (:{SchoolNode.__primarylabel__} {{unique_id: $unique_id}})-[:HAS_CALENDAR]->(calendar)
+    MATCH (calendar)-[*0..]->(node)
+    WITH DISTINCT node
+    OPTIONAL MATCH (node)-[r]->(target)
+    RETURN node.unique_id AS unique_id, labels(node) AS labels, node.path AS path,
+        collect([type(r), target.unique_id]) AS edges
+    """, {'unique_id': entity_unique_id})
+    rekey = lambda value: value.replace(entity_unique_id, 'Entity') if value else value
+    nodes = {(rekey(record['unique_id']), tuple(sorted(record['labels'])), record['path']) for record in records}
+    edges = {
+        (rekey(record['unique_id']), rel_type, rekey(target))
+        for record in records for rel_type, target in record['edges'] if rel_type
+    }
+    return nodes, edges
+
+
+def test_python_and_cypher_engines_build_the_same_calendar(monkeypatch, tmp_path, neo4j_graph):
+    database = os.getenv("TEST_NEO4J_DATABASE", "neo4j")
+    monkeypatch.setenv("NODE_FILESYSTEM_PATH", str(tmp_path))
+    monkeypatch.setattr(init_calendar.neon, "init_neontology_connection", lambda: None)
+
+    graphs = {}
+    try:
+        for engine in init_calendar.CALENDAR_ENGINES:
+            school_node = SchoolNode(
+                unique_id=f"CalendarParity_{engine}", school_uuid=engine, school_name=engine,
+                school_website='', path=str(tmp_path / 'school')
+            )
+            neo4j_graph.cypher_write(f"""
+            USE {database}
+            MERGE (s:{SchoolNode.__primarylabel__} {{unique_id: $unique_id}})
+            """, {'unique_id': school_node.unique_id})
+            init_calendar.create_calendar(
+                database, *YEAR_BOUNDARY_RANGE, attach_to_calendar_node=True, entity_node=school_node, engine=engine
+            )
+            graphs[engine] = read_calendar_graph(neo4j_graph, database, school_node.unique_id)
+    finally:
+        neo4j_graph.cypher_write(f"""
+        USE {database}
+        MATCH (n) WHERE n.unique_id CONTAINS 'CalendarParity_'
+        DETACH DELETE n
+        """)
+
+    python_nodes, python_edges = graphs['python']
+    cypher_nodes, cypher_edges = graphs['cypher']
+    assert python_nodes == cypher_nodes
+    assert python_edges == cypher_edges
@@ -0,0 +1,62 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import pandas as pd
+import pytest
+import modules.database.tools.filesystem_tools as filesystem_tools
+import modules.database.tools.neontology_tools as neon
+import modules.database.init.init_curriculum as init_curriculum
+from modules.database.schemas.entity_neo import SchoolNode
+from modules.database.tools.neontology.writebuffer import GraphWriteBuffer
+
+NO_WRITES = {"nodes": 0, "relationships": 0, "statements": 0, "seconds": 0.0, "error": None}
+
+
+def make_curriculum_dataframes():
+    key_stages, year_groups, topics, lessons, statements = [], [], [], [], []
+    for subject, code in (('Maths', 'MA'), ('Science', 'SC')):
+        key_stages.append(dict(Department=f"{subject} Dept", Subject=subject, SubjectCode=code, KeyStage=3,
+                               ID=f"{code}KS3", Title=f"{subject} KS3"))
+        for year in (7, 8):
+            year_id = f"{code}Y{year}"
+            year_groups.append(dict(Subject=subject, SubjectCode=code, KeyStage=3, YearGroup=year, ID=year_id,
+                                    Title=f"{subject} Y{year}"))
+            topic_id = f"{year_id}T1"
+            topics.append(dict(TopicID=topic_id, SyllabusYearID=year_id, SyllabusSubject=subject, SyllabusKeyStage=3,
+                               TopicTitle='Topic', TotalNumberOfLessonsForTopic=2, TopicType='Core',
+                               TopicAssessmentType='Test'))
+            for lesson in (1, 2):
+                lesson_id = f"{topic_id}L{lesson}"
+                lessons.append(dict(LessonID=lesson_id, TopicID=topic_id, SyllabusSubject=subject, Lesson=lesson,
+                                    LessonTitle=f"Lesson {lesson}", LessonType='Taught',
+                                    SuggestedNumberOfPeriodsForLesson=1, SuggestedActivities='Activities',
+                                    SkillsLearned='Skills', WebLinks='Links'))
+                statements.append(dict(StatementID=f"{lesson_id}S1", LessonID=lesson_id, SyllabusSubject=subject,
+                                       LearningStatement='Statement', StatementType='Knowledge'))
+    return {
+        'keystagesyllabuses': pd.DataFrame(key_stages),
+        'yeargroupsyllabuses': pd.DataFrame(year_groups),
+        'topics': pd.DataFrame(topics),
+        'lessons': pd.DataFrame(lessons),
+        'statements': pd.DataFrame(statements),
+    }
+
+
+@pytest.mark.parametrize('lazy_files', [False, True])
+def test_incremental_reimport_skips_existing_tldraw_files(monkeypatch, tmp_path, lazy_files):
+    monkeypatch.setenv("NODE_FILESYSTEM_PATH", str(tmp_path))
+    monkeypatch.setattr(filesystem_tools, "TLDRAW_LAZY_FILES", lazy_files)
+    monkeypatch.setattr(GraphWriteBuffer, "_write_database", lambda buffer, *batch: dict(NO_WRITES))
+    monkeypatch.setattr(neon, "init_neontology_connection", lambda: None)
+    school_node = SchoolNode.model_construct(unique_id='S1', path=str(tmp_path / 'schools' / 'db' / 'S1'))
+
+    def run_import():
+        node_library = init_curriculum.create_curriculum(
+            make_curriculum_dataframes(), 'db', 'curriculumdb', school_node, incremental=True
+        )
+        return node_library['import_summary']['tldraw_files']
+
+    first = run_import()
+    assert first['written'] > 0
+    second = run_import()
+    assert second['written'] == 0
+    assert second['skipped'] == first['written']
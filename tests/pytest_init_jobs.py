@@ -0,0 +1,68 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import threading
+import time
+import pytest
+from modules.database.init.init_jobs import JobStore, JobRunner, register_job_handler
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Two connections to one database stand in for two worker processes
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = JobStore(path), JobStore(path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_only_one_store_claims_a_queued_job(stores):
+    first, second = stores
+    first.create('job-1', 'test', {}, None, ('stage',))
+
+    assert first.claim('job-1', 'worker-a', lease_seconds=60) is not None
+    assert second.claim('job-1', 'worker-b', lease_seconds=60) is None
+    assert second.get('job-1')['owner'] == 'worker-a'
+    assert second.resumable_ids() == []
+
+
+def test_running_job_with_expired_lease_is_claimed_again(stores):
+    first, second = stores
+    first.create('job-1', 'test', {}, None, ('stage',))
+    first.claim('job-1', 'worker-a', lease_seconds=-1)
+
+    assert second.resumable_ids() == ['job-1']
+    job = second.claim('job-1', 'worker-b', lease_seconds=60)
+    assert job['owner'] == 'worker-b'
+    assert job['attempts'] == 2
+
+
+def test_runners_sharing_a_store_run_a_job_once(tmp_path):
+    calls = []
+    release = threading.Event()
+
+    @register_job_handler('pytest_count', ('count',))
+    def count_job(job):
+        calls.append(job.id)
+        release.wait(5)
+        job.complete_stage('count')
+        return {}
+
+    first = JobRunner(jobs_path=str(tmp_path), max_workers=1)
+    first.start(resume=False)
+    job_id = first.submit('pytest_count', {})
+    # A second worker starting while the job runs must not run it again
+    second = JobRunner(jobs_path=str(tmp_path), max_workers=1)
+    second.start()
+    try:
+        time.sleep(0.2)
+        release.set()
+        for _ in range(50):
+            if first.get(job_id)['status'] == 'completed':
+                break
+            time.sleep(0.05)
+        assert first.get(job_id)['status'] == 'completed'
+        assert calls == [job_id]
+    finally:
+        first.shutdown()
+        second.shutdown()
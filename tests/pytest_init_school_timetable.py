@@ -0,0 +1,125 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import datetime as dt
+from functools import partial
+import pandas as pd
+import pytest
+import modules.database.tools.neontology_tools as neon
+import modules.database.init.init_school_timetable as init_school_timetable
+from modules.database.schemas.entity_neo import SchoolNode
+from modules.database.tools.neontology.writebuffer import GraphWriteBuffer
+
+
+class FakeGraph:
+    """Records what write buffers flush, matching relationship endpoints like MERGE after MATCH."""
+
+    def __init__(self):
+        self.nodes = set()
+        self.relationships = set()
+        self.dropped = []
+
+    def write_database(self, database, nodes, relationships):
+        for node_type, node_list in nodes:
+            self.nodes.update((database, node.unique_id) for node in node_list)
+        for rel_type, source_type, target_type, rel_list in relationships:
+            for rel in rel_list:
+                key = (database, rel_type.get_relationship_type(), rel.source.unique_id, rel.target.unique_id)
+                if (database, rel.source.unique_id) in self.nodes and (database, rel.target.unique_id) in self.nodes:
+                    self.relationships.add(key)
+                else:
+                    self.dropped.append(key)
+        return {"nodes": 0, "relationships": 0, "statements": 0, "seconds": 0.0, "error": None}
+
+
+def make_timetable_dataframes(start=dt.date(2024, 9, 2), weeks=4):
+    end = start + dt.timedelta(weeks=weeks, days=-1)
+    school = pd.DataFrame({
+        'Identifier': ['SchoolID', 'AcademicYearStart', 'AcademicYearEnd'],
+        'Data': ['S1', start.isoformat(), end.isoformat()],
+    })
+    terms = pd.DataFrame(
+        [('Autumn Term', 'Term', pd.Timestamp(start), pd.Timestamp(end))],
+        columns=['TermName', 'TermType', 'StartDate', 'EndDate']
+    )
+    week_rows = [
+        (number, pd.Timestamp(start + dt.timedelta(weeks=number - 1)), 'A' if number % 2 else 'B')
+        for number in range(1, weeks + 1)
+    ]
+    day_rows = []
+    for offset in range((end - start).days + 1):
+        date = start + dt.timedelta(days=offset)
+        day_rows.append((pd.Timestamp(date), 'Holiday' if date.weekday() >= 5 else 'Academic', week_rows[offset // 7][2]))
+    periods = pd.DataFrame([
+        ('Registration', 'Registration', 'Reg', dt.time(8, 40), dt.time(9, 0)),
+        ('Period 1', 'Academic', 'P1', dt.time(9, 0), dt.time(10, 0)),
+        ('Break', 'Break', 'Br', dt.time(10, 0), dt.time(10, 20)),
+        ('Period 2', 'Academic', 'P2', dt.time(10, 20), dt.time(11, 20)),
+        ('Lunch', 'OffTimetable', 'L', dt.time(11, 20), dt.time(12, 0)),
+    ], columns=['PeriodName', 'PeriodType', 'PeriodCode', 'StartTime', 'EndTime'])
+    return {
+        'school': school,
+        'terms': terms,
+        'weeks': pd.DataFrame(week_rows, columns=['WeekNumber', 'WeekStart', 'WeekType']),
+        'days': pd.DataFrame(day_rows, columns=['Date', 'DayType', 'WeekType']),
+        'periods': periods,
+    }
+
+
+@pytest.fixture
+def fake_graph(monkeypatch, tmp_path):
+    graph = FakeGraph()
+    monkeypatch.setenv("NODE_FILESYSTEM_PATH", str(tmp_path))
+    monkeypatch.setattr(GraphWriteBuffer, "_write_database", lambda buffer, *batch: graph.write_database(*batch))
+    monkeypatch.setattr(neon, "init_neontology_connection", lambda: None)
+    return graph
+
+
+def test_period_relationships_written_across_flushes(monkeypatch, tmp_path, fake_graph):
+    # A flush size well below the number of periods, so periods fill several batches
+    monkeypatch.setattr(neon, "GraphWriteBuffer", partial(GraphWriteBuffer, flush_size=20))
+    school_node = SchoolNode.model_construct(unique_id='S1', path=str(tmp_path / 'schools' / 'db' / 'S1'))
+    # The school is created before its timetable is uploaded
+    fake_graph.nodes.add(('db', school_node.unique_id))
+
+    result = init_school_timetable.create_school_timetable(make_timetable_dataframes(), 'db', school_node)
+
+    period_nodes = result['school_timetable_nodes']['academic_period_nodes']
+    assert len(period_nodes) > 20
+    day_period_types = {rel_class.get_relationship_type() for rel_class in init_school_timetable.DAY_HAS_PERIOD_RELS.values()}
+    linked_periods = {target for _, rel_type, _, target in fake_graph.relationships if rel_type in day_period_types}
+    assert linked_periods == {node.unique_id for node in period_nodes}
+    assert fake_graph.dropped == []
+
+
+@pytest.fixture
+def term_index():
+    # Two terms with a half term gap between them, passed out of order
+    return init_school_timetable.DateIntervalIndex([
+        (dt.date(2024, 11, 4), dt.date(2024, 12, 20), 'Autumn 2'),
+        (dt.date(2024, 9, 2), dt.date(2024, 10, 25), 'Autumn 1'),
+    ])
+
+
+@pytest.mark.parametrize('date, expected', [
+    (dt.date(2024, 9, 2), 'Autumn 1'),
+    (dt.date(2024, 10, 1), 'Autumn 1'),
+    (dt.date(2024, 10, 25), 'Autumn 1'),
+    (dt.date(2024, 11, 4), 'Autumn 2'),
+    (dt.date(2024, 12, 20), 'Autumn 2'),
+])
+def test_date_interval_index_finds_dates_on_and_inside_boundaries(term_index, date, expected):
+    assert term_index.find(date) == expected
+
+
+@pytest.mark.parametrize('date', [
+    dt.date(2024, 9, 1),
+    dt.date(2024, 10, 26),
+    dt.date(2024, 11, 3),
+    dt.date(2024, 12, 21),
+])
+def test_date_interval_index_returns_none_outside_intervals(term_index, date):
+    assert term_index.find(date) is None
+
+
+def test_empty_date_interval_index():
+    assert init_school_timetable.DateIntervalIndex([]).find(dt.date(2024, 9, 2)) is None
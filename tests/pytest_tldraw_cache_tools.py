@@ -0,0 +1,100 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import json
+import pytest
+from modules.database.tools.filesystem_tools import ClassroomCopilotFilesystem
+from modules.database.tools.tldraw_cache_tools import TldrawFileCache, stat_validator, tldraw_file_cache
+from modules.database.tools.tldraw_snapshot_tools import TldrawSnapshotStore
+
+
+def validator_for(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+    return stat_validator('file', os.stat(path))
+
+
+def test_cache_is_bounded_by_bytes_and_evicts_least_recently_used(tmp_path):
+    cache = TldrawFileCache(max_bytes=30, max_entry_bytes=30, redis_url='')
+    validators = {key: validator_for(tmp_path / key, b'x' * 10) for key in 'abcd'}
+    for key in 'abc':
+        cache.put(key, validators[key], b'x' * 10, key)
+    # Reading a makes b the least recently used
+    assert cache.get('a', validators['a']) == (b'x' * 10, 'a')
+
+    cache.put('d', validators['d'], b'x' * 10, 'd')
+
+    assert cache.get('b', validators['b']) is None
+    assert [cache.get(key, validators[key]) is not None for key in 'acd'] == [True, True, True]
+    metrics = cache.metrics()
+    assert (metrics['entries'], metrics['bytes'], metrics['evictions']) == (3, 30, 1)
+
+
+def test_entries_larger_than_the_entry_bound_are_not_cached(tmp_path):
+    cache = TldrawFileCache(max_bytes=100, max_entry_bytes=10, redis_url='')
+    validator = validator_for(tmp_path / 'big', b'x' * 11)
+
+    assert cache.put('big', validator, b'x' * 11, 'big') == (b'x' * 11, 'big')
+    assert cache.get('big', validator) is None
+    assert cache.metrics()['too_large'] == 1
+    assert cache.metrics()['bytes'] == 0
+
+
+def test_replacing_an_entry_updates_the_byte_count(tmp_path):
+    cache = TldrawFileCache(max_bytes=100, max_entry_bytes=100, redis_url='')
+    validator = validator_for(tmp_path / 'a', b'x')
+    cache.put('a', validator, b'x' * 40, 'first')
+    cache.put('a', validator, b'x' * 10, 'second')
+
+    assert cache.metrics()['bytes'] == 10
+
+
+def test_changed_stat_invalidates_an_entry(tmp_path):
+    cache = TldrawFileCache(max_bytes=100, max_entry_bytes=100, redis_url='')
+    path = tmp_path / 'file'
+    old_validator = validator_for(path, b'old')
+    cache.put('file', old_validator, b'old', 'old')
+
+    new_validator = validator_for(path, b'newer')
+
+    assert new_validator != old_validator
+    assert cache.get('file', new_validator) is None
+    assert cache.metrics()['stale'] == 1
+    # The stale entry is dropped rather than kept for the old validator
+    assert cache.get('file', old_validator) is None
+
+
+@pytest.fixture
+def filesystem(monkeypatch, tmp_path):
+    monkeypatch.setenv("NODE_FILESYSTEM_PATH", str(tmp_path))
+    tldraw_file_cache.clear()
+    yield ClassroomCopilotFilesystem('db', init_run_type='user')
+    tldraw_file_cache.clear()
+
+
+def test_snapshot_saved_elsewhere_is_read_again(filesystem):
+    file_location = os.path.join(filesystem.root_path, 'node', 'tldraw_file.json')
+    filesystem.write_tldraw_file(file_location, {'value': 'first'})
+    assert filesystem.read_tldraw_file(file_location) == {'value': 'first'}
+
+    # Another worker process saves through its own store, which this process's cache never sees
+    other_store = TldrawSnapshotStore(filesystem.snapshot_store.store_path)
+    other_store.save(os.path.dirname(file_location), {'value': 'second'})
+
+    assert filesystem.read_tldraw_file(file_location) == {'value': 'second'}
+
+
+def test_plain_file_edited_on_disk_is_read_again(filesystem):
+    node_dir = os.path.join(filesystem.root_path, 'node')
+    os.makedirs(node_dir)
+    file_location = os.path.join(node_dir, 'tldraw_file.json')
+    with open(file_location, 'w') as f:
+        json.dump({'value': 'first'}, f)
+    first_etag = filesystem.tldraw_file_etag(file_location)
+    assert filesystem.read_tldraw_file(file_location) == {'value': 'first'}
+
+    with open(file_location, 'w') as f:
+        json.dump({'value': 'second, longer'}, f)
+
+    assert filesystem.read_tldraw_file(file_location) == {'value': 'second, longer'}
+    assert filesystem.tldraw_file_etag(file_location) != first_etag
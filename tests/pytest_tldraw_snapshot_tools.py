@@ -0,0 +1,100 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import os
+import pytest
+from modules.database.tools.tldraw_snapshot_tools import TldrawSnapshotStore, serialise_snapshot
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TldrawSnapshotStore(str(tmp_path / 'store'), keep=3, compression='gzip')
+
+
+def blob_count(store):
+    return sum(len(files) for _, _, files in os.walk(store.store_path))
+
+
+def test_identical_documents_share_one_blob(store, tmp_path):
+    first = store.save(str(tmp_path / 'a'), {'shapes': []})
+    second = store.save(str(tmp_path / 'b'), {'shapes': []})
+
+    assert first['sha256'] == second['sha256']
+    assert (first['deduplicated'], second['deduplicated']) == (False, True)
+    assert blob_count(store) == 1
+    assert store.load(str(tmp_path / 'b')) == {'shapes': []}
+
+
+def test_saving_the_current_document_again_adds_no_version(store, tmp_path):
+    node_dir = str(tmp_path / 'node')
+    store.save(node_dir, {'value': 1})
+    store.save(node_dir, {'value': 1})
+
+    assert len(store.versions(node_dir)) == 1
+
+
+def test_history_is_trimmed_to_keep(store, tmp_path):
+    node_dir = str(tmp_path / 'node')
+    shas = [store.save(node_dir, {'value': value})['sha256'] for value in range(5)]
+
+    versions = store.versions(node_dir)
+    assert [entry['sha256'] for entry in versions] == shas[:1:-1]
+    assert store.current(node_dir) == shas[-1]
+    with pytest.raises(KeyError):
+        store.load(node_dir, shas[0])
+    # Trimmed versions' blobs are left in place
+    assert blob_count(store) == 5
+
+
+def test_rollback_is_recorded_as_a_new_version(store, tmp_path):
+    node_dir = str(tmp_path / 'node')
+    first = store.save(node_dir, {'value': 1})['sha256']
+    second = store.save(node_dir, {'value': 2})['sha256']
+
+    entry = store.rollback(node_dir)
+
+    assert entry['sha256'] == first
+    assert [version['sha256'] for version in store.versions(node_dir)] == [first, second, first]
+    assert store.load(node_dir) == {'value': 1}
+    # Rolling back the rollback returns to the second version
+    store.rollback(node_dir)
+    assert store.load(node_dir) == {'value': 2}
+
+
+def test_rollback_to_a_version_not_kept_raises(store, tmp_path):
+    node_dir = str(tmp_path / 'node')
+    store.save(node_dir, {'value': 1})
+
+    with pytest.raises(KeyError):
+        store.rollback(node_dir)
+    with pytest.raises(KeyError):
+        store.rollback(node_dir, '0' * 64)
+
+
+def test_missing_blob_raises_file_not_found(store, tmp_path):
+    node_dir = str(tmp_path / 'node')
+    first = store.save(node_dir, {'value': 1})['sha256']
+    second = store.save(node_dir, {'value': 2})['sha256']
+    os.remove(store.find_blob(first))
+    os.remove(store.find_blob(second))
+
+    with pytest.raises(FileNotFoundError):
+        store.load(node_dir)
+    with pytest.raises(FileNotFoundError):
+        store.rollback(node_dir)
+    # A failed rollback leaves the pointer alone
+    assert store.current(node_dir) == second
+
+
+def test_node_without_snapshots(store, tmp_path):
+    node_dir = str(tmp_path / 'node')
+
+    assert store.load(node_dir) is None
+    assert store.current(node_dir) is None
+    assert store.versions(node_dir) == []
+
+
+def test_blobs_hold_the_serialised_document(store, tmp_path):
+    data = {'b': 1, 'a': [1, 2]}
+    sha256 = store.save(str(tmp_path / 'node'), data)['sha256']
+
+    assert store.get_blob(sha256) == serialise_snapshot(data)
@@ -0,0 +1,56 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import asyncio
+from io import BytesIO
+import pytest
+from fastapi import UploadFile
+import modules.database.init.xl_ingest as xl_ingest
+from modules.executor_tools import shutdown_executors
+from tests.pytest_init_school_timetable import make_timetable_dataframes
+from tests.pytest_xl_validation import write_workbook
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    return str(write_workbook(tmp_path / 'timetable.xlsx', make_timetable_dataframes()))
+
+
+@pytest.fixture
+def unusable_cache(tmp_path):
+    # A cache directory below a plain file can never be created, whoever runs the tests
+    (tmp_path / 'not_a_directory').write_text('')
+    return xl_ingest.WorkbookCache(str(tmp_path / 'not_a_directory' / 'xl_cache'))
+
+
+def test_workbook_is_cached_and_read_back(tmp_path, workbook_path):
+    cache = xl_ingest.WorkbookCache(str(tmp_path / 'xl_cache'))
+
+    first = xl_ingest.load_dataframes(workbook_path, xl_ingest.SCHOOL_TIMETABLE_SHEETS, cache=cache)
+    second = xl_ingest.load_dataframes(workbook_path, xl_ingest.SCHOOL_TIMETABLE_SHEETS, cache=cache)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert list(second) == list(first) == list(xl_ingest.SCHOOL_TIMETABLE_SHEETS)
+    assert second['periods'].equals(first['periods'])
+
+
+def test_unusable_cache_falls_back_to_parsing(workbook_path, unusable_cache):
+    assert unusable_cache.put('key', {}) is False
+
+    for _ in range(2):
+        dataframes = xl_ingest.load_dataframes(workbook_path, xl_ingest.SCHOOL_TIMETABLE_SHEETS, cache=unusable_cache)
+        assert len(dataframes['days']) == 28
+    assert (unusable_cache.hits, unusable_cache.misses) == (0, 2)
+
+
+def test_upload_is_parsed_when_the_cache_cannot_be_written(workbook_path, unusable_cache):
+    with open(workbook_path, 'rb') as f:
+        upload_file = UploadFile(file=BytesIO(f.read()), filename='timetable.xlsx')
+
+    try:
+        dataframes = asyncio.run(
+            xl_ingest.ingest_upload(upload_file, xl_ingest.SCHOOL_TIMETABLE_SHEETS, cache=unusable_cache)
+        )
+    finally:
+        shutdown_executors()
+
+    assert len(dataframes['days']) == 28
@@ -0,0 +1,57 @@
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+import datetime as dt
+import openpyxl
+import pandas as pd
+import pytest
+import modules.database.init.xl_validation as xl_validation
+from modules.database.init.xl_ingest import parse_workbook, SCHOOL_TIMETABLE_SHEETS
+from tests.pytest_init_school_timetable import make_timetable_dataframes
+
+
+def write_workbook(path, dataframes):
+    """Write frames cell by cell, so dates and times are stored as Excel would store them."""
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet, df in dataframes.items():
+        worksheet = workbook.create_sheet(sheet)
+        worksheet.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            worksheet.append([value.to_pydatetime() if isinstance(value, pd.Timestamp) else value for value in row])
+    workbook.save(path)
+    return path
+
+
+def test_date_cells_in_mixed_columns_are_dates(tmp_path):
+    start = dt.date(2024, 9, 2)
+    dataframes = make_timetable_dataframes(start)
+    # The school sheet's Data column always mixes the school id with the year dates
+    dataframes['school']['Data'] = ['S1', dt.datetime(2024, 9, 2), dt.date(2024, 9, 29)]
+    # A terms column mixing a date cell with a YYYY-MM-DD string
+    dataframes['terms'] = pd.concat([dataframes['terms'], pd.DataFrame(
+        [('Half Term', 'Holiday', '2024-10-28', dt.date(2024, 11, 1))],
+        columns=['TermName', 'TermType', 'StartDate', 'EndDate']
+    )], ignore_index=True)
+    dataframes['terms']['EndDate'] = dataframes['terms']['EndDate'].astype(object)
+    dataframes['terms'].loc[0, 'EndDate'] = 'not a date'
+
+    parsed = parse_workbook(write_workbook(tmp_path / 'timetable.xlsx', dataframes), SCHOOL_TIMETABLE_SHEETS)
+    assert parsed['school']['Data'].dtype == object
+    report = xl_validation.validate_school_timetable(parsed)
+
+    messages = [(error['sheet'], error['message']) for error in report['errors']]
+    assert messages == [('terms', 'EndDate is not a date or a YYYY-MM-DD string')]
+
+
+@pytest.mark.parametrize('value, expected', [
+    (pd.Timestamp(2024, 9, 2), pd.Timestamp(2024, 9, 2)),
+    (dt.datetime(2024, 9, 2, 0, 0), pd.Timestamp(2024, 9, 2)),
+    (dt.date(2024, 9, 2), pd.Timestamp(2024, 9, 2)),
+    ('2024-09-02', pd.Timestamp(2024, 9, 2)),
+    ('02/09/2024', pd.NaT),
+    ('S1', pd.NaT),
+])
+def test_parse_dates(value, expected):
+    parsed = xl_validation.parse_dates(pd.Series([value, None], dtype=object))
+    assert parsed.iloc[0] is pd.NaT if expected is pd.NaT else parsed.iloc[0] == expected
+    assert parsed.iloc[1] is pd.NaT